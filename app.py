@@ -1,9 +1,25 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, stream_with_context, g
 from flask_cors import CORS
 from datetime import datetime, timedelta
-import threading, time, os, subprocess, inspect
-
-from crawler_utils import crawl_teescan, crawl_golfpang, GOLF_CLUBS
+import threading, time, os, subprocess, json, logging
+
+from club_registry import ALL_GOLFCLUBS_JSON, ALL_GOLFCLUBS_ETAG, SORTED_NAMES, canonical_name, canonicalize_items
+from crawl_orchestrator import run_refresh, merge_source_items
+from refresh_scheduler import RefreshScheduler
+from refresh_coordinator import RefreshCoordinator
+from teetime_index import TeeTimeIndex
+from teetime_table import TeeTimeTable
+from teetime_pivot import build_pivot, parse_price_bands
+from teetime_delta import STREAM_MAX_SUBSCRIBERS, DeltaHub, DeltaQuery, sse, thread_capped_subscribers
+from response_cache import ResponseCache
+from snapshot_store import SnapshotStore
+from price_history import PriceHistory
+from shared_cache import SharedSnapshotReader, SharedSnapshotWriter
+from weather_enrich import enrich_rows, weather_version
+import metrics
+from applog import get_logger
+
+log = get_logger("app")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # (옵션) IPv6 경로 문제 우회: FORCE_IPV4=1 환경변수를 주면 IPv4만 사용
@@ -12,124 +28,203 @@ try:
         import socket
         import urllib3.util.connection as urllib3_cn
         urllib3_cn.allowed_gai_family = lambda: socket.AF_INET
-        print("🔧 IPv4-only mode enabled (FORCE_IPV4=1)")
+        log.info("🔧 IPv4-only mode enabled (FORCE_IPV4=1)")
 except Exception as e:
-    print("⚠️ IPv4-only 설정 실패:", e)
+    log.warning("⚠️ IPv4-only 설정 실패", error=e)
 # ─────────────────────────────────────────────────────────────────────────────
 
 app = Flask(__name__)
 CORS(app)
 
-MEMORY_CACHE = {}
+MEMORY_CACHE = {}  # date_str → TeeTimeTable (컬럼형 압축 보관)
 CACHE_LOCK = threading.Lock()
+TEETIME_INDEX = TeeTimeIndex()  # 조회용 날짜별 불변 스냅샷 (락 없이 읽음)
+RESPONSE_CACHE = ResponseCache()  # (캐시 세대, 정규화된 조회조건) → 직렬화된 응답
+SNAPSHOTS = SnapshotStore()  # data/<date>.json — crawler.py와 공유, 부팅 시 즉시 적재
 MAX_DAYS = 18
 
 # 고정 섹터: 5, 4, 8만 크롤링
 GOLFPANG_SECTORS = [5, 4, 8]
 
-# crawl_golfpang 시그니처 호환 래퍼 (sectors 인자 유무 자동 감지)
-def _call_crawl_golfpang(date_str: str, favorite: list, sectors: list):
-    try:
-        sig = inspect.signature(crawl_golfpang)
-        if 'sectors' in sig.parameters:
-            return crawl_golfpang(date_str, favorite=favorite, sectors=sectors)
-        return crawl_golfpang(date_str, favorite=favorite)
-    except TypeError:
-        return crawl_golfpang(date_str, favorite=favorite)
-
-# ─────────────────────────────────────────────────────────────────────────────
-# Golfpang 회로 차단기(circuit breaker)
-GOLFPANG_CB = {
-    "fails": 0,
-    "open_until": None,   # datetime or None
-    "THRESH": int(os.environ.get("GOLFPANG_CB_THRESH", 5)),  # 연속 실패 임계
-    "COOL_MIN": int(os.environ.get("GOLFPANG_CB_COOL_MIN", 5)),  # 쿨다운(분)
-}
-
-def _golfpang_allowed_now():
-    now = datetime.now()
-    if GOLFPANG_CB["open_until"] and now < GOLFPANG_CB["open_until"]:
-        return False
-    return True
-
-def _golfpang_on_success():
-    GOLFPANG_CB["fails"] = 0
-    GOLFPANG_CB["open_until"] = None
-
-def _golfpang_on_failure():
-    GOLFPANG_CB["fails"] += 1
-    if GOLFPANG_CB["fails"] >= GOLFPANG_CB["THRESH"]:
-        cool = timedelta(minutes=GOLFPANG_CB["COOL_MIN"])
-        GOLFPANG_CB["open_until"] = datetime.now() + cool
-        print(f"🧯 Golfpang 회로 열림: {GOLFPANG_CB['COOL_MIN']}분 동안 스킵 (연속실패={GOLFPANG_CB['fails']})")
-# ─────────────────────────────────────────────────────────────────────────────
-
-def full_refresh_cache():
+# (source, club, date)별 신선도 추적 — 재수집 주기가 된 것만 크롤링
+SCHEDULER = RefreshScheduler()
+
+# 실행 역할 (gunicorn.conf.py 참고)
+# - single: 한 프로세스가 크롤링 + 조회 (python app.py, 기본)
+# - refresher: 크롤링만 하고 날짜별 스냅샷을 공유 세그먼트에 게시 (SERVE_MODE=refresher python app.py)
+# - worker: gunicorn 워커 — 공유 세그먼트를 읽기 전용 mmap으로 조회만 (크롤링 없음)
+# 역할은 import 시점에 SERVE_MODE 하나로만 정함 (아래 SHARED_WRITER/READER/HISTORY가 모두 이 값을 따름)
+SERVE_MODE = os.environ.get("SERVE_MODE", "single")
+if SERVE_MODE not in ("single", "refresher", "worker"):
+    raise ValueError(f"unknown SERVE_MODE: {SERVE_MODE}")
+SHARED_POLL_SEC = float(os.environ.get("SHARED_POLL_SEC", 1.0))  # refresher가 워커 갱신 요청을 확인하는 간격
+SHARED_WRITER = SharedSnapshotWriter() if SERVE_MODE == "refresher" else None
+SHARED_READER = SharedSnapshotReader() if SERVE_MODE == "worker" else None
+# 가격 이력: 갱신하는 프로세스(single/refresher)만 기록, gunicorn 워커는 읽기 전용 mmap으로 조회
+HISTORY = PriceHistory(writable=SERVE_MODE != "worker")
+AUTO_REFRESH_SEC = float(os.environ.get("AUTO_REFRESH_SEC", 3600))  # 서버 주기 갱신 간격 (0이면 끔)
+
+# /stream 구독자에게 날짜별 변경분 푸시 (worker 모드는 디스패처가 공유 세그먼트도 주기적으로 동기화)
+# gunicorn(gthread) 워커는 스레드 수가 고정이므로 구독 수를 WEB_THREADS에서 유도 (gunicorn.conf.py와 같은 값)
+WEB_THREADS = int(os.environ.get("WEB_THREADS", 16))
+DELTAS = DeltaHub(
+    max_subscribers=thread_capped_subscribers(WEB_THREADS) if SHARED_READER else STREAM_MAX_SUBSCRIBERS,
+    poll=(lambda: SHARED_READER.sync(TEETIME_INDEX.publish, TEETIME_INDEX.drop)) if SHARED_READER else None,
+)
+TEETIME_INDEX.on_change(DELTAS.notify)
+
+def full_refresh_cache(force: bool = False, progress=None):
+    if force:
+        SCHEDULER.forget()
     today = datetime.now().date()
-    updated_count = 0
-
-    for i in range(MAX_DAYS):
-        date_str = (today + timedelta(days=i)).strftime("%Y-%m-%d")
-        try:
-            teescan_items = []
-            golfpang_items = []
-
-            # Teescan
+    date_strs = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(MAX_DAYS)]
+    updated = {"count": 0}
+    per_source = {}
+    started = time.perf_counter()
+
+    # 한 소스의 한 날짜 결과가 나오는 즉시 캐시에 반영 (다른 소스 몫은 유지)
+    def _publish(date_str, source, items, clubs=None):
+        old = MEMORY_CACHE.get(date_str)
+        merged = merge_source_items(old.to_items() if old else [], source, items, clubs)
+        if not merged:
+            log.warning("⚠️ 크롤링 결과 없음", date=date_str, source=source)
+            return
+        table = TeeTimeTable(date_str, merged)
+        got_lock = CACHE_LOCK.acquire(timeout=5)
+        if got_lock:
             try:
-                teescan_items = crawl_teescan(date_str, favorite=[])
-            except Exception as e_ts:
-                print(f"❗️ {date_str} Teescan 실패: {e_ts}")
-
-            # Golfpang (섹터 5,4,8만)
-            if _golfpang_allowed_now():
-                try:
-                    golfpang_items = _call_crawl_golfpang(date_str, favorite=[], sectors=GOLFPANG_SECTORS)
-                    _golfpang_on_success()
-                except Exception as e_gp:
-                    print(f"❗️ {date_str} Golfpang 실패: {e_gp}")
-                    _golfpang_on_failure()
-            else:
-                left = int((GOLFPANG_CB["open_until"] - datetime.now()).total_seconds())
-                print(f"⏸️ {date_str} Golfpang 스킵(회로 열림, {left}s 남음)")
-                golfpang_items = []  # 스킵
-
-            items = teescan_items + golfpang_items
-
-            if items:
-                got_lock = CACHE_LOCK.acquire(timeout=5)
-                if got_lock:
-                    try:
-                        MEMORY_CACHE[date_str] = items
-                        updated_count += len(items)
-                        print(f"✅ {date_str} 캐시 갱신 완료 ({len(items)}건)")
-                    finally:
-                        CACHE_LOCK.release()
-                else:
-                    print(f"⛔️ {date_str} 캐시 갱신 실패 - 락 획득 실패")
-            else:
-                print(f"⚠️ {date_str} 크롤링 결과 없음 (TS:{len(teescan_items)}, GP:{len(golfpang_items)})")
+                MEMORY_CACHE[date_str] = table
+                TEETIME_INDEX.publish(date_str, table)
+                updated["count"] += len(items)
+                per_source[source] = per_source.get(source, 0) + len(items)
+                if progress:
+                    progress(date_str, len(items))
+            finally:
+                CACHE_LOCK.release()
+        else:
+            log.error("⛔️ 캐시 갱신 실패 - 락 획득 실패", date=date_str, source=source)
+            return False
+        _after_publish(date_str, table, source, clubs)
+        log.debug("✅ 캐시 갱신 완료", date=date_str, source=source, items=len(items), total=len(merged))
+        # 재시작 시 바로 쓸 수 있도록 디스크 스냅샷도 갱신
+        try:
+            SNAPSHOTS.write(date_str, merged)
         except Exception as e:
-            print(f"❌ {date_str} 크롤링 실패(전체 루프): {e}")
+            log.warning("⚠️ 스냅샷 저장 실패", date=date_str, error=e)
 
-    got_lock = CACHE_LOCK.acquire(timeout=5)
-    if got_lock:
-        try:
-            print("🧠 MEMORY_CACHE keys:", list(MEMORY_CACHE.keys()))
-            for k, v in MEMORY_CACHE.items():
-                print(f"📅 {k}: {len(v)}건 저장됨")
-        finally:
-            CACHE_LOCK.release()
+    # Teescan + Golfpang(섹터 5,4,8만) 동시 수집
+    try:
+        run_refresh(date_strs, _publish, sectors=GOLFPANG_SECTORS, scheduler=SCHEDULER)
+    except Exception as e:
+        log.error("❌ 크롤링 실패(오케스트레이터)", exc_info=True, error=e)
+    updated_count = updated["count"]
+    metrics.REFRESH_SECONDS.observe(value=time.perf_counter() - started)
+    metrics.REFRESH_LAST_SUCCESS.set(value=time.time())
+    for source in ("teescan", "golfpang"):
+        metrics.REFRESH_ITEMS.set(source, value=per_source.get(source, 0))
+
+    # 날짜별 건수는 락 없이 읽는 인덱스에서 (DEBUG일 때만 계산)
+    if log.enabled(logging.DEBUG):
+        for k in TEETIME_INDEX.dates():
+            log.debug("📅 캐시 보관", date=k, rows=TEETIME_INDEX.get(k).size)
+    log.info("🧠 전체 캐시 갱신 완료", items=updated_count, days=len(TEETIME_INDEX.dates()),
+             seconds=round(time.perf_counter() - started, 1))
+
+def _apply_snapshot(date_str, items):
+    # 디스크 스냅샷(크롤러 워커가 쓴 것 포함)을 재수집 없이 캐시에 반영
+    # 정규화 이전에 저장된 스냅샷("세현CC" 등)도 대표 구장명으로 맞춰서 적재
+    table = TeeTimeTable(date_str, canonicalize_items(items))
+    with CACHE_LOCK:
+        MEMORY_CACHE[date_str] = table
+        TEETIME_INDEX.publish(date_str, table)
+    _after_publish(date_str, table)
+
+def _after_publish(date_str, table, source=None, clubs=None):
+    # 가격 이력에 바뀐 칸 추가 + refresher 모드면 워커들이 mmap으로 읽을 세그먼트 게시 (세대 증가)
+    try:
+        HISTORY.record(date_str, table, source=source, clubs=clubs)
+    except Exception as e:
+        log.warning("⚠️ 가격 이력 기록 실패", date=date_str, error=e)
+    if SHARED_WRITER is None:
+        return
+    try:
+        SHARED_WRITER.publish(date_str, table)
+    except Exception as e:
+        log.warning("⚠️ 공유 세그먼트 게시 실패", date=date_str, error=e)
+
+def load_snapshots():
+    today = datetime.now().strftime("%Y-%m-%d")
+    n = SNAPSHOTS.load_changed(_apply_snapshot, keep_from=today)
+    log.info("💾 디스크 스냅샷 적재 완료", days=n)
+    SNAPSHOTS.watch(_apply_snapshot)
 
-    print(f"🧠 전체 캐시 갱신 완료: {updated_count}건")
+# 갱신 요청 단일화: 진행 중 작업이 있으면 합류, 최소 간격 이내면 재사용
+REFRESH = RefreshCoordinator(full_refresh_cache)
 
 def run_async_refresh_once():
-    def _start():
-        print("🚀 서버 부팅 후 1회 캐시 수집 시작")
-        try:
-            full_refresh_cache()
-        except Exception as e:
-            print("❌ 초기 캐시 수집 실패:", e)
-    threading.Thread(target=_start, daemon=True).start()
+    log.info("🚀 서버 부팅 후 1회 캐시 수집 시작")
+    REFRESH.request()
+
+def run_auto_refresh():
+    # 브라우저마다 돌던 1시간 타이머(/admin/refresh) 대신 갱신 담당 프로세스가 주기적으로 요청
+    while AUTO_REFRESH_SEC > 0:
+        time.sleep(AUTO_REFRESH_SEC)
+        status, job = REFRESH.request()
+        log.info("⏰ 주기 캐시 갱신 요청", status=status, job=job.id)
+
+def run_refresher():
+    # gunicorn 마스터가 띄우는 단일 갱신 프로세스: 워커 요청함을 주기적으로 비우고 상태를 공유
+    load_snapshots()
+    run_async_refresh_once()
+    threading.Thread(target=run_auto_refresh, name="auto-refresh", daemon=True).start()
+    log.info("🛰️ 공유 캐시 갱신 프로세스 시작", dir=str(SHARED_WRITER.root), generation=SHARED_WRITER.generation())
+    while True:
+        req = SHARED_WRITER.take_request()
+        if req is not None:
+            status, job = REFRESH.request(force=bool(req.get("force")))
+            log.info("🔧 워커 갱신 요청 처리", status=status, job=job.id)
+        SHARED_WRITER.write_status(REFRESH.status())
+        time.sleep(SHARED_POLL_SEC)
+
+@app.before_request
+def _sync_shared():
+    # worker 모드: 세대 번호(8바이트)만 비교하고, 바뀐 날짜만 다시 mmap해 인덱스 교체
+    if SHARED_READER is not None:
+        SHARED_READER.sync(TEETIME_INDEX.publish, TEETIME_INDEX.drop)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 메트릭: 조회 지연(/get_ttime_grouped) + 날짜별 캐시 나이 (/metrics, Prometheus 텍스트)
+QUERY_ENDPOINTS = {"get_grouped_teetime", "get_grouped_teetime_gpt", "get_grouped_teetime_stream", "price_history"}
+
+@app.before_request
+def _query_timer_start():
+    if request.endpoint in QUERY_ENDPOINTS:
+        g.query_started = time.perf_counter()
+
+@app.after_request
+def _query_timer_stop(resp):
+    # 스트림 응답은 헤더 송신 시점까지(첫 바이트 지연)만 측정됨
+    started = g.pop("query_started", None)
+    if started is not None:
+        metrics.QUERY_SECONDS.observe(request.endpoint, value=time.perf_counter() - started)
+    return resp
+
+def _collect_cache_metrics():
+    now = time.time()
+    metrics.CACHE_AGE_SECONDS.clear()
+    metrics.CACHE_ROWS.clear()
+    for date_str in TEETIME_INDEX.dates():
+        snap = TEETIME_INDEX.get(date_str)
+        if snap is None:
+            continue
+        metrics.CACHE_AGE_SECONDS.set(date_str, value=round(now - snap.created, 3))
+        metrics.CACHE_ROWS.set(date_str, value=snap.size)
+
+metrics.REGISTRY.on_collect(_collect_cache_metrics)
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return app.response_class(metrics.REGISTRY.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
 
 @app.route("/")
 def index():
@@ -137,23 +232,35 @@ def index():
 
 @app.route("/get_all_golfclubs")
 def get_all_golfclubs():
-    names = sorted(c["name"] for c in GOLF_CLUBS)
-    return jsonify(names)
+    # 구장 목록은 배포 단위로만 바뀌므로 미리 직렬화한 응답 + ETag 재사용
+    if ALL_GOLFCLUBS_ETAG in request.if_none_match:
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(ALL_GOLFCLUBS_JSON, mimetype="application/json")
+    resp.set_etag(ALL_GOLFCLUBS_ETAG)
+    resp.headers["Cache-Control"] = "public, max-age=3600"
+    return resp
 
 @app.route("/get_ttime_grouped", methods=["POST"])
 def get_grouped_teetime():
     try:
         data = request.get_json(force=True)
-        print("📥 POST 요청 수신:", data)
+        log.debug("📥 POST 요청 수신", body=data)
 
         start = datetime.strptime(data["start_date"], "%Y-%m-%d")
         end = datetime.strptime(data["end_date"], "%Y-%m-%d")
         hour_range = data.get("hour_range")
         favorite = data.get("favorite_clubs", [])
+        weather = bool(data.get("weather"))  # true면 행마다 날씨(weather/temp/rain) 부착
+        try:
+            price_bands = parse_price_bands(data.get("price_bands"))  # ["10", "15", "over"] 또는 [[lo, hi], ...]
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400  # /get_ttime_grouped/stream과 같은 응답
+        pivot = data.get("mode") == "pivot"  # 날짜×시간대×구장 피벗 응답
 
-        return jsonify(get_consolidated_teetime(start, end, hour_range, favorite))
+        return teetime_response(start, end, hour_range, favorite, weather, price_bands, pivot)
     except Exception as e:
-        print("❌ API 오류:", e)
+        log.error("❌ API 오류", error=e)
         return jsonify({"error": str(e)}), 500
 
 @app.route("/get_ttime_grouped", methods=["GET"])
@@ -167,52 +274,178 @@ def get_grouped_teetime_gpt():
         end = datetime.strptime(end_str, "%Y-%m-%d")
     except Exception as e:
         return jsonify({"error": f"Invalid date format: {e}"}), 400
-    return jsonify(get_consolidated_teetime(start, end, None, []))
-
-def get_from_cache(date_str, favorite):
-    got_lock = CACHE_LOCK.acquire(timeout=3)
-    if not got_lock:
-        print(f"⛔️ {date_str} 캐시 잠금 획득 실패 - 다른 작업 중")
+    return teetime_response(start, end, None, [], request.args.get("weather") == "1")
+
+def teetime_response(start, end, hour_range=None, favorite=None, weather=False, price_bands=None, pivot=False):
+    """
+    - (캐시 세대, 날짜 구간, 시간대, 선호 구장, 가격대, 모드, 날씨 발표본)으로 직렬화된 응답을 재사용
+    - pivot=True면 build_pivot 형태(날씨 미지원), 아니면 기존 행 리스트
+    - If-None-Match가 현재 ETag와 같으면 본문 없이 304
+    """
+    key = (
+        TEETIME_INDEX.generation,
+        start.strftime("%Y-%m-%d"),
+        end.strftime("%Y-%m-%d"),
+        tuple(sorted(set(hour_range))) if hour_range else None,
+        tuple(sorted(set(favorite))) if favorite else None,
+        tuple(sorted(set(price_bands), key=str)) if price_bands else None,
+        "pivot" if pivot else "rows",
+        weather_version() if weather and not pivot else None,
+    )
+    entry = RESPONSE_CACHE.get(key)
+    if entry is None:
+        if pivot:
+            result = get_pivot_teetime(start, end, hour_range, favorite, price_bands)
+        else:
+            result = get_consolidated_teetime(start, end, hour_range, favorite or [], weather, price_bands)
+        body = jsonify(result).get_data()
+        entry = RESPONSE_CACHE.put(key, body)
+    body, etag = entry
+
+    if etag in request.if_none_match:
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+def get_from_cache(date_str, hour_range=None, favorite=None, by_hour=False, price_bands=None):
+    # 스냅샷 참조만 가져오므로 갱신 중에도 대기/빈 결과 없음
+    snap = TEETIME_INDEX.get(date_str)
+    if snap is None:
         return []
+    return snap.query(set(hour_range) if hour_range else None, favorite, price_bands, by_hour=by_hour)
+
+def _date_range(start, end):
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+def get_pivot_teetime(start, end, hour_range=None, favorite=None, price_bands=None):
+    snaps = [(d, TEETIME_INDEX.get(d)) for d in _date_range(start, end)]
+    return build_pivot([(d, s) for d, s in snaps if s is not None],
+                       set(hour_range) if hour_range else None, favorite, price_bands)
+
+def get_consolidated_teetime(start, end, hour_range=None, favorite=[], weather=False, price_bands=None):
+    log.debug("📅 통합 티타임 조회", start=start.date(), end=end.date(), hours=hour_range, favorite=favorite)
+    result = []
+    for date_str in _date_range(start, end):
+        rows = get_from_cache(date_str, hour_range, favorite, price_bands=price_bands)
+        if weather and rows:
+            enrich_rows(rows, date_str)  # (격자, 날짜)당 예보 1회 조회 후 일괄 부착
+        result += rows
+    log.debug("📤 최종 결과 반환", rows=len(result))
+    return result
 
+@app.route("/get_ttime_grouped/stream", methods=["GET", "POST"])
+def get_grouped_teetime_stream():
+    """
+    - 날짜 단위 NDJSON 스트림: 한 줄 = {"date": YYYY-MM-DD, "count": n, "rows": [...]}
+    - 날짜 오름차순, 날짜 안에서는 시간대 → 구장명 순, 중복 제거는 날짜별로 수행
+    - mode=pivot이면 "rows" 대신 날짜별 "pivot"(build_pivot 형태)
+    - 조건은 POST JSON(start_date, end_date, hour_range, favorite_clubs, price_bands, mode, weather) 또는 GET 쿼리
+    """
+    if request.method == "POST":
+        data = request.get_json(force=True) or {}
+    else:
+        data = {k: request.args.get(k) for k in ("start_date", "end_date")}
+        data["weather"] = request.args.get("weather") == "1"
     try:
-        base = MEMORY_CACHE.get(date_str, [])
-        print(f"🔍 캐시 요청: {date_str}, 전체 {len(base)}건")
-        filtered = [item for item in base if not favorite or item["golf"] in favorite]
-        print(f"🧠 캐시 {date_str} → 필터 후 {len(filtered)}건")
-        return filtered
-    finally:
-        CACHE_LOCK.release()
-
-def get_consolidated_teetime(start, end, hour_range=None, favorite=[]):
-    print(f"📅 통합 티타임 조회: {start} ~ {end}, 시간 필터: {hour_range}, 선호: {favorite}")
-    consolidated = []
-    for d in (start + timedelta(days=i) for i in range((end - start).days + 1)):
-        print(f"🔁 날짜 루프 진입: {d.strftime('%Y-%m-%d')}")
-        consolidated += get_from_cache(d.strftime("%Y-%m-%d"), favorite)
-
-    by_key = {}
-    for it in consolidated:
-        try:
-            h = int(it["hour_num"])
-            if hour_range and h not in hour_range:
+        start = datetime.strptime(data["start_date"], "%Y-%m-%d")
+        end = datetime.strptime(data["end_date"], "%Y-%m-%d")
+    except Exception as e:
+        return jsonify({"error": f"Invalid date format: {e}"}), 400
+    hour_range = data.get("hour_range")
+    favorite = data.get("favorite_clubs") or []
+    weather = bool(data.get("weather"))
+    try:
+        price_bands = parse_price_bands(data.get("price_bands"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    hours = set(hour_range) if hour_range else None
+
+    def _generate():
+        for date_str in _date_range(start, end):
+            if data.get("mode") == "pivot":
+                snap = TEETIME_INDEX.get(date_str)
+                pivot = build_pivot([(date_str, snap)] if snap else [], hours, favorite, price_bands)
+                count = sum(len(r[3]) for r in pivot["rows"])
+                yield json.dumps({"date": date_str, "count": count, "pivot": pivot}, ensure_ascii=False) + "\n"
                 continue
-        except Exception:
-            continue
-        k = (it["golf"], it["date"], it["hour"])
-        if k not in by_key or it["price"] < by_key[k]["price"]:
-            by_key[k] = it
-
-    result = [dict(
-        golf=v["golf"],
-        date=datetime.strptime(v["date"], "%Y-%m-%d").strftime("%m/%d"),
-        hour=v["hour"],
-        price=v["price"],
-        source=v["source"],
-        url=v["url"]
-    ) for v in by_key.values()]
-    print(f"📤 최종 결과 {len(result)}건 반환")
-    return result
+            rows = get_from_cache(date_str, hour_range, favorite, by_hour=True, price_bands=price_bands)
+            if weather and rows:
+                enrich_rows(rows, date_str)
+            yield json.dumps({"date": date_str, "count": len(rows), "rows": rows}, ensure_ascii=False) + "\n"
+
+    resp = app.response_class(stream_with_context(_generate()), mimetype="application/x-ndjson")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # 프록시 버퍼링 방지
+    return resp
+
+@app.route("/stream")
+def teetime_delta_stream():
+    """
+    - SSE 구독: 조건에 맞는 칸의 변경분(added/removed/repriced)만 날짜 단위 event: delta로 푸시
+    - 쿼리: start_date, end_date, hour_range=7,8, price_bands=10,over,
+            club_ids=3,17 (/get_all_golfclubs 목록 순번) 또는 favorite_clubs=이름 (반복 가능)
+    - 연결 직후 event: ready, 구독자 큐가 넘치면 event: reset (클라이언트는 전체 재조회)
+    """
+    args = request.args
+    try:
+        start = datetime.strptime(args["start_date"], "%Y-%m-%d")
+        end = datetime.strptime(args["end_date"], "%Y-%m-%d")
+        hours = {int(h) for h in args.get("hour_range", "").split(",") if h}
+        clubs = set(args.getlist("favorite_clubs"))
+        clubs.update(SORTED_NAMES[int(i)] for i in args.get("club_ids", "").split(",") if i)
+        price_bands = parse_price_bands([b for b in args.get("price_bands", "").split(",") if b])
+    except (KeyError, ValueError, IndexError) as e:
+        return jsonify({"error": f"Invalid stream query: {e}"}), 400
+    dates = _date_range(start, end)
+    if len(dates) > MAX_DAYS:
+        return jsonify({"error": f"Date range exceeds {MAX_DAYS} days"}), 400
+
+    sub = DELTAS.subscribe(DeltaQuery(dates, hours, clubs, price_bands))
+    if sub is None:
+        resp = jsonify({"error": "Too many stream subscribers"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "30"
+        return resp
+
+    def _generate():
+        try:
+            yield "retry: 3000\n\n" + sse("ready", {"dates": len(dates)})
+            yield from sub.messages()
+        finally:
+            DELTAS.unsubscribe(sub)
+
+    resp = app.response_class(_generate(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+@app.route("/history")
+def price_history():
+    """
+    - 한 구장·시간대 칸의 가격 이력 요약: ?club=구장명&hour=7[&date=YYYY-MM-DD][&days=90][&source=teescan]
+    - date가 있으면 그 날짜 칸의 가격 변화(current = 지금 가격), 없으면 최근 days일 동안 같은 시간대 전체
+    - 반환: points, min, median, max, trend_per_day(원/일), series=[[수집시각, 가격, 날짜, source], ...]
+    """
+    args = request.args
+    try:
+        club = canonical_name(args["club"])  # 이력은 대표 구장명으로 기록됨 ("세현CC" → "세현")
+        hour = int(args["hour"])
+        date_str = args.get("date")
+        if date_str:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        days = min(int(args.get("days", 90)), 400)
+        source = args.get("source")
+        if source not in (None, "teescan", "golfpang"):
+            raise ValueError(f"unknown source: {source}")
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid history query: {e}"}), 400
+    result = HISTORY.query(club, hour, date_str, days, source)
+    if result is None:
+        return jsonify({"error": f"No history for club: {club}"}), 404
+    return jsonify(result)
 
 @app.route("/static/<path:filename>")
 def static_files(filename):
@@ -220,11 +453,25 @@ def static_files(filename):
 
 @app.route("/admin/refresh", methods=["POST"])
 def admin_refresh():
-    def _refresh_task():
-        print("🔧 수동 캐시 갱신 요청 수신됨")
-        full_refresh_cache()
-    threading.Thread(target=_refresh_task, daemon=True).start()
-    return jsonify({"status": "refresh started"})
+    # ?force=1 이면 신선도 기록을 무시하고 전체 재수집
+    force = request.args.get("force") == "1"
+
+    if SHARED_READER is not None:
+        # 크롤링은 refresher 프로세스 몫 → 요청함에 남기고 마지막으로 공유된 작업 상태를 돌려줌
+        SHARED_READER.request_refresh(force)
+        shared = SHARED_READER.refresh_status() or {}
+        job = shared.get("current") or shared.get("last") or {"id": 0}
+        log.info("🔧 수동 캐시 갱신 요청 전달", job=job["id"])
+        return jsonify({"status": "requested", "job": job})
+    status, job = REFRESH.request(force=force)
+    log.info("🔧 수동 캐시 갱신 요청 수신됨", status=status, job=job.id)
+    return jsonify({"status": status, "job": job.to_dict()})
+
+@app.route("/admin/refresh/status")
+def admin_refresh_status():
+    if SHARED_READER is not None:
+        return jsonify(SHARED_READER.refresh_status() or {"running": False, "current": None, "last": None})
+    return jsonify(REFRESH.status())
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Render 무료티어용 네트워크 진단 엔드포인트 (/debug)
@@ -249,10 +496,15 @@ def debug():
 
 @app.route("/healthz")
 def healthz():
-    return {"status": "ok", "cached_days": len(MEMORY_CACHE)}, 200
+    return {"status": "ok", "cached_days": len(TEETIME_INDEX.dates()),
+            "mode": SERVE_MODE, "generation": TEETIME_INDEX.generation}, 200
 
 if __name__ == "__main__":
+    if SERVE_MODE == "refresher":
+        run_refresher()
+    load_snapshots()
     run_async_refresh_once()
+    threading.Thread(target=run_auto_refresh, name="auto-refresh", daemon=True).start()
     port = int(os.environ.get("PORT", 5000))
-    print(f"🌐 Flask 서버 실행 시작: 포트 {port}")
+    log.info("🌐 Flask 서버 실행 시작", port=port)
     app.run(host="0.0.0.0", port=port)
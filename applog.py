@@ -0,0 +1,107 @@
+import atexit, copy, json, logging, os, queue, sys
+from logging.handlers import QueueHandler, QueueListener
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 구조화 로깅: 호출 스레드는 큐에 넣기만 하고, 실제 stdout 쓰기는 리스너 스레드가 담당
+# LOG_LEVEL=INFO (기본) — 날짜별/구장별/페이지별 상세 로그는 DEBUG
+# LOG_LEVELS="crawler_utils=DEBUG,weather=WARNING" 처럼 모듈별 조정
+# LOG_FORMAT=json 이면 한 줄 JSON, 아니면 "시각 레벨 모듈 메시지 key=value ..."
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+ROOT = "nawabari"
+
+class _TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        doc = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        doc.update(getattr(record, "fields", None) or {})
+        exc = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc:
+            doc["exc"] = exc
+        return json.dumps(doc, ensure_ascii=False, default=str)
+
+class _QueueHandler(QueueHandler):
+    # 기본 prepare는 traceback을 메시지에 섞고 exc_info를 지워서 JSON의 exc 필드가 사라짐
+    # → traceback은 exc_text로만 옮기고 메시지는 원문 그대로 (exc_info는 스레드 간에 넘기지 않음)
+    _traceback = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = self._traceback.formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+_listener = None
+
+def setup_logging():
+    # 프로세스당 1회: nawabari.* 로거 → 큐 → (리스너 스레드) → stdout
+    global _listener
+    if _listener is not None:
+        return
+    root = logging.getLogger(ROOT)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+    for spec in filter(None, (s.strip() for s in LOG_LEVELS.split(","))):
+        name, _, level = spec.partition("=")
+        logging.getLogger(f"{ROOT}.{name.strip()}").setLevel(level.strip().upper())
+
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(_JsonFormatter() if LOG_FORMAT == "json" else _TextFormatter())
+    q = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(q))
+    _listener = QueueListener(q, out, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # 종료 시 남은 로그 비우기
+
+class Logger:
+    """
+    - log.info("메시지", date=..., count=...) 처럼 키워드 인자를 구조화 필드로 전달
+    - 레벨이 꺼져 있으면 레코드를 만들지 않음 (필드 값 계산 비용만 남음)
+    """
+
+    __slots__ = ("_log",)
+
+    def __init__(self, name: str):
+        self._log = logging.getLogger(f"{ROOT}.{name}")
+
+    def enabled(self, level: int) -> bool:
+        return self._log.isEnabledFor(level)
+
+    def _emit(self, level: int, msg: str, exc_info, fields):
+        if self._log.isEnabledFor(level):
+            self._log.log(level, msg, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, msg: str, exc_info=None, **fields):
+        self._emit(logging.DEBUG, msg, exc_info, fields)
+
+    def info(self, msg: str, exc_info=None, **fields):
+        self._emit(logging.INFO, msg, exc_info, fields)
+
+    def warning(self, msg: str, exc_info=None, **fields):
+        self._emit(logging.WARNING, msg, exc_info, fields)
+
+    def error(self, msg: str, exc_info=None, **fields):
+        self._emit(logging.ERROR, msg, exc_info, fields)
+
+def get_logger(name: str) -> Logger:
+    setup_logging()
+    return Logger(name)
@@ -0,0 +1,145 @@
+import json, random, re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 벤치마크용 업스트림 응답 고정본(fixture)
+# <dir>/meta.json                       기준 날짜(base_date) 등
+# <dir>/teescan/<golfclub_seq>.json      getTeeTimeListbyGolfclub 응답 그대로
+# <dir>/golfpang/s<sector>_p<page>.html  booking_list.do 응답 그대로
+# 서빙 시 Golfpang HTML 안의 날짜는 base_date → 오늘 기준으로 평행 이동
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+RE_ISO_DATE = re.compile(r"20\d{2}-\d{2}-\d{2}")
+
+class FixtureSet:
+    def __init__(self, base_date: str, teescan: Dict[str, bytes], golfpang: Dict[Tuple[int, int], str],
+                 kind: str = "synthetic"):
+        self.base_date = base_date
+        self.teescan = teescan    # golfclub_seq → JSON 본문
+        self.golfpang = golfpang  # (sector, page) → HTML 본문
+        self.kind = kind
+
+    def describe(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "base_date": self.base_date,
+            "teescan_clubs": len(self.teescan),
+            "teescan_bytes": sum(len(b) for b in self.teescan.values()),
+            "golfpang_pages": len(self.golfpang),
+            "golfpang_bytes": sum(len(h.encode()) for h in self.golfpang.values()),
+        }
+
+    def shifted(self, to_date: str) -> "FixtureSet":
+        # Golfpang 날짜를 to_date 기준으로 이동 (Teescan 응답에는 날짜가 없음)
+        days = (date.fromisoformat(to_date) - date.fromisoformat(self.base_date)).days
+        if not days:
+            return self
+
+        def _shift(m):
+            return (date.fromisoformat(m.group(0)) + timedelta(days=days)).isoformat()
+
+        golfpang = {k: RE_ISO_DATE.sub(_shift, html) for k, html in self.golfpang.items()}
+        return FixtureSet(to_date, self.teescan, golfpang, self.kind)
+
+def save(fs: FixtureSet, path: Path):
+    path = Path(path)
+    (path / "teescan").mkdir(parents=True, exist_ok=True)
+    (path / "golfpang").mkdir(parents=True, exist_ok=True)
+    for seq, body in fs.teescan.items():
+        (path / "teescan" / f"{seq}.json").write_bytes(body)
+    for (sector, page), html in fs.golfpang.items():
+        (path / "golfpang" / f"s{sector}_p{page}.html").write_text(html, encoding="utf-8")
+    (path / "meta.json").write_text(json.dumps({"base_date": fs.base_date, "kind": fs.kind}), encoding="utf-8")
+
+def load(path: Path) -> Optional[FixtureSet]:
+    path = Path(path)
+    meta_path = path / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    teescan = {p.stem: p.read_bytes() for p in sorted((path / "teescan").glob("*.json"))}
+    golfpang = {}
+    for p in sorted((path / "golfpang").glob("s*_p*.html")):
+        sector, page = p.stem[1:].split("_p")
+        golfpang[(int(sector), int(page))] = p.read_text(encoding="utf-8")
+    return FixtureSet(meta["base_date"], teescan, golfpang, meta.get("kind", "recorded"))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 합성 고정본: 실제 구장 목록(club_registry) 기준, seed가 같으면 항상 같은 내용
+def _teescan_body(rng: random.Random) -> bytes:
+    n = rng.randint(8, 40)
+    times = sorted((rng.randint(5, 18), rng.choice((0, 7, 14, 21, 28, 35, 42, 49, 56))) for _ in range(n))
+    items = [
+        {"teetime_time": f"{h:02d}:{m:02d}", "price": rng.randrange(60000, 260000, 1000), "hole": 18}
+        for h, m in times
+    ]
+    return json.dumps({"code": "0000", "data": {"teeTimeList": items}}, ensure_ascii=False).encode()
+
+def _golfpang_page(rng: random.Random, names: List[str], dates: List[str]) -> str:
+    rows = []
+    for d in dates:
+        for _ in range(rng.randint(3, 8)):
+            name = rng.choice(names)
+            h, m = rng.randint(5, 18), rng.choice((0, 10, 20, 30, 40, 50))
+            price = rng.randrange(50000, 250000, 1000)
+            rows.append(
+                f'<li class="item"><span class="clubNm">{name}CC</span>'
+                f'<span class="date">{d}</span><span class="time">{h:02d}:{m:02d}</span>'
+                f'<span class="price">{price:,}원</span>'
+                f'<a href="/web/round/booking_view.do?id={rng.randint(10**6, 10**7)}">예약</a></li>'
+            )
+    return (
+        '<html><head><script>var x = "2099-01-01 00:00";</script></head><body>'
+        '<div class="header"><ul class="gnb"><li><a href="/">홈</a></li></ul></div>'
+        f'<ul class="booking-list">{"".join(rows)}</ul></body></html>'
+    )
+
+def synthesize(base_date: Optional[str] = None, span_days: int = 18, sectors=(5, 4, 8),
+               pages: int = 5, seed: int = 7) -> FixtureSet:
+    """
+    - Teescan: 구장(seq)마다 8~40건짜리 응답 1개 (날짜와 무관하게 재사용됨)
+    - Golfpang: 섹터마다 pages장, 날짜순으로 나뉘어 뒤 페이지일수록 먼 날짜
+    """
+    from club_registry import CLUBS, TEESCAN_CLUBS
+
+    rng = random.Random(seed)
+    base_date = base_date or datetime.now().strftime("%Y-%m-%d")
+    teescan = {str(c["seq"]): _teescan_body(rng) for c in TEESCAN_CLUBS}
+
+    base = date.fromisoformat(base_date)
+    dates = [(base + timedelta(days=i)).isoformat() for i in range(span_days)]
+    per_page = max(1, -(-len(dates) // pages))
+    golfpang = {}
+    for sector in sectors:
+        names = [c["name"] for c in CLUBS if c.get("region")] or [c["name"] for c in CLUBS]
+        names = rng.sample(names, min(len(names), 20))
+        for page in range(1, pages + 1):
+            chunk = dates[(page - 1) * per_page: page * per_page]
+            if chunk:
+                golfpang[(sector, page)] = _golfpang_page(rng, names, chunk)
+    return FixtureSet(base_date, teescan, golfpang, "synthetic")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 실서버 녹화: 크롤러와 같은 세션/헤더로 한 번 받아 그대로 저장
+def record(date_str: str, path: Path = FIXTURE_DIR / "recorded") -> FixtureSet:
+    import crawler_utils as cu
+
+    teescan = {}
+    golfpang = {}
+    with cu._make_session(retries=2) as s:
+        for club in cu._teescan_clubs():
+            params = {"golfclub_seq": club["seq"], "roundDay": date_str, "orderType": ""}
+            r = s.get(cu.TEESCAN_URL, params=params, headers=cu.TEESCAN_HEADERS, timeout=cu.TEESCAN_TIMEOUT)
+            if r.status_code == 200:
+                teescan[str(club["seq"])] = r.content
+        for sector in cu.SECTORS:
+            for page in range(1, cu.MAX_PAGES_PER_SECTOR + 1):
+                r = s.get(cu.LIST_URL, params={"sector": sector, "page": page}, headers=cu.HEADERS_HTML,
+                          timeout=(cu.CONNECT_TIMEOUT, cu.READ_TIMEOUT), verify=False)
+                if r.status_code != 200:
+                    break
+                golfpang[(sector, page)] = r.text
+    fs = FixtureSet(date_str, teescan, golfpang, "recorded")
+    save(fs, path)
+    return fs
@@ -0,0 +1,321 @@
+"""
+오프라인 벤치마크 (실서버 호출 없음)
+
+    python -m bench.run                           # 합성 고정본 + 로컬 대역 서버로 전체 측정
+    python -m bench.run --suites parse,query      # 일부만
+    python -m bench.run --latency 80 --r429 0.05  # 업스트림 지연/오류/429 조건 변경
+    python -m bench.run --fixtures bench/fixtures/recorded
+    python -m bench.run --record 2026-10-20       # 실서버 응답을 고정본으로 녹화 (네트워크 필요)
+    python -m bench.run --compare A.json B.json   # 두 리포트 비교 (커밋 간)
+    python -m bench.run --suites shard --shard-workers 1,2,4 --shard-kill  # 샤드 워커 확장성 + 워커 중단 회복
+
+리포트는 bench/results/<시각>-<커밋>.json 에 저장되며 커밋/환경변수/서버 조건을 함께 기록
+"""
+import argparse, json, os, platform, sqlite3, subprocess, sys, tempfile, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# 스냅샷 파일은 임시 디렉터리로 (app/snapshot_store import 전에 지정)
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="bench-data-"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from bench import fixtures as fx
+from bench.server import GOLFPANG_PATH, TEESCAN_PATH, StandInServer
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SUITES = ("parse", "query", "teescan", "golfpang", "refresh", "shard")
+CRAWL_SUITES = ("teescan", "golfpang", "refresh", "shard")
+ENV_PREFIXES = ("TEESCAN_", "GPANG_", "GOLFPANG_", "REFRESH_", "RESPONSE_CACHE", "RATE_", "FINGERPRINT_", "CRAWL_")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 공통
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+    except Exception:
+        return ""
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def _timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return times, result
+
+def _dates(n):
+    today = datetime.now().date()
+    return [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n)]
+
+def _point_crawlers_at(server):
+    import crawler_utils as cu
+    cu.TEESCAN_URL = server.url + TEESCAN_PATH
+    cu.LIST_URL = server.url + GOLFPANG_PATH
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 스위트
+def bench_parse(fs, args):
+    # Golfpang 페이지 파싱만 (네트워크 없음), lxml/bs4 각각
+    from golfpang_parser import lxml_html, parse_page_bs4, parse_page_lxml
+
+    pages = list(fs.golfpang.values())
+    total_bytes = sum(len(p.encode()) for p in pages)
+    out = {"pages": len(pages), "bytes": total_bytes}
+    parsers = [("bs4", parse_page_bs4)] + ([("lxml", parse_page_lxml)] if lxml_html is not None else [])
+    for label, parse in parsers:
+        times, rows = _timed(lambda: sum(len(parse(p)) for p in pages), args.repeat)
+        best = min(times)
+        out[label] = {"seconds": round(best, 4), "rows": rows,
+                      "pages_per_s": round(len(pages) / best, 1), "mb_per_s": round(total_bytes / best / 1e6, 2)}
+    return out
+
+def _cache_items(fs, date_strs):
+    # 고정본으로 날짜별 캐시 아이템 구성 (크롤러 결과와 같은 형태)
+    from club_registry import TEESCAN_CLUBS
+    from golfpang_parser import parse_page
+
+    by_date = {d: [] for d in date_strs}
+    for d in date_strs:
+        for club in TEESCAN_CLUBS:
+            body = fs.teescan.get(str(club["seq"]))
+            if not body:
+                continue
+            for it in json.loads(body).get("data", {}).get("teeTimeList", []):
+                h = int(str(it.get("teetime_time", "00")).split(":")[0])
+                by_date[d].append({"golf": club["name"], "date": d, "hour": f"{h:02d}시대", "hour_num": h,
+                                   "price": int(it.get("price", 10**12)), "benefit": "",
+                                   "url": "https://www.teescanner.com/", "source": "teescan"})
+    for html in fs.golfpang.values():
+        for row in parse_page(html):
+            if row["date"] in by_date:
+                by_date[row["date"]].append(row)
+    return by_date
+
+def bench_query(fs, args):
+    # 캐시를 MAX_DAYS일치로 채운 뒤 조회 함수 직접 호출 (응답 캐시 우회)
+    import app
+    from club_registry import CLUBS
+
+    date_strs = _dates(app.MAX_DAYS)
+    t0 = time.perf_counter()
+    for d, items in _cache_items(fs, date_strs).items():
+        app._apply_snapshot(d, items)
+    build_s = time.perf_counter() - t0
+
+    start = datetime.strptime(date_strs[0], "%Y-%m-%d")
+    favorites = [c["name"] for c in CLUBS[:10]]
+    cases = {
+        "1day": lambda: app.get_consolidated_teetime(start, start),
+        "7day": lambda: app.get_consolidated_teetime(start, start + timedelta(days=6)),
+        "7day_fav_hours": lambda: app.get_consolidated_teetime(start, start + timedelta(days=6), [6, 7, 8], favorites),
+        "all_days": lambda: app.get_consolidated_teetime(start, start + timedelta(days=len(date_strs) - 1)),
+        "7day_pivot": lambda: app.get_pivot_teetime(start, start + timedelta(days=6)),
+    }
+    out = {"days": len(date_strs), "rows": sum(app.TEETIME_INDEX.get(d).size for d in date_strs),
+           "build_seconds": round(build_s, 4)}
+    n = max(20, args.repeat * 20)
+    for label, fn in cases.items():
+        fn()  # 워밍업
+        times, result = _timed(fn, n)
+        ms = [t * 1000 for t in times]
+        out[label] = {"p50_ms": round(_pct(ms, 50), 3), "p95_ms": round(_pct(ms, 95), 3),
+                      "rows": len(result) if isinstance(result, list) else len(result.get("rows", []))}
+    return out
+
+def _crawl_suite(server, args, fn, count_items):
+    # 반복 실행 시 2회차부터는 응답 지문 재사용(304/본문 동일)이 반영됨 → content 항목으로 확인
+    import crawler_utils as cu
+    from fingerprint_store import reuse_rate
+
+    _point_crawlers_at(server)
+    cu.FINGERPRINTS.forget()
+    runs = []
+    for _ in range(args.crawl_repeat):
+        server.reset_stats()
+        before = cu.FINGERPRINTS.stats()
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        runs.append((elapsed, count_items(result), server.requests_by_status(),
+                     reuse_rate(before, cu.FINGERPRINTS.stats())))
+    seconds, items, statuses, _ = sorted(runs, key=lambda r: r[0])[len(runs) // 2]  # 중앙값 실행
+    reqs = sum(statuses.values())
+    return {"seconds": round(seconds, 3), "items": items, "requests": reqs, "statuses": statuses,
+            "req_per_s": round(reqs / seconds, 2) if seconds else None,
+            "all_seconds": [round(r[0], 3) for r in runs],
+            "content_by_run": [r[3] for r in runs]}
+
+def bench_teescan(fs, args, server):
+    import crawler_utils as cu
+    date_strs = _dates(args.days)
+    return _crawl_suite(server, args, lambda: cu.crawl_teescan_multi(date_strs, []),
+                        lambda r: sum(len(v) for v in r.values()))
+
+def bench_golfpang(fs, args, server):
+    import crawler_utils as cu
+    date_strs = _dates(args.days)
+
+    def _run():
+        try:
+            return cu.crawl_golfpang_multi(date_strs, [])
+        except cu.SectorFetchError as e:
+            return e.partial  # 오류 주입(--errors) 시에도 모은 만큼은 집계
+
+    return _crawl_suite(server, args, _run, lambda r: sum(len(v) for v in r.values()))
+
+def bench_refresh(fs, args, server):
+    # full_refresh_cache 전체 (오케스트레이터 + 병합 + 인덱스 + 스냅샷 저장)
+    import app
+    app.MAX_DAYS = args.days
+    date_strs = _dates(args.days)
+
+    def _run():
+        app.full_refresh_cache(force=True)
+        return sum(app.TEETIME_INDEX.get(d).size for d in date_strs if app.TEETIME_INDEX.get(d))
+
+    return _crawl_suite(server, args, _run, lambda n: n)
+
+def _shard_round(server, args, workers):
+    # crawler.py --shard --once 워커 프로세스 workers개로 라운드 1회 (임시 DATA_DIR/큐)
+    tmp = tempfile.mkdtemp(prefix="bench-shard-")
+    env = dict(os.environ, DATA_DIR=tmp, CRAWL_QUEUE_PATH=os.path.join(tmp, "queue.sqlite3"),
+               TEESCAN_URL=server.url + TEESCAN_PATH, GPANG_LIST_URL=server.url + GOLFPANG_PATH,
+               CRAWLER_DAYS=str(args.days), CRAWL_POLL_SEC="0.2")
+    env.setdefault("CRAWL_LEASE_SEC", "3")  # 중단된 워커의 임대가 빨리 만료되도록
+    cmd = [sys.executable, str(ROOT / "crawler.py"), "--shard", "--once"]
+    server.reset_stats()
+    t0 = time.perf_counter()
+    procs = [subprocess.Popen(cmd, env=env, cwd=ROOT) for _ in range(workers)]
+    killed = False
+    if args.shard_kill and workers > 1:
+        time.sleep(args.shard_kill_after)
+        procs[0].kill()  # 임대를 쥔 채로 죽은 워커 → 나머지가 만료 후 회수해야 함
+        killed = True
+    for p in procs:
+        p.wait()
+    seconds = time.perf_counter() - t0
+
+    with sqlite3.connect(env["CRAWL_QUEUE_PATH"]) as conn:
+        units = dict(conn.execute("SELECT state, COUNT(*) FROM units GROUP BY state"))
+        retried = conn.execute("SELECT COUNT(*) FROM units WHERE attempts > 1").fetchone()[0]
+    items = sum(len(json.loads(p.read_text(encoding="utf-8"))) for p in Path(tmp).glob("*.json"))
+    statuses = server.requests_by_status()
+    return {"seconds": round(seconds, 3), "items": items, "units": units, "retried_units": retried,
+            "killed_worker": killed, "requests": sum(statuses.values()), "statuses": statuses}
+
+def bench_shard(fs, args, server):
+    # 워커 수별 라운드 시간 (프로세스 기동 시간 포함) — speedup은 워커 1개 대비
+    out = {}
+    for n in args.shard_workers:
+        out[f"workers_{n}"] = _shard_round(server, args, n)
+    base = out.get("workers_1", {}).get("seconds")
+    if base:
+        for v in out.values():
+            v["speedup"] = round(base / v["seconds"], 2)
+    return out
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 리포트
+def _meta(fs, args, server):
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "subject": _git("log", "-1", "--format=%s"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "when": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "fixtures": fs.describe(),
+        "server": {"latency_ms": args.latency, "jitter_ms": args.jitter, "error_rate": args.errors,
+                   "rate_429": args.r429, "retry_after": args.retry_after, "etag": args.etag},
+        "days": args.days,
+        "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith(ENV_PREFIXES)},
+    }
+
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            yield from _flatten(v, key + ".")
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            yield key, v
+
+def compare(a_path, b_path):
+    a, b = (json.loads(Path(p).read_text(encoding="utf-8")) for p in (a_path, b_path))
+    print(f"A: {a['meta']['commit']} {a['meta']['subject']}")
+    print(f"B: {b['meta']['commit']} {b['meta']['subject']}")
+    for k in ("fixtures", "server", "days", "env"):
+        if a["meta"].get(k) != b["meta"].get(k):
+            print(f"⚠️ 측정 조건 다름: {k}")
+    fa, fb = dict(_flatten(a["results"])), dict(_flatten(b["results"]))
+    width = max((len(k) for k in fa), default=10)
+    for k, va in fa.items():
+        vb = fb.get(k)
+        if vb is None:
+            continue
+        delta = f"{(vb - va) / va * 100:+.1f}%" if va else "-"
+        print(f"{k:<{width}}  {va:>12}  {vb:>12}  {delta:>8}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="NawabariGolf offline benchmark")
+    ap.add_argument("--suites", default=",".join(SUITES))
+    ap.add_argument("--fixtures", help="고정본 디렉터리 (없으면 합성)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--days", type=int, default=3, help="크롤링 스위트가 수집할 날짜 수")
+    ap.add_argument("--repeat", type=int, default=3, help="파싱/조회 반복 횟수")
+    ap.add_argument("--crawl-repeat", type=int, default=1, help="크롤링 스위트 반복 횟수 (중앙값 보고)")
+    ap.add_argument("--latency", type=float, default=30, help="대역 서버 응답 지연(ms)")
+    ap.add_argument("--jitter", type=float, default=10)
+    ap.add_argument("--errors", type=float, default=0.0, help="500 응답 비율")
+    ap.add_argument("--r429", type=float, default=0.0, help="429 응답 비율")
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--etag", action="store_true", help="대역 서버가 ETag/304를 지원")
+    ap.add_argument("--shard-workers", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4],
+                    help="shard 스위트 워커 수 목록")
+    ap.add_argument("--shard-kill", action="store_true", help="shard 스위트에서 워커 하나를 도중에 강제 종료")
+    ap.add_argument("--shard-kill-after", type=float, default=2.0)
+    ap.add_argument("--out", default=str(RESULTS_DIR))
+    ap.add_argument("--record", metavar="YYYY-MM-DD", help="실서버 응답을 --fixtures(기본 fixtures/recorded)에 녹화")
+    ap.add_argument("--compare", nargs=2, metavar=("A", "B"))
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.record:
+        fs = fx.record(args.record, Path(args.fixtures or fx.FIXTURE_DIR / "recorded"))
+        print(f"💾 녹화 완료: {fs.describe()}")
+        return
+
+    fs = fx.load(Path(args.fixtures)) if args.fixtures else None
+    if fs is None:
+        fs = fx.synthesize(seed=args.seed)
+    fs = fs.shifted(datetime.now().strftime("%Y-%m-%d"))
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    server = StandInServer(fs, args.latency, args.jitter, args.errors, args.r429, args.retry_after, args.seed,
+                           etag=args.etag).start()
+    results = {}
+    try:
+        for name in suites:
+            fn = globals()[f"bench_{name}"]
+            print(f"⏱️ {name} ...", flush=True)
+            results[name] = fn(fs, args, server) if name in CRAWL_SUITES else fn(fs, args)
+            print(json.dumps(results[name], ensure_ascii=False), flush=True)
+    finally:
+        server.stop()
+
+    report = {"meta": _meta(fs, args, server), "results": results}
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    path = out / f"{datetime.now():%Y%m%d-%H%M%S}-{report['meta']['commit'] or 'nogit'}.json"
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"📄 리포트 저장: {path}")
+
+if __name__ == "__main__":
+    main()
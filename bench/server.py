@@ -0,0 +1,123 @@
+import hashlib, random, threading, time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from bench.fixtures import FixtureSet
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 로컬 대역 서버: Teescan API + Golfpang booking_list.do를 고정본으로 응답
+TEESCAN_PATH = "/v1/booking/getTeeTimeListbyGolfclub"
+GOLFPANG_PATH = "/web/round/booking_list.do"
+EMPTY_TEESCAN = b'{"code":"0000","data":{"teeTimeList":[]}}'
+EMPTY_GOLFPANG = "<html><body><ul class=\"booking-list\"></ul></body></html>"
+
+class StandInServer:
+    """
+    - latency_ms ± jitter_ms 만큼 지연 후 응답
+    - error_rate 비율로 500, rate_429 비율로 429(+Retry-After) 응답
+    - etag=True면 본문 해시로 ETag를 붙이고 If-None-Match가 같으면 304
+    - 요청 수는 stats[(경로, 상태코드)]로 집계 → 리포트에 함께 기록
+    """
+
+    def __init__(self, fixtures: FixtureSet, latency_ms: float = 30, jitter_ms: float = 10,
+                 error_rate: float = 0.0, rate_429: float = 0.0, retry_after: int = 1, seed: int = 0,
+                 etag: bool = False):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.etag = etag
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self):
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._rng.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.error_rate:
+            return delay, 500
+        return delay, 200
+
+    def _respond(self, path: str, query: dict, if_none_match: str = None):
+        # → (status, content_type, body, headers)
+        status, ctype, body, headers = self._content(path, query)
+        if status == 200 and self.etag:
+            tag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+            if if_none_match == tag:
+                return 304, ctype, b"", {"ETag": tag}
+            headers = dict(headers, ETag=tag)
+        return status, ctype, body, headers
+
+    def _content(self, path: str, query: dict):
+        delay, status = self._draw()
+        time.sleep(delay)
+        if status == 429:
+            return 429, "text/plain", b"Too Many Requests", {"Retry-After": str(self.retry_after)}
+        if status == 500:
+            return 500, "text/plain", b"Internal Server Error", {}
+        if path == TEESCAN_PATH:
+            seq = (query.get("golfclub_seq") or [""])[0]
+            return 200, "application/json", self.fixtures.teescan.get(seq, EMPTY_TEESCAN), {}
+        if path == GOLFPANG_PATH:
+            key = (int((query.get("sector") or [0])[0]), int((query.get("page") or [0])[0]))
+            html = self.fixtures.golfpang.get(key, EMPTY_GOLFPANG)
+            return 200, "text/html; charset=utf-8", html.encode(), {}
+        return 404, "text/plain", b"Not Found", {}
+
+    def start(self) -> "StandInServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive (실서버와 같은 연결 재사용 조건)
+
+            def do_GET(self):
+                u = urlparse(self.path)
+                status, ctype, body, headers = server._respond(u.path, parse_qs(u.query),
+                                                               self.headers.get("If-None-Match"))
+                with server._lock:
+                    server.stats[(u.path, status)] += 1
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def requests_by_status(self) -> dict:
+        with self._lock:
+            out = Counter()
+            for (_, status), n in self.stats.items():
+                out[str(status)] += n
+            return dict(out)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
@@ -0,0 +1,107 @@
+import hashlib, json, os, re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from weather import convert_grid
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 구장 레지스트리: golf_clubs.json을 1회 로딩하고 조회 테이블을 미리 구성
+base_dir = os.path.dirname(__file__)
+golf_club_path = os.path.join(base_dir, "static", "golf_clubs.json")
+with open(golf_club_path, "r", encoding="utf-8") as f:
+    GOLF_CLUBS: List[Dict] = json.load(f)
+
+def region_of(address: str) -> str:
+    # script.js getRegionByAddress와 같은 규칙
+    address = address or ""
+    if address.startswith("경기도"): return "경기"
+    if address.startswith("충청"): return "충청"
+    if address.startswith("강원"): return "강원"
+    return "기타"
+
+def _build():
+    clubs, by_name, by_code = [], {}, {}
+    for i, raw in enumerate(GOLF_CLUBS):
+        club = dict(raw)
+        club["id"] = i
+        club["region"] = region_of(club.get("address"))
+        club["grid"] = convert_grid(club["lat"], club["lng"]) if "lat" in club and "lng" in club else None
+        clubs.append(club)
+
+        name = club.get("name")
+        if name and name not in by_name:
+            by_name[name] = club
+        # Golpang_code는 중복이 있으므로 튜플로 보관
+        if club.get("Golpang_code"):
+            by_code[club["Golpang_code"]] = by_code.get(club["Golpang_code"], ()) + (club,)
+    return clubs, by_name, by_code
+
+CLUBS, BY_NAME, BY_GOLFPANG_CODE = _build()
+SORTED_NAMES: Tuple[str, ...] = tuple(sorted(BY_NAME))
+
+# Teescan 대상: 이름 중복/seq 없는 구장 제외 (GOLF_CLUBS 순서 유지)
+TEESCAN_CLUBS: Tuple[Dict, ...] = tuple(c for c in BY_NAME.values() if c.get("seq"))
+
+# /get_all_golfclubs 응답 (미리 직렬화)
+ALL_GOLFCLUBS_JSON: bytes = json.dumps(list(SORTED_NAMES), ensure_ascii=False).encode("utf-8")
+ALL_GOLFCLUBS_ETAG: str = hashlib.blake2b(ALL_GOLFCLUBS_JSON, digest_size=12).hexdigest()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 구장명 정규화 인덱스: 소스마다 다른 표기("세현CC", "세현 컨트리클럽", "세현")를 대표 구장 id로
+# - 대표 구장 = BY_NAME에 들어간 구장 (이름 중복이면 첫 항목), id는 CLUBS 순번
+# - 키: 정규화한 이름 + golf_clubs.json의 aliases(선택) + Golpang_code(구장 하나에만 쓰인 코드)
+# - 수집 시점에 한 번 풀어 두면 선호 구장 필터/중복 제거는 정수 집합 연산으로 끝남
+UNKNOWN_CLUB = -1
+_RE_NAME_NOISE = re.compile(r"[\s\.\-·&()\[\]]+")
+_RE_NAME_SUFFIX = re.compile(r"(?:컨트리클럽|골프클럽|골프앤리조트|골프리조트|골프장|GCC|CC|GC)$")
+
+def normalize_club_name(name: str) -> str:
+    # 공백/구두점 제거 → 대문자 → 끝의 CC/GC/컨트리클럽 등 접미사 제거 (접미사만 남으면 그대로 둠)
+    key = _RE_NAME_NOISE.sub("", name or "").upper()
+    while True:
+        stripped = _RE_NAME_SUFFIX.sub("", key)
+        if stripped == key or not stripped:
+            return key
+        key = stripped
+
+def _build_name_index():
+    keys: Dict[str, int] = {}
+    for club in BY_NAME.values():
+        for alias in (club["name"],) + tuple(club.get("aliases") or ()):
+            keys.setdefault(normalize_club_name(alias), club["id"])
+    codes = {code: BY_NAME[cs[0]["name"]]["id"] for code, cs in BY_GOLFPANG_CODE.items()
+             if len(cs) == 1 and cs[0]["name"] in BY_NAME}
+    return keys, codes
+
+CLUB_NAME_KEYS, CLUB_ID_BY_GOLFPANG_CODE = _build_name_index()
+_RESOLVED: Dict[str, int] = {}  # 원문 이름 → 대표 id (수집 중 같은 표기가 반복되므로 정규화는 표기당 1회)
+_RESOLVED_MAX = 4096
+
+def resolve_club(name: str, golfpang_code: Optional[str] = None) -> int:
+    # 임의 표기의 구장명(+ 있으면 Golfpang 코드) → 대표 구장 id, 모르면 UNKNOWN_CLUB
+    if golfpang_code:
+        cid = CLUB_ID_BY_GOLFPANG_CODE.get(golfpang_code)
+        if cid is not None:
+            return cid
+    cid = _RESOLVED.get(name)
+    if cid is None:
+        cid = CLUB_NAME_KEYS.get(normalize_club_name(name), UNKNOWN_CLUB)
+        if len(_RESOLVED) < _RESOLVED_MAX:
+            _RESOLVED[name] = cid
+    return cid
+
+def canonical_name(name: str, golfpang_code: Optional[str] = None) -> str:
+    # 대표 구장명 (모르는 구장이면 원문 그대로)
+    cid = resolve_club(name, golfpang_code)
+    return CLUBS[cid]["name"] if cid != UNKNOWN_CLUB else name
+
+def club_id_set(names: Optional[Iterable[str]]) -> Optional[FrozenSet[int]]:
+    # 선호 구장 목록 → 대표 id 집합 (None/빈 목록이면 None = 필터 없음, 모르는 이름은 무시)
+    if not names:
+        return None
+    return frozenset(cid for cid in map(resolve_club, names) if cid != UNKNOWN_CLUB)
+
+def canonicalize_items(items: List[Dict]) -> List[Dict]:
+    # 수집 결과의 golf를 대표 구장명으로 교체 (제자리 수정, 링크의 Golfpang 코드가 있으면 이름보다 우선, 소비 후 제거)
+    for it in items:
+        it["golf"] = canonical_name(it["golf"], it.pop("club_code", None))
+    return items
@@ -0,0 +1,255 @@
+import asyncio, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+import crawler_utils as cu
+from refresh_scheduler import ALL, RefreshScheduler
+from fingerprint_store import reuse_rate
+from applog import get_logger
+
+log = get_logger("crawl_orchestrator")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 소스별 동시성 예산 / 전체 타임아웃 (환경변수로 튜닝)
+SOURCES = ("teescan", "golfpang")  # 날짜별 캐시 내 정렬 순서
+
+TEESCAN_CONCURRENCY = int(os.environ.get("TEESCAN_WORKERS", cu.TEESCAN_WORKERS))
+TEESCAN_TOTAL_TIMEOUT = float(os.environ.get("TEESCAN_TOTAL_TIMEOUT", 600))
+GOLFPANG_CONCURRENCY = int(os.environ.get("GOLFPANG_CONCURRENCY", 1))  # 섹터 동시 순회 수
+GOLFPANG_TOTAL_TIMEOUT = float(os.environ.get("GOLFPANG_TOTAL_TIMEOUT", 600))
+
+# publish(date_str, source, items, clubs) — clubs가 None이면 해당 소스 전체 교체
+# 반환값이 False면 게시하지 못한 것(락 획득 실패 등) → 신선도를 기록하지 않아 다음 라운드에 재수집
+PublishFn = Callable[[str, str, List[Dict], Optional[Set[str]]], Optional[bool]]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 소스별 회로 차단기(circuit breaker)
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CircuitBreaker:
+    """
+    - 연속 실패가 thresh 이상이면 cool_min 분 동안 해당 소스 호출을 막음
+    - 상태는 락으로 보호되어 워커 스레드/이벤트 루프 어디서 불러도 안전
+    - hold(seconds)는 RateController가 호출 (Retry-After가 길거나 최저 속도에서도 계속 막힐 때)
+    """
+
+    def __init__(self, source: str, thresh: int, cool_min: int):
+        self.source = source
+        self.thresh = thresh
+        self.cool_min = cool_min
+        self.fails = 0
+        self.open_until = None  # datetime or None
+        self._lock = threading.Lock()
+
+    def allowed(self) -> bool:
+        with self._lock:
+            return not (self.open_until and datetime.now() < self.open_until)
+
+    def seconds_left(self) -> int:
+        with self._lock:
+            if not self.open_until:
+                return 0
+            return max(0, int((self.open_until - datetime.now()).total_seconds()))
+
+    def on_success(self):
+        # 연속 실패 수만 초기화 — 아직 남은 차단(hold/쿨다운)은 유지 (동시에 끝난 다른 호출의 성공으로 풀리지 않게)
+        with self._lock:
+            self.fails = 0
+            if self.open_until and datetime.now() >= self.open_until:
+                self.open_until = None
+
+    def hold(self, seconds: float):
+        # 속도 제어기가 업스트림 차단을 감지했을 때: 연속 실패 수와 무관하게 seconds 동안 열기
+        with self._lock:
+            until = datetime.now() + timedelta(seconds=seconds)
+            if not self.open_until or until > self.open_until:
+                self.open_until = until
+
+    def on_failure(self):
+        with self._lock:
+            self.fails += 1
+            if self.fails >= self.thresh:
+                self.open_until = datetime.now() + timedelta(minutes=self.cool_min)
+                log.warning("🧯 회로 열림", source=self.source, cool_min=self.cool_min, fails=self.fails)
+
+    async def call(self, executor, fn, *args):
+        # 블로킹 fn을 executor에서 실행하고 결과를 성공/실패로 집계
+        if not self.allowed():
+            raise CircuitOpenError(self.source)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(executor, fn, *args)
+        except Exception:
+            self.on_failure()
+            raise
+        self.on_success()
+        return result
+
+BREAKERS = {
+    "teescan": CircuitBreaker(
+        "teescan",
+        int(os.environ.get("TEESCAN_CB_THRESH", 20)),
+        int(os.environ.get("TEESCAN_CB_COOL_MIN", 5)),
+    ),
+    "golfpang": CircuitBreaker(
+        "golfpang",
+        int(os.environ.get("GOLFPANG_CB_THRESH", 5)),
+        int(os.environ.get("GOLFPANG_CB_COOL_MIN", 5)),
+    ),
+}
+# 속도 제어기의 차단 신호를 같은 소스의 회로 차단기로 연결
+for _source, _breaker in BREAKERS.items():
+    cu.RATES[_source].breaker = _breaker
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 결과 병합: 날짜별 리스트에서 한 소스 몫(clubs가 주어지면 그 구장들 몫)만 교체
+def merge_source_items(old_items: List[Dict], source: str, items: List[Dict],
+                       clubs: Optional[Set[str]] = None) -> List[Dict]:
+    by_source = {s: [] for s in SOURCES}
+    for it in old_items or []:
+        by_source.setdefault(it.get("source"), []).append(it)
+    kept = [] if clubs is None else [it for it in by_source.get(source, []) if it["golf"] not in clubs]
+    by_source[source] = kept + list(items)
+    return [it for s in by_source for it in by_source[s]]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 소스별 비동기 수집
+async def _run_teescan(date_strs: List[str], favorite: List[str], publish: PublishFn,
+                       scheduler: Optional[RefreshScheduler]):
+    breaker = BREAKERS["teescan"]
+    if not breaker.allowed():
+        log.info("⏸️ Teescan 스킵(회로 열림)", seconds_left=breaker.seconds_left())
+        return
+
+    workers = max(1, TEESCAN_CONCURRENCY)
+    sem = asyncio.Semaphore(workers)
+    clubs = cu._teescan_clubs()
+    session = cu._make_session(retries=cu.TEESCAN_RETRIES, pool_maxsize=workers)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="teescan")
+
+    async def fetch(club, date_str):
+        async with sem:
+            try:
+                items = await breaker.call(executor, cu._fetch_teescan, session, club, date_str, True)
+            except Exception:
+                return None  # 실패/회로 열림 → 이 구장은 이번 라운드 결과 없음
+        return items
+
+    async def one_date(date_str, due):
+        # 세마포어는 대기 순서대로 깨우므로 가까운 날짜부터 완료·게시됨
+        results = await asyncio.gather(*(fetch(c, date_str) for c in due))
+        ok = [(c, r) for c, r in zip(due, results) if r is not None]
+        if not ok:
+            log.warning("⚠️ Teescan 전 구장 실패 → 기존 캐시 유지", date=date_str)
+            return
+        # 성공한 구장 몫만 교체 (실패한 구장의 기존 캐시는 유지)
+        if publish(date_str, "teescan", [it for _, r in ok for it in r], {c["name"] for c, _ in ok}) is False:
+            return
+        # 신선도는 실제로 게시된 뒤에만 기록 (타임아웃으로 취소된 날짜는 다음 라운드에 다시 대상)
+        if scheduler:
+            for c, r in ok:
+                scheduler.record("teescan", c["name"], date_str, r)
+
+    tasks = []
+    for d in date_strs:
+        due = [c for c in clubs if not scheduler or scheduler.is_due("teescan", c["name"], d)]
+        if due:
+            tasks.append(asyncio.create_task(one_date(d, due)))
+    if scheduler:
+        log.info("🗓️ Teescan 재수집 대상 (주기 미도래 구장은 스킵)", days=len(tasks))
+    if not tasks:
+        executor.shutdown(wait=False)
+        session.close()
+        return
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=TEESCAN_TOTAL_TIMEOUT)
+        if pending:
+            log.warning("⏱️ Teescan 타임아웃", timeout=TEESCAN_TOTAL_TIMEOUT, pending_days=len(pending))
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        session.close()
+
+async def _run_golfpang(date_strs: List[str], favorite: List[str], sectors: List[int], publish: PublishFn,
+                        scheduler: Optional[RefreshScheduler]):
+    breaker = BREAKERS["golfpang"]
+    if not breaker.allowed():
+        log.info("⏸️ Golfpang 스킵(회로 열림)", seconds_left=breaker.seconds_left())
+        return
+    # Golfpang은 한 번의 순회가 전체 날짜를 덮으므로 (golfpang, *, *) 단위로 주기 판단
+    if scheduler and not scheduler.is_due("golfpang", ALL, ALL):
+        log.info("⏭️ Golfpang 스킵(재수집 주기 미도래)")
+        return
+
+    sem = asyncio.Semaphore(max(1, GOLFPANG_CONCURRENCY))
+    executor = ThreadPoolExecutor(max_workers=max(1, GOLFPANG_CONCURRENCY), thread_name_prefix="golfpang")
+
+    async def one_sector(sector):
+        async with sem:
+            try:
+                return await breaker.call(executor, cu.crawl_golfpang_multi, date_strs, favorite, [sector])
+            except CircuitOpenError:
+                return None
+            except Exception as e:
+                log.warning("❗️ Golfpang 섹터 실패", sector=sector, error=e)
+                return None
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(one_sector(s) for s in (sectors or cu.SECTORS))),
+            timeout=GOLFPANG_TOTAL_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        log.warning("⏱️ Golfpang 타임아웃 → 기존 캐시 유지", timeout=GOLFPANG_TOTAL_TIMEOUT)
+        breaker.on_failure()
+        return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    ok = [r for r in results if r is not None]
+    if not ok:
+        log.warning("⚠️ Golfpang 전 섹터 실패 → 기존 캐시 유지")
+        return
+    by_date = {d: [it for r in ok for it in r.get(d, [])] for d in date_strs}
+    # 일부 섹터만 성공했으면 성공 섹터에서 나온 구장 몫만 교체 (실패 섹터 구장의 기존 캐시는 유지)
+    clubs = None
+    if len(ok) < len(results):
+        clubs = {it["golf"] for items in by_date.values() for it in items}
+        log.warning("⚠️ Golfpang 일부 섹터 실패 → 성공 구장만 교체", ok=len(ok), total=len(results))
+    published = [publish(date_str, "golfpang", by_date[date_str], clubs) is not False for date_str in date_strs]
+    if scheduler and clubs is None and all(published):
+        # 전 섹터 성공 + 전 날짜 게시일 때만 신선도 기록 (아니면 다음 라운드에 바로 재시도)
+        scheduler.record("golfpang", ALL, ALL, [it for d in date_strs for it in by_date[d]])
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 진입점
+async def refresh_window(date_strs: List[str], publish: PublishFn,
+                         favorite: List[str] = None, sectors: List[int] = None,
+                         scheduler: RefreshScheduler = None):
+    """
+    - Teescan과 Golfpang을 동시에 수집 (소스별 동시성 예산/타임아웃 분리)
+    - 한 소스의 한 날짜 결과가 준비되는 즉시 publish(date_str, source, items, clubs) 호출
+    - 실패/타임아웃/회로 열림인 소스는 publish하지 않으므로 기존 캐시가 유지됨
+    - scheduler가 주어지면 재수집 주기가 된 (source, club, date)만 수집
+    - 끝나면 소스별 응답 재사용 비율(304 + 본문 동일)을 기록
+    """
+    favorite = favorite or []
+    if scheduler:
+        scheduler.prune(date_strs)
+    before = cu.FINGERPRINTS.stats()
+    await asyncio.gather(
+        _run_teescan(date_strs, favorite, publish, scheduler),
+        _run_golfpang(date_strs, favorite, sectors, publish, scheduler),
+    )
+    for source, counts in reuse_rate(before, cu.FINGERPRINTS.stats()).items():
+        log.info("♻️ 업스트림 응답 재사용", source=source, **counts)
+
+def run_refresh(date_strs: List[str], publish: PublishFn,
+                favorite: List[str] = None, sectors: List[int] = None,
+                scheduler: RefreshScheduler = None):
+    # 동기 코드(스레드)에서 호출하는 래퍼 — 호출마다 새 이벤트 루프 사용
+    asyncio.run(refresh_window(date_strs, publish, favorite=favorite, sectors=sectors, scheduler=scheduler))
@@ -0,0 +1,382 @@
+import json, os, socket, sqlite3, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import crawler_utils as cu
+from applog import get_logger
+from club_registry import BY_NAME
+from crawl_orchestrator import BREAKERS, CircuitOpenError, PublishFn
+from refresh_scheduler import ALL, RefreshScheduler
+from snapshot_store import DATA_DIR
+
+log = get_logger("crawl_queue")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 샤딩 크롤링: SQLite 작업 큐 + 임대(lease)
+# - 작업 단위: (teescan, 구장, 날짜) / (golfpang, 섹터, *) — 한 라운드의 단위들을 여러 워커 프로세스가 나눠 처리
+# - 워커는 단위를 몇 개씩 임대(lease_until)하고 처리 중에는 주기적으로 연장
+#   → 워커가 죽으면 임대가 만료되어 다른 워커가 다시 가져감 (최대 CRAWL_MAX_ATTEMPTS회)
+# - 결과는 DB에 모아 두고, 날짜의 모든 단위가 끝나면 한 워커가 쓰기 잠금 안에서 날짜별로 병합·저장
+# - 같은 DB 파일을 여는 프로세스면 어디서든 워커가 될 수 있음 (로컬 디스크 권장, 네트워크 파일시스템 X)
+CRAWL_QUEUE_PATH = os.environ.get("CRAWL_QUEUE_PATH", str(DATA_DIR / "crawl_queue.sqlite3"))
+CRAWL_LEASE_SEC = float(os.environ.get("CRAWL_LEASE_SEC", 120))      # 임대 유효 시간 (처리 중엔 1/3마다 연장)
+CRAWL_LEASE_BATCH = int(os.environ.get("CRAWL_LEASE_BATCH", 16))     # 한 번에 임대할 단위 수
+CRAWL_MAX_ATTEMPTS = int(os.environ.get("CRAWL_MAX_ATTEMPTS", 3))    # 실패/임대 만료 허용 횟수
+CRAWL_POLL_SEC = float(os.environ.get("CRAWL_POLL_SEC", 2))          # 할 일이 없을 때 대기 간격
+CRAWL_KEEP_ROUNDS = int(os.environ.get("CRAWL_KEEP_ROUNDS", 5))      # DB에 남겨 둘 지난 라운드 수
+
+READY, LEASED, DONE, FAILED = "ready", "leased", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    dates TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    round INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    date TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'ready',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    items TEXT,
+    error TEXT,
+    UNIQUE (round, source, target, date)
+);
+CREATE INDEX IF NOT EXISTS units_by_state ON units (round, state, priority);
+CREATE TABLE IF NOT EXISTS merges (
+    round INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (round, source, date)
+);
+CREATE TABLE IF NOT EXISTS freshness (
+    source TEXT NOT NULL,
+    club TEXT NOT NULL,
+    date TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    unchanged INTEGER NOT NULL,
+    PRIMARY KEY (source, club, date)
+);
+"""
+
+Unit = Tuple[int, str, str, str]  # (id, source, target, date)
+
+class CrawlQueue:
+    """
+    - 모든 상태 변경은 BEGIN IMMEDIATE 트랜잭션 (여러 프로세스가 동시에 써도 한 번에 하나씩)
+    - start_round: 진행 중 라운드가 없고 직전 라운드 종료 후 interval이 지났으면 재수집 주기가 된 단위로 새 라운드
+    - lease / extend / finish / release: 임대 → 연장 → 완료(또는 실패·반납)
+    - merge_ready: 모든 단위가 끝난 날짜(Golfpang은 전체 섹터)를 publish로 병합, 라운드 종료 처리
+    - 재수집 주기(RefreshScheduler) 기록은 freshness 테이블에 보관 → 어느 워커가 라운드를 만들어도 같은 판단
+    """
+
+    def __init__(self, path: str = CRAWL_QUEUE_PATH, max_attempts: int = CRAWL_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()  # 연결 하나를 작업 스레드/임대 연장 스레드가 같이 씀
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _tx(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _open_round(conn) -> Optional[Tuple[int, List[str]]]:
+        row = conn.execute("SELECT id, dates FROM rounds WHERE finished_at IS NULL ORDER BY id LIMIT 1").fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    # ── 재수집 주기 기록 (freshness ↔ RefreshScheduler) ──
+    @staticmethod
+    def _scheduler(conn, where: str = "", params: Sequence = ()) -> RefreshScheduler:
+        sched = RefreshScheduler()
+        for source, club, date_str, fetched_at, digest, unchanged in conn.execute(
+                "SELECT source, club, date, fetched_at, digest, unchanged FROM freshness " + where, params):
+            sched.state[(source, club, date_str)] = {"fetched_at": fetched_at, "digest": digest, "unchanged": unchanged}
+        return sched
+
+    @staticmethod
+    def _save_freshness(conn, sched: RefreshScheduler, keys):
+        conn.executemany(
+            "INSERT OR REPLACE INTO freshness (source, club, date, fetched_at, digest, unchanged) VALUES (?, ?, ?, ?, ?, ?)",
+            [(*k, sched.state[k]["fetched_at"], sched.state[k]["digest"], sched.state[k]["unchanged"]) for k in keys])
+
+    # ── 라운드 ──
+    def start_round(self, date_strs: List[str], clubs: Sequence[Dict], sectors: Sequence[int],
+                    interval: float, force: bool = False) -> Optional[int]:
+        # 새로 만든 라운드 번호 (진행 중이거나 아직 간격이 안 됐거나 할 일이 없으면 None)
+        now = time.time()
+        with self._tx() as conn:
+            if self._open_round(conn):
+                return None
+            last = conn.execute("SELECT MAX(finished_at) FROM rounds").fetchone()[0]
+            if not force and last and now - last < interval:
+                return None
+            conn.execute("DELETE FROM freshness WHERE date NOT IN (%s)" % ",".join("?" * (len(date_strs) + 1)),
+                         (*date_strs, ALL))
+            sched = self._scheduler(conn)
+            units = []
+            if sched.is_due("golfpang", ALL, ALL, now):
+                units += [("golfpang", str(s), ALL, 0) for s in sectors]  # 오래 걸리므로 먼저 임대되도록
+            for i, d in enumerate(date_strs):
+                units += [("teescan", c["name"], d, i + 1) for c in clubs if sched.is_due("teescan", c["name"], d, now)]
+            if not units:
+                return None
+            cur = conn.execute("INSERT INTO rounds (dates, created_at) VALUES (?, ?)", (json.dumps(date_strs), now))
+            round_id = cur.lastrowid
+            conn.executemany("INSERT INTO units (round, source, target, date, priority) VALUES (?, ?, ?, ?, ?)",
+                             [(round_id, *u) for u in units])
+            # 지난 라운드 정리
+            conn.execute("DELETE FROM units WHERE round <= ?", (round_id - CRAWL_KEEP_ROUNDS,))
+            conn.execute("DELETE FROM merges WHERE round <= ?", (round_id - CRAWL_KEEP_ROUNDS,))
+            conn.execute("DELETE FROM rounds WHERE id <= ?", (round_id - CRAWL_KEEP_ROUNDS,))
+        log.info("🧩 크롤링 라운드 생성", round=round_id, units=len(units), days=len(date_strs))
+        return round_id
+
+    # ── 임대 ──
+    def lease(self, owner: str, n: int = CRAWL_LEASE_BATCH,
+              lease_sec: float = CRAWL_LEASE_SEC) -> Tuple[List[Unit], List[str]]:
+        # → (임대한 단위들, 라운드 날짜 목록). 만료된 임대는 다시 가져오고, 시도 횟수를 넘긴 단위는 실패 처리
+        now = time.time()
+        with self._tx() as conn:
+            open_round = self._open_round(conn)
+            if not open_round:
+                return [], []
+            round_id, dates = open_round
+            conn.execute("UPDATE units SET state = ?, owner = NULL, error = 'lease expired' "
+                         "WHERE round = ? AND state = ? AND lease_until < ? AND attempts >= ?",
+                         (FAILED, round_id, LEASED, now, self.max_attempts))
+            rows = conn.execute(
+                "SELECT id, source, target, date, state, owner FROM units "
+                "WHERE round = ? AND (state = ? OR (state = ? AND lease_until < ?)) ORDER BY priority, id LIMIT ?",
+                (round_id, READY, LEASED, now, n)).fetchall()
+            conn.executemany("UPDATE units SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                             [(LEASED, owner, now + lease_sec, r[0]) for r in rows])
+        expired = {r[5] for r in rows if r[4] == LEASED}
+        if expired:
+            log.warning("♻️ 만료된 임대 회수 (워커 중단 추정)", owners=",".join(sorted(expired)),
+                        units=sum(1 for r in rows if r[4] == LEASED))
+        return [tuple(r[:4]) for r in rows], dates
+
+    def extend(self, owner: str, ids: Sequence[int], lease_sec: float = CRAWL_LEASE_SEC):
+        if not ids:
+            return
+        with self._tx() as conn:
+            conn.executemany("UPDATE units SET lease_until = ? WHERE id = ? AND owner = ? AND state = ?",
+                             [(time.time() + lease_sec, i, owner, LEASED) for i in ids])
+
+    def finish(self, owner: str, results: Sequence[Tuple[int, object, Optional[str]]]):
+        # results: (단위 id, 결과 또는 None, 오류 메시지) — 임대를 잃은 단위(다른 워커가 회수)는 무시
+        with self._tx() as conn:
+            for unit_id, items, error in results:
+                if error is None:
+                    conn.execute("UPDATE units SET state = ?, items = ?, error = NULL "
+                                 "WHERE id = ? AND owner = ? AND state = ?",
+                                 (DONE, json.dumps(items, ensure_ascii=False, separators=(",", ":")),
+                                  unit_id, owner, LEASED))
+                else:
+                    conn.execute("UPDATE units SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                                 "owner = NULL, error = ? WHERE id = ? AND owner = ? AND state = ?",
+                                 (self.max_attempts, FAILED, READY, error, unit_id, owner, LEASED))
+
+    def release(self, owner: str, ids: Sequence[int]):
+        # 처리하지 못한 단위 반납 (회로 열림 등) — 시도 횟수에서 제외
+        with self._tx() as conn:
+            conn.executemany("UPDATE units SET state = ?, owner = NULL, attempts = attempts - 1 "
+                             "WHERE id = ? AND owner = ? AND state = ?", [(READY, i, owner, LEASED) for i in ids])
+
+    # ── 병합 ──
+    def merge_ready(self, publish: PublishFn) -> Optional[int]:
+        # 끝난 날짜를 병합하고, 라운드가 모두 끝났으면 그 라운드 번호를 반환
+        with self._tx() as conn:
+            open_round = self._open_round(conn)
+            if not open_round:
+                return None
+            round_id, dates = open_round
+            merged = {(s, d) for s, d in conn.execute("SELECT source, date FROM merges WHERE round = ?", (round_id,))}
+            pending = {(s, d): n for s, d, n in conn.execute(
+                "SELECT source, date, SUM(state IN (?, ?)) FROM units WHERE round = ? GROUP BY source, date",
+                (READY, LEASED, round_id))}
+            for (source, date_str), n_open in sorted(pending.items()):
+                if n_open or (source, date_str) in merged:
+                    continue
+                self._merge(conn, round_id, source, date_str, dates, publish)
+                conn.execute("INSERT INTO merges (round, source, date) VALUES (?, ?, ?)", (round_id, source, date_str))
+            if any(pending.values()):
+                return None
+            conn.execute("UPDATE rounds SET finished_at = ? WHERE id = ?", (time.time(), round_id))
+            counts = dict(conn.execute("SELECT state, COUNT(*) FROM units WHERE round = ? GROUP BY state", (round_id,)))
+            created = conn.execute("SELECT created_at FROM rounds WHERE id = ?", (round_id,)).fetchone()[0]
+        log.info("🏁 크롤링 라운드 완료", round=round_id, seconds=round(time.time() - created, 1), **counts)
+        return round_id
+
+    def _merge(self, conn, round_id: int, source: str, date_str: str, dates: List[str], publish: PublishFn):
+        rows = conn.execute("SELECT target, items FROM units WHERE round = ? AND source = ? AND date = ? AND state = ?",
+                            (round_id, source, date_str, DONE)).fetchall()
+        if not rows:
+            log.warning("⚠️ 전 단위 실패 → 기존 스냅샷 유지", source=source, date=date_str)
+            return
+        sched = self._scheduler(conn, "WHERE source = ? AND date = ?", (source, date_str))
+        if source == "golfpang":
+            # 섹터 결과({날짜: 항목})를 날짜별로 합쳐 라운드 전체 날짜에 게시
+            # 전 섹터 성공이면 Golfpang 몫 전체 교체, 실패(시도 초과) 섹터가 있으면 성공 섹터 구장 몫만 교체
+            total = conn.execute("SELECT COUNT(*) FROM units WHERE round = ? AND source = ? AND date = ?",
+                                 (round_id, source, date_str)).fetchone()[0]
+            by_date = {d: [] for d in dates}
+            for _, items in rows:
+                for d, its in json.loads(items).items():
+                    by_date.setdefault(d, []).extend(its)
+            clubs = None
+            if len(rows) < total:
+                clubs = {it["golf"] for its in by_date.values() for it in its}
+                log.warning("⚠️ Golfpang 일부 섹터 실패 → 성공 구장만 교체", round=round_id, ok=len(rows), total=total)
+            for d in dates:
+                publish(d, "golfpang", by_date[d], clubs)
+            keys = []
+            if clubs is None:  # 실패가 섞였으면 신선도를 기록하지 않아 다음 라운드에 바로 재수집
+                sched.record("golfpang", ALL, ALL, [it for d in dates for it in by_date[d]])
+                keys = [("golfpang", ALL, ALL)]
+        else:
+            items, clubs = [], set()
+            for club, its in rows:
+                its = json.loads(its)
+                items += its
+                clubs.add(club)
+                sched.record("teescan", club, date_str, its)
+            publish(date_str, "teescan", items, clubs)
+            keys = [("teescan", c, date_str) for c in clubs]
+        self._save_freshness(conn, sched, keys)
+        conn.execute("UPDATE units SET items = NULL WHERE round = ? AND source = ? AND date = ?",
+                     (round_id, source, date_str))
+
+    def open_round_id(self) -> Optional[int]:
+        with self._lock:
+            open_round = self._open_round(self._conn)
+        return open_round[0] if open_round else None
+
+    def round_finished(self, round_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT finished_at FROM rounds WHERE id = ?", (round_id,)).fetchone()
+        return row is None or row[0] is not None
+
+    def status(self) -> Dict:
+        with self._lock:
+            row = self._conn.execute("SELECT id, created_at, finished_at FROM rounds ORDER BY id DESC LIMIT 1").fetchone()
+            if not row:
+                return {"round": None}
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM units WHERE round = ? GROUP BY state", (row[0],)))
+            owners = [o for (o,) in self._conn.execute(
+                "SELECT DISTINCT owner FROM units WHERE round = ? AND state = ?", (row[0], LEASED))]
+        return {"round": row[0], "created_at": row[1], "finished_at": row[2], "units": counts, "owners": owners}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 샤드 워커: 임대 → 수집 → 완료 보고 → 병합을 반복
+class ShardWorker:
+    """
+    - 한 프로세스 = 한 워커 (owner = 호스트:pid). 임대한 단위는 스레드 풀(TEESCAN_WORKERS)에서 수집
+    - 업스트림 속도 제어(RATES)와 회로 차단기(BREAKERS)는 프로세스별 — 워커를 늘리면 총 요청 속도도 늘어남
+    - 회로가 열린 소스의 단위는 시도 횟수를 쓰지 않고 반납
+    - Golfpang 섹터 요청이 실패하면(SectorFetchError) 단위를 실패로 보고 → 재임대, 빈 결과로 완료 처리하지 않음
+    """
+
+    def __init__(self, queue: CrawlQueue, publish: PublishFn, owner: str = None,
+                 batch: int = CRAWL_LEASE_BATCH, lease_sec: float = CRAWL_LEASE_SEC):
+        self.queue = queue
+        self.publish = publish
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch = batch
+        self.lease_sec = lease_sec
+        self.workers = max(1, cu.TEESCAN_WORKERS)
+        self._session = cu._make_session(retries=cu.TEESCAN_RETRIES, pool_maxsize=self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shard")
+
+    def _fetch(self, unit: Unit, dates: List[str]):
+        _, source, target, date_str = unit
+        breaker = BREAKERS[source]
+        if not breaker.allowed():
+            raise CircuitOpenError(source)
+        try:
+            if source == "golfpang":
+                result = cu.crawl_golfpang_multi(dates, [], [int(target)])
+            else:
+                result = cu._fetch_teescan(self._session, BY_NAME[target], date_str, True)
+        except Exception:
+            breaker.on_failure()
+            raise
+        breaker.on_success()
+        return result
+
+    def run_batch(self) -> int:
+        # 임대한 단위 수 반환 (0이면 지금은 할 일 없음)
+        units, dates = self.queue.lease(self.owner, self.batch, self.lease_sec)
+        if not units:
+            return 0
+        stop = threading.Event()
+
+        def _heartbeat():
+            while not stop.wait(self.lease_sec / 3):
+                self.queue.extend(self.owner, [u[0] for u in units], self.lease_sec)
+
+        hb = threading.Thread(target=_heartbeat, name="lease-heartbeat", daemon=True)
+        hb.start()
+        try:
+            futures = [(u, self._executor.submit(self._fetch, u, dates)) for u in units]
+            results, released = [], []
+            for unit, fut in futures:
+                try:
+                    results.append((unit[0], fut.result(), None))
+                except CircuitOpenError:
+                    released.append(unit[0])
+                except Exception as e:
+                    results.append((unit[0], None, str(e) or type(e).__name__))
+        finally:
+            stop.set()
+        self.queue.finish(self.owner, results)
+        if released:
+            self.queue.release(self.owner, released)
+        return len(units)
+
+    def run(self, date_fn: Callable[[], List[str]], interval: float, once: bool = False,
+            on_round_done: Callable[[List[str]], None] = None, sectors: Sequence[int] = None):
+        """
+        - date_fn(): 이번 라운드 날짜 목록, interval: 라운드 종료 후 다음 라운드까지 최소 간격(초)
+        - once=True면 현재(또는 새로 만든) 라운드가 끝나면 종료 (벤치마크/단발 실행용)
+        """
+        log.info("🧵 샤드 워커 시작", owner=self.owner, queue=self.queue.path)
+        clubs = cu._teescan_clubs()
+        sectors = list(sectors or cu.SECTORS)
+        target = None
+        if once:
+            target = self.queue.start_round(date_fn(), clubs, sectors, interval, force=True) or self.queue.open_round_id()
+        while True:
+            if not once:
+                self.queue.start_round(date_fn(), clubs, sectors, interval)
+            n = self.run_batch()
+            done = self.queue.merge_ready(self.publish)
+            if done and on_round_done:
+                on_round_done(date_fn())
+            if n:
+                continue
+            if once and (target is None or self.queue.round_finished(target)):
+                break
+            time.sleep(CRAWL_POLL_SEC)
+        self._executor.shutdown(wait=False)
+        self._session.close()
@@ -1,56 +1,109 @@
 from datetime import datetime, timedelta
-from pathlib import Path
-import json, os, sys, time, traceback
+import argparse, os, subprocess, sys, time
 
-from crawler_utils import crawl_teescan, crawl_golfpang, GOLF_CLUBS
+from crawl_orchestrator import run_refresh, merge_source_items
+from refresh_scheduler import RefreshScheduler
+from crawl_queue import CrawlQueue, ShardWorker
+from snapshot_store import SnapshotStore
+from applog import get_logger
 
 # ────────────────────────────── 설정 ──────────────────────────────
-DATA_DIR   = Path("data"); DATA_DIR.mkdir(exist_ok=True)
-MAX_DAYS   = 18            # 오늘부터 10일치
-INTERVAL   = 9000          # 11분(초)
+STORE      = SnapshotStore()      # data/<date>.json (DATA_DIR) — 웹 서비스와 공유
+MAX_DAYS   = int(os.environ.get("CRAWLER_DAYS", 18))  # 오늘부터 수집할 날짜 수
 FAVORITES  = []           # 추후 환경변수 등으로 주입 가능
+SCHEDULER  = RefreshScheduler()   # 날짜 구간별 재수집 주기 (REFRESH_POLICY)
+INTERVAL   = int(os.environ.get("CRAWLER_INTERVAL", SCHEDULER.policy.min_interval()))  # 라운드 간격(초)
+
+log        = get_logger("crawler")  # LOG_LEVEL / LOG_FORMAT (applog.py)
 
 # ────────────────────────────── 함수 ──────────────────────────────
-def log(msg, level="INFO"):
-    ts = datetime.now().strftime("%H:%M:%S")
-    print(f"[{level}] {ts}  {msg}", flush=True)
 
-def crawl_date(date_str: str):
+def load_date(date_str: str):
+    try:
+        return STORE.read(date_str) or []
+    except Exception as e:
+        log.warning("읽기 실패", date=date_str, error=e)
+        return []
+
+def save_date(date_str: str, source: str, items, clubs=None):
+    # 소스별 결과가 나오는 즉시 해당 날짜 파일에서 그 소스(구장) 몫만 교체
     try:
-        items = crawl_teescan(date_str, FAVORITES) + crawl_golfpang(date_str, FAVORITES)
-        (DATA_DIR / f"{date_str}.json").write_text(
-            json.dumps(items, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
-        log(f"{date_str}.json 저장 완료  ({len(items)}건)")
+        merged = merge_source_items(load_date(date_str), source, items, clubs)
+        STORE.write(date_str, merged)  # compact JSON + 원자적 교체
+        log.debug("저장 완료", date=date_str, source=source, items=len(items), total=len(merged))
     except Exception as e:
-        log(f"{date_str} 수집 실패 → {e}", level="ERROR")
-        traceback.print_exc()
+        log.error("저장 실패", exc_info=True, date=date_str, error=e)
+        return False  # 오케스트레이터가 신선도를 기록하지 않도록
+
+def crawl_dates(date_strs, scheduler=None):
+    # Teescan/Golfpang 동시 수집 (crawl_orchestrator), scheduler가 있으면 증분 수집
+    try:
+        run_refresh(date_strs, save_date, favorite=FAVORITES, scheduler=scheduler)
+    except Exception as e:
+        log.error("수집 실패", exc_info=True, error=e)
+
+def crawl_date(date_str: str):
+    crawl_dates([date_str])
+
+def window():
+    today = datetime.now().date()
+    return [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(MAX_DAYS)]
 
 def loop():
-    log("크롤러 루프 시작!")
+    log.info("크롤러 루프 시작!")
     try:
         while True:
             start_ts = time.time()
 
-            today = datetime.now().date()
-            for i in range(MAX_DAYS):
-                crawl_date((today + timedelta(days=i)).strftime("%Y-%m-%d"))
+            date_strs = window()
+            crawl_dates(date_strs, scheduler=SCHEDULER)
+            STORE.prune(keep_from=date_strs[0])
+            log.info("라운드 완료", days=len(date_strs), seconds=round(time.time() - start_ts, 1))
 
             # ── 다음 루프까지 남은 시간 계산 (드리프트 방지) ──
             elapsed = time.time() - start_ts
             sleep_sec = max(0, INTERVAL - elapsed)
-            log(f"🕑 {sleep_sec:0.1f}초 뒤 다음 라운드")
+            log.info("🕑 다음 라운드 대기", sleep_sec=round(sleep_sec, 1))
             time.sleep(sleep_sec)
     except KeyboardInterrupt:
-        log("KeyboardInterrupt → 크롤러 종료")
+        log.info("KeyboardInterrupt → 크롤러 종료")
     except Exception as e:
-        log(f"치명적 오류: {e}", level="ERROR")
-        traceback.print_exc()
+        log.error("치명적 오류", exc_info=True, error=e)
+
+def shard(once: bool = False):
+    # 샤딩 모드: 같은 큐(CRAWL_QUEUE_PATH)를 여는 워커들이 (소스, 구장/섹터, 날짜) 단위를 나눠 수집
+    worker = ShardWorker(CrawlQueue(), save_date)
+    try:
+        worker.run(window, INTERVAL, once=once,
+                   on_round_done=lambda date_strs: STORE.prune(keep_from=date_strs[0]))
+    except KeyboardInterrupt:
+        log.info("KeyboardInterrupt → 샤드 워커 종료")
+
+def spawn_shards(n: int, once: bool = False):
+    # 한 머신에서 워커 n개 실행 (각자 별도 프로세스 — 하나가 죽어도 나머지가 임대 만료분을 회수)
+    cmd = [sys.executable, os.path.abspath(__file__), "--shard"] + (["--once"] if once else [])
+    procs = [subprocess.Popen(cmd) for _ in range(n)]
+    log.info("샤드 워커 실행", workers=n, pids=",".join(str(p.pid) for p in procs))
+    try:
+        for p in procs:
+            p.wait()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
 
 # ────────────────────────────── CLI 진입점 ──────────────────────────────
 if __name__ == "__main__":
-    if len(sys.argv) == 2:
-        crawl_date(sys.argv[1])          # 예: python crawler.py 2025-07-15
+    ap = argparse.ArgumentParser(description="tee-time crawler")
+    ap.add_argument("date", nargs="?", help="한 날짜만 수집 (예: 2025-07-15)")
+    ap.add_argument("--shard", action="store_true", help="작업 큐를 나눠 쓰는 샤드 워커로 실행")
+    ap.add_argument("--workers", type=int, default=1, help="--shard: 이 머신에서 띄울 워커 프로세스 수")
+    ap.add_argument("--once", action="store_true", help="--shard: 라운드 하나가 끝나면 종료")
+    args = ap.parse_args()
+    if args.date:
+        crawl_date(args.date)            # 예: python crawler.py 2025-07-15
+    elif args.shard and args.workers > 1:
+        spawn_shards(args.workers, args.once)
+    elif args.shard:
+        shard(args.once)
     else:
         loop()
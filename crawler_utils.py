@@ -1,30 +1,36 @@
-import requests, json, os, time, re
-from bs4 import BeautifulSoup
+import requests, os
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 import urllib3
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from golfpang_parser import GOLFPANG_BASE, parse_page as _parse_golfpang_page
+from club_registry import TEESCAN_CLUBS, canonicalize_items, club_id_set, resolve_club  # 구장 정보 (1회 로딩)
+from metrics import CRAWL_ERRORS, CRAWL_ITEMS, CRAWL_REQUEST_SECONDS, HTTP_RETRIES
+from applog import get_logger
+from rate_control import THROTTLE_STATUSES, RateController
+from fingerprint_store import FingerprintStore
 
-# ─────────────────────────────────────────────────────────────────────────────
-# 구장 정보 로딩
-base_dir = os.path.dirname(__file__)
-golf_club_path = os.path.join(base_dir, "static", "golf_clubs.json")
-with open(golf_club_path, "r", encoding="utf-8") as f:
-    GOLF_CLUBS = json.load(f)
+log = get_logger("crawler_utils")
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 공통 유틸
-GOLFPANG_BASE = "https://www.golfpang.com"
-LIST_URL = f"{GOLFPANG_BASE}/web/round/booking_list.do"
+LIST_URL = os.environ.get("GPANG_LIST_URL", f"{GOLFPANG_BASE}/web/round/booking_list.do")  # 벤치마크 대역 서버로 바꿀 때
 SECTORS = [5, 4, 8]  # 경기/충청/강원
 
 # 환경변수로 세부 튜닝
 MAX_PAGES_PER_SECTOR = int(os.environ.get("GPANG_MAX_PAGES", 5))
 CONNECT_TIMEOUT = int(os.environ.get("GPANG_CONNECT_TIMEOUT", 5))
 READ_TIMEOUT = int(os.environ.get("GPANG_READ_TIMEOUT", 20))
-SLEEP_BETWEEN = float(os.environ.get("GPANG_SLEEP", 0.6))
+GPANG_RETRIES = int(os.environ.get("GPANG_RETRIES", 3))          # 429/5xx/타임아웃 재시도 횟수
+# 페이지 간 고정 대기(GPANG_SLEEP) 대신 적응형 속도 제어: 시작 → 정상 응답이면 상한까지 증가
+GPANG_START_RPS = float(os.environ.get("GPANG_START_RPS", 1 / float(os.environ.get("GPANG_SLEEP", 0.6))))
+GPANG_MAX_RPS = float(os.environ.get("GPANG_MAX_RPS", 4))
+GPANG_MIN_RPS = float(os.environ.get("GPANG_MIN_RPS", 0.2))
 
 HEADERS_HTML = {
     "User-Agent": os.environ.get(
@@ -36,166 +42,218 @@ HEADERS_HTML = {
     "Referer": f"{GOLFPANG_BASE}/web/round/booking.do",
 }
 
-def _make_session() -> requests.Session:
+class _CountingRetry(Retry):
+    # urllib3 재시도 판단(마지막 소진 포함)마다 (호스트, 사유)별로 집계
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        reason = str(response.status) if response is not None else type(error).__name__ if error else "unknown"
+        HTTP_RETRIES.inc(getattr(_pool, "host", "") or "", reason)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+def _make_session(retries: int = 6, pool_maxsize: int = 40) -> requests.Session:
+    # 어댑터는 연결 실패만 재시도 — 429/5xx/읽기 타임아웃은 _get이 속도 제어기를 거쳐 재시도
     s = requests.Session()
-    retry = Retry(
-        total=6, connect=6, read=6, backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
+    retry = _CountingRetry(
+        total=retries, connect=retries, read=0, status=0, backoff_factor=0.5,
         allowed_methods=["GET"],
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=40)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=pool_maxsize)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
 
-def _parse_price(txt: str) -> int:
-    digits = re.sub(r"[^0-9]", "", txt or "")
-    return int(digits) if digits else 10**12
-
-def _parse_hour_num(hour_text: str) -> int:
-    m = re.search(r"(\d{1,2})", hour_text or "")
-    return int(m.group(1)) if m else -1
+def _get(session: requests.Session, source: str, url: str, retries: int, **kwargs) -> requests.Response:
+    """
+    - RATES[source] 토큰을 받은 뒤 요청하고, 응답 상태/Retry-After/타임아웃을 제어기에 알림
+    - 429/5xx/타임아웃은 retries회까지 재시도 (대기는 제어기가 결정)
+    - 마지막 시도의 응답을 그대로 반환 (상태 코드 판단은 호출 측)
+    - 재시도마다 HTTP_RETRIES(호스트, 사유)를 올림 (어댑터의 연결 재시도는 _CountingRetry가 집계)
+    """
+    ctrl = RATES[source]
+    host = urlsplit(url).hostname or ""
+    for attempt in range(retries + 1):
+        ctrl.acquire()
+        try:
+            r = session.get(url, **kwargs)
+        except requests.exceptions.Timeout as e:
+            ctrl.on_timeout()
+            # 연결 타임아웃은 어댑터가 이미 재시도했으므로 바로 전달
+            if attempt == retries or isinstance(e, requests.exceptions.ConnectTimeout):
+                raise
+            HTTP_RETRIES.inc(host, type(e).__name__)
+            continue
+        ctrl.on_response(r.status_code, r.headers.get("Retry-After"))
+        if r.status_code not in THROTTLE_STATUSES or attempt == retries:
+            return r
+        HTTP_RETRIES.inc(host, str(r.status_code))
+    return r
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Teescan (기존 로직 유지, 사소한 안정화만)
-def crawl_teescan(date_str: str, favorite: List[str]):
-    url_tpl = (
-        "https://foapi.teescanner.com/v1/booking/getTeeTimeListbyGolfclub"
-        "?golfclub_seq={seq}&roundDay=" + date_str + "&orderType="
-    )
-    headers = {"User-Agent": "Mozilla/5.0"}
-    res: List[Dict] = []
-    visited = set()
+# Teescan — (구장, 날짜) 작업 큐를 공용 세션 + 제한된 워커 풀로 병렬 처리
+TEESCAN_URL = os.environ.get("TEESCAN_URL", "https://foapi.teescanner.com/v1/booking/getTeeTimeListbyGolfclub")
+TEESCAN_HEADERS = {"User-Agent": "Mozilla/5.0"}
+TEESCAN_WORKERS = int(os.environ.get("TEESCAN_WORKERS", 8))       # 동시 요청 수
+TEESCAN_MAX_RPS = float(os.environ.get("TEESCAN_MAX_RPS", 20))    # 적응형 속도 상한 (0이면 무제한)
+TEESCAN_START_RPS = float(os.environ.get("TEESCAN_START_RPS", 10))
+TEESCAN_MIN_RPS = float(os.environ.get("TEESCAN_MIN_RPS", 1))
+TEESCAN_TIMEOUT = int(os.environ.get("TEESCAN_TIMEOUT", 6))
+TEESCAN_RETRIES = int(os.environ.get("TEESCAN_RETRIES", 2))
 
-    for club in GOLF_CLUBS:
-        name = club.get("name")
-        if not name or name in visited:
-            continue
-        visited.add(name)
+# 업스트림별 공유 속도 제어기 (요청 스레드/라운드 간 상태 유지, 회로 차단기는 crawl_orchestrator가 연결)
+RATES = {
+    "teescan": RateController("teescan", TEESCAN_MAX_RPS, TEESCAN_MIN_RPS, TEESCAN_START_RPS,
+                              burst=max(1, TEESCAN_WORKERS)),
+    "golfpang": RateController("golfpang", GPANG_MAX_RPS, GPANG_MIN_RPS, GPANG_START_RPS),
+}
 
-        seq = club.get("seq")
-        if not seq:
-            continue
+# (source, 요청 키) → 본문 해시/ETag + 파싱 결과 — 내용이 그대로면 재파싱 생략
+FINGERPRINTS = FingerprintStore()
 
-        try:
-            r = requests.get(url_tpl.format(seq=seq), headers=headers, timeout=6)
-            items = r.json().get("data", {}).get("teeTimeList", [])
-            print(f"[Teescan] {name} {date_str} ▶ {len(items)}")
-            for it in items:
-                price = int(it.get("price", 10**12))
-                h = int(str(it.get("teetime_time", "00")).split(":")[0])
-                res.append({
-                    "golf": name,
-                    "date": date_str,
-                    "hour": f"{h:02d}시대",
-                    "hour_num": h,
-                    "price": price,
-                    "benefit": "",
-                    "url": "https://www.teescanner.com/",
-                    "source": "teescan",
-                })
-        except Exception as e:
-            print(f"[Teescan] {name} 오류: {e}")
+def _teescan_clubs() -> List[Dict]:
+    # 이름 중복/seq 없는 구장 제외 (club_registry에서 미리 계산)
+    return list(TEESCAN_CLUBS)
+
+def _parse_teescan(r: requests.Response, name: str, date_str: str) -> List[Dict]:
+    res: List[Dict] = []
+    for it in r.json().get("data", {}).get("teeTimeList", []):
+        price = int(it.get("price", 10**12))
+        h = int(str(it.get("teetime_time", "00")).split(":")[0])
+        res.append({
+            "golf": name,
+            "date": date_str,
+            "hour": f"{h:02d}시대",
+            "hour_num": h,
+            "price": price,
+            "benefit": "",
+            "url": "https://www.teescanner.com/",
+            "source": "teescan",
+        })
+    return res
+
+def _fetch_teescan(session: requests.Session, club: Dict, date_str: str, strict: bool = False) -> List[Dict]:
+    name = club["name"]
+    params = {"golfclub_seq": club["seq"], "roundDay": date_str, "orderType": ""}
+    key = ("teescan", club["seq"], name, date_str)  # 항목에 구장명이 들어가므로 이름까지 키에 포함
+    res: List[Dict] = []
+    try:
+        headers = {**TEESCAN_HEADERS, **FINGERPRINTS.conditional_headers(key)}
+        with CRAWL_REQUEST_SECONDS.time("teescan", name):
+            r = _get(session, "teescan", TEESCAN_URL, TEESCAN_RETRIES,
+                     params=params, headers=headers, timeout=TEESCAN_TIMEOUT)
+        if r.status_code not in (200, 304):
+            CRAWL_ERRORS.inc("teescan", "http")
+            r.raise_for_status()
+        res, result = FINGERPRINTS.resolve(key, r, lambda resp: _parse_teescan(resp, name, date_str))
+        log.debug("[Teescan] 응답", club=name, date=date_str, items=len(res), content=result)
+        CRAWL_ITEMS.inc("teescan", amount=len(res))
+    except Exception as e:
+        CRAWL_ERRORS.inc("teescan", "timeout" if isinstance(e, requests.exceptions.Timeout) else "error")
+        log.warning("[Teescan] 오류", club=name, date=date_str, error=e)
+        if strict:
+            raise  # 호출 측(회로 차단기)이 실패를 집계하도록 전달
     return res
 
+def crawl_teescan_multi(date_strs: List[str], favorite: List[str], max_workers: int = None) -> Dict[str, List[Dict]]:
+    """
+    - (구장, 날짜) 작업 전체를 keep-alive 공용 세션과 워커 풀로 병렬 수집
+    - 워커 수는 TEESCAN_WORKERS, 요청 속도는 RATES["teescan"]이 응답 상태에 맞춰 조절
+    - 결과는 날짜별 dict, 각 날짜 안에서는 GOLF_CLUBS 순서 유지
+    """
+    workers = max(1, max_workers or TEESCAN_WORKERS)
+    clubs = _teescan_clubs()
+    jobs = [(club, d) for d in date_strs for club in clubs]
+    out: Dict[str, List[Dict]] = {d: [] for d in date_strs}
+
+    with _make_session(retries=TEESCAN_RETRIES, pool_maxsize=workers) as s:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="teescan") as ex:
+            # map은 입력 순서대로 결과를 돌려주므로 기존 출력 순서가 그대로 유지됨
+            results = ex.map(lambda job: _fetch_teescan(s, *job), jobs)
+            for (club, d), items in zip(jobs, results):
+                out[d].extend(items)
+    return out
+
+def crawl_teescan(date_str: str, favorite: List[str]):
+    """
+    - 단일 날짜용 호환 래퍼 (crawl_teescan_multi 한 날짜 버전)
+    """
+    return crawl_teescan_multi([date_str], favorite)[date_str]
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Golfpang — booking_list.do (HTML) 섹터 5,4,8만 순회
-def crawl_golfpang(date_str: str, favorite: List[str]):
+class SectorFetchError(RuntimeError):
+    """섹터 순회 중 요청/파싱 실패 — 결과가 불완전하므로 호출 측은 기존 캐시를 유지해야 함"""
+
+    def __init__(self, sectors: List[int], partial: Dict[str, List[Dict]]):
+        super().__init__(f"golfpang sectors failed: {sectors}")
+        self.sectors = sectors
+        self.partial = partial  # 실패 전까지 모은 결과 (벤치마크 집계용)
+
+def crawl_golfpang_multi(date_strs: List[str], favorite: List[str], sectors: List[int] = None) -> Dict[str, List[Dict]]:
     """
-    - 섹터 5,4,8만 순회하며 booking_list.do(HTML)를 페이지별로 파싱
-    - 페이지에 아이템이 없으면 해당 섹터 종료
-    - date_str 정확히 일치하는 항목만 반환
-    - favorite가 주어지면 구장명 부분일치 필터
+    - 섹터/페이지를 한 번씩만 받아 한 번만 파싱하고, 결과를 날짜별로 나눠 반환
+    - date_strs에 포함된 날짜 항목만 담고, 결과가 없는 날짜도 빈 리스트로 채움
+    - 페이지에 요청 구간의 아이템이 하나도 없으면 해당 섹터 종료
+    - 구장명은 파싱 직후 대표 구장명으로 정규화 ("세현CC" → "세현", Teescan과 같은 표기)
+    - favorite가 주어지면 대표 구장 id 집합으로 필터
+    - 한 섹터라도 페이지 요청이 실패하면 SectorFetchError (빈/부분 결과로 캐시를 지우지 않도록)
     """
-    out: List[Dict] = []
+    wanted = set(date_strs)
+    failed: List[int] = []
+    favorite_ids = club_id_set(favorite)
+    out: Dict[str, List[Dict]] = {d: [] for d in date_strs}
     with _make_session() as s:
-        for sector in SECTORS:
+        for sector in (sectors or SECTORS):
             for page in range(1, MAX_PAGES_PER_SECTOR + 1):
                 params = {"sector": sector, "page": page}
+                key = ("golfpang", sector, page)
                 try:
-                    print(f"[Golfpang] GET {LIST_URL}?sector={sector}&page={page}")
-                    r = s.get(
-                        LIST_URL,
-                        params=params,
-                        headers=HEADERS_HTML,
-                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),  # (connect, read)
-                        verify=False,  # 인증서 경고 무시
-                    )
-                    if r.status_code != 200:
-                        print(f"[Golfpang] sector {sector} page {page} HTTP {r.status_code}")
+                    log.debug("[Golfpang] GET", sector=sector, page=page)
+                    with CRAWL_REQUEST_SECONDS.time("golfpang", f"sector{sector}"):
+                        r = _get(
+                            s, "golfpang", LIST_URL, GPANG_RETRIES,
+                            params=params,
+                            headers={**HEADERS_HTML, **FINGERPRINTS.conditional_headers(key)},
+                            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),  # (connect, read)
+                            verify=False,  # 인증서 경고 무시
+                        )
+                    if r.status_code not in (200, 304):
+                        CRAWL_ERRORS.inc("golfpang", "http")
+                        log.warning("[Golfpang] HTTP 오류", sector=sector, page=page, status=r.status_code)
+                        failed.append(sector)
                         break
 
-                    soup = BeautifulSoup(r.text, "html.parser")
-                    candidates = soup.select("li, div.card, div.item, tr")
+                    rows, _ = FINGERPRINTS.resolve(key, r, lambda resp: canonicalize_items(_parse_golfpang_page(resp.text)))
                     items_found = 0
-
-                    for c in candidates:
-                        text = c.get_text(" ", strip=True)
-                        if not text:
-                            continue
-
-                        # 이름
-                        name_el = c.select_one(".golf-name, .tit, .name, .club, .clubNm")
-                        name = name_el.get_text(strip=True) if name_el else None
-                        if not name:
-                            m = re.search(r"([가-힣A-Za-z0-9\s]+?)(?:CC|컨트리클럽|GC|GCC|CC)\b", text)
-                            name = m.group(0) if m else None
-
-                        # 날짜/시간
-                        date_el = c.select_one(".date, .day, .bk-date")
-                        time_el = c.select_one(".time, .bk-time")
-                        date_txt = date_el.get_text(strip=True) if date_el else None
-                        time_txt = time_el.get_text(strip=True) if time_el else None
-                        if not date_txt:
-                            m = re.search(r"(20\d{2}-\d{2}-\d{2})", text)
-                            date_txt = m.group(1) if m else None
-                        if not time_txt:
-                            m = re.search(r"(\d{1,2}:\d{2})", text)
-                            time_txt = m.group(1) if m else None
-
-                        # 가격
-                        price_el = c.select_one(".price, .bk-price, .won, .fee")
-                        price_txt = price_el.get_text(" ", strip=True) if price_el else None
-                        if not price_txt:
-                            m = re.search(r"([0-9,]{4,})\s*원?", text)
-                            price_txt = m.group(1) if m else None
-
-                        # 링크(있는 경우)
-                        link_el = c.select_one("a[href]")
-                        href = link_el.get("href") if link_el else None
-                        url = href if (href and href.startswith("http")) else (f"{GOLFPANG_BASE}{href}" if href else "https://www.golfpang.com/")
-
-                        if not (name and date_txt and time_txt and price_txt):
-                            continue
-                        if date_txt != date_str:
+                    for row in rows:
+                        if row["date"] not in wanted:
                             continue
-                        if favorite and not any(f in name for f in favorite):
+                        if favorite_ids is not None and resolve_club(row["golf"]) not in favorite_ids:
                             continue
-
-                        price = _parse_price(price_txt)
-                        hour_num = _parse_hour_num(time_txt)
-                        out.append({
-                            "golf": name,
-                            "date": date_txt,
-                            "hour": f"{hour_num:02d}시대" if hour_num >= 0 else time_txt,
-                            "hour_num": hour_num,
-                            "price": price,
-                            "benefit": "",
-                            "url": url,
-                            "source": "golfpang",
-                        })
+                        out[row["date"]].append(row)
                         items_found += 1
+                    CRAWL_ITEMS.inc("golfpang", amount=items_found)
 
                     if items_found == 0:
                         break  # 이 페이지엔 더 없음 → 다음 섹터
-                    time.sleep(SLEEP_BETWEEN)
 
                 except requests.exceptions.ConnectTimeout as e:
-                    print(f"[Golfpang] sector {sector} page {page} 연결타임아웃: {e}")
+                    CRAWL_ERRORS.inc("golfpang", "timeout")
+                    log.warning("[Golfpang] 연결타임아웃", sector=sector, page=page, error=e)
+                    failed.append(sector)
                     break
                 except Exception as e:
-                    print(f"[Golfpang] sector {sector} page {page} 오류: {e}")
+                    CRAWL_ERRORS.inc("golfpang", "timeout" if isinstance(e, requests.exceptions.Timeout) else "error")
+                    log.warning("[Golfpang] 오류", sector=sector, page=page, error=e)
+                    failed.append(sector)
                     break
 
+    if failed:
+        raise SectorFetchError(failed, out)
     return out
+
+def crawl_golfpang(date_str: str, favorite: List[str], sectors: List[int] = None):
+    """
+    - 단일 날짜용 호환 래퍼 (crawl_golfpang_multi 한 날짜 버전)
+    - date_str 정확히 일치하는 항목만 반환
+    """
+    return crawl_golfpang_multi([date_str], favorite, sectors=sectors)[date_str]
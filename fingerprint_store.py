@@ -0,0 +1,108 @@
+import hashlib, os, threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from metrics import UPSTREAM_CONTENT
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 업스트림 응답 지문 저장소: 내용이 그대로면 파싱을 건너뛰고 이전 결과 재사용
+FINGERPRINT_MAX_ENTRIES = int(os.environ.get("FINGERPRINT_MAX_ENTRIES", 5000))
+
+NOT_MODIFIED = "not_modified"  # 304 (조건부 요청 적중)
+UNCHANGED = "unchanged"        # 200이지만 본문 해시가 같음
+CHANGED = "changed"            # 새로 파싱
+
+class _Entry:
+    __slots__ = ("digest", "etag", "last_modified", "items")
+
+    def __init__(self, digest: str, etag: Optional[str], last_modified: Optional[str], items: List[Dict]):
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.items = items
+
+class FingerprintStore:
+    """
+    - key(예: ("teescan", seq, name, date), ("golfpang", sector, page)) → 본문 해시, ETag/Last-Modified, 파싱 결과
+    - conditional_headers(key): 이전 응답에 ETag/Last-Modified가 있었으면 If-None-Match/If-Modified-Since
+    - resolve(key, response, parse): 304거나 본문 해시가 같으면 저장된 결과, 아니면 parse(response) 후 저장
+    - 최대 maxsize개 LRU, 결과 종류는 source별로 집계 (stats / /metrics)
+    - 저장본과 반환값은 항목 dict까지 따로 복사 (호출 측이 정규화/날씨 부착 등으로 고쳐도 저장본은 그대로)
+    """
+
+    def __init__(self, maxsize: int = FINGERPRINT_MAX_ENTRIES):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def conditional_headers(self, key: Hashable) -> Dict[str, str]:
+        with self._lock:
+            e = self._data.get(key)
+        if e is None:
+            return {}
+        headers = {}
+        if e.etag:
+            headers["If-None-Match"] = e.etag
+        if e.last_modified:
+            headers["If-Modified-Since"] = e.last_modified
+        return headers
+
+    def resolve(self, key: Hashable, response, parse: Callable[[object], List[Dict]]) -> Tuple[List[Dict], str]:
+        source = key[0] if isinstance(key, tuple) else str(key)
+        with self._lock:
+            e = self._data.get(key)
+            if e is not None:
+                self._data.move_to_end(key)
+
+        if response.status_code == 304:
+            if e is None:  # 조건부 요청 직후 LRU에서 밀려난 경우
+                raise RuntimeError(f"304 without cached content: {key}")
+            return self._hit(source, e, NOT_MODIFIED)
+
+        digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if e is not None and e.digest == digest:
+            return self._hit(source, e, UNCHANGED)
+
+        items = parse(response)
+        entry = _Entry(digest, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                       [dict(it) for it in items])
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._counts[(source, CHANGED)] += 1
+        UPSTREAM_CONTENT.inc(source, CHANGED)
+        return items, CHANGED
+
+    def _hit(self, source: str, e: _Entry, result: str) -> Tuple[List[Dict], str]:
+        with self._lock:
+            self._counts[(source, result)] += 1
+        UPSTREAM_CONTENT.inc(source, result)
+        return [dict(it) for it in e.items], result
+
+    def forget(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        # {source: {not_modified, unchanged, changed}}
+        with self._lock:
+            counts = dict(self._counts)
+        out: Dict[str, Dict[str, int]] = {}
+        for (source, result), n in counts.items():
+            out.setdefault(source, {NOT_MODIFIED: 0, UNCHANGED: 0, CHANGED: 0})[result] = n
+        return out
+
+def reuse_rate(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, Dict]:
+    # 두 stats() 사이 구간의 source별 재사용 비율 (304 + 해시 일치) / 전체
+    out = {}
+    for source, counts in after.items():
+        prev = before.get(source, {})
+        delta = {k: v - prev.get(k, 0) for k, v in counts.items()}
+        total = sum(delta.values())
+        if total:
+            reused = delta[NOT_MODIFIED] + delta[UNCHANGED]
+            out[source] = dict(delta, total=total, reuse_rate=round(reused / total, 3))
+    return out
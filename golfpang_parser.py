@@ -0,0 +1,200 @@
+import re
+from typing import Dict, List, Optional
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # lxml 미설치 환경 → BeautifulSoup(html.parser) 경로 사용
+    lxml_html = None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Golfpang booking_list.do 페이지 파서
+GOLFPANG_BASE = "https://www.golfpang.com"
+
+RE_NON_DIGIT = re.compile(r"[^0-9]")
+RE_HOUR = re.compile(r"(\d{1,2})")
+RE_NAME = re.compile(r"([가-힣A-Za-z0-9\s]+?)(?:CC|컨트리클럽|GC|GCC|CC)\b")
+RE_DATE = re.compile(r"(20\d{2}-\d{2}-\d{2})")
+RE_TIME = re.compile(r"(\d{1,2}:\d{2})")
+RE_CLUB_CODE = re.compile(r"[?&](?:club_?code|clubCd|golf_?code|cc_?code)=(\d+)", re.I)  # 링크의 Golfpang 구장 코드
+RE_PRICE = re.compile(r"(?<![\d,-])(\d{1,3}(?:,\d{3})+|\d{5,})(?![\d,-])\s*원?")  # 날짜(2026-…)의 연도는 제외
+
+# 필드별 클래스 (CSS 선택자 ".a, .b" 와 동일한 의미)
+NAME_CLASSES = frozenset(("golf-name", "tit", "name", "club", "clubNm"))
+DATE_CLASSES = frozenset(("date", "day", "bk-date"))
+TIME_CLASSES = frozenset(("time", "bk-time"))
+PRICE_CLASSES = frozenset(("price", "bk-price", "won", "fee"))
+_SKIP_TEXT = frozenset(("script", "style"))
+
+def _parse_price(txt: str) -> int:
+    digits = RE_NON_DIGIT.sub("", txt or "")
+    return int(digits) if digits else 10**12
+
+def parse_hour_num(hour_text: str) -> int:
+    # "07:10" / "07시대" → 7, 숫자가 없으면 -1 (weather_enrich도 응답 행의 시간대 해석에 사용)
+    m = RE_HOUR.search(hour_text or "")
+    return int(m.group(1)) if m else -1
+
+def _make_row(text: str, name: Optional[str], date_txt: Optional[str], time_txt: Optional[str],
+              price_txt: Optional[str], href: Optional[str]) -> Optional[Dict]:
+    # 셀렉터로 못 찾은 필드는 행 전체 텍스트에서 정규식으로 보완
+    if not name:
+        m = RE_NAME.search(text)
+        name = m.group(0) if m else None
+    if not date_txt:
+        m = RE_DATE.search(text)
+        date_txt = m.group(1) if m else None
+    if not time_txt:
+        m = RE_TIME.search(text)
+        time_txt = m.group(1) if m else None
+    if not price_txt:
+        m = RE_PRICE.search(text)
+        price_txt = m.group(1) if m else None
+
+    url = href if (href and href.startswith("http")) else (f"{GOLFPANG_BASE}{href}" if href else "https://www.golfpang.com/")
+
+    if not (name and date_txt and time_txt and price_txt):
+        return None
+
+    price = _parse_price(price_txt)
+    hour_num = parse_hour_num(time_txt)
+    code = RE_CLUB_CODE.search(href) if href else None
+    row = {
+        "golf": name,
+        "date": date_txt,
+        "hour": f"{hour_num:02d}시대" if hour_num >= 0 else time_txt,
+        "hour_num": hour_num,
+        "price": price,
+        "benefit": "",
+        "url": url,
+        "source": "golfpang",
+    }
+    if code:
+        row["club_code"] = code.group(1)  # club_registry.canonicalize_items가 구장 식별에 쓰고 제거
+    return row
+
+# ─────────────────────────────────────────────────────────────────────────────
+# lxml 경로: 후보 노드마다 하위 트리를 한 번만 훑어 텍스트/필드를 동시에 수집
+def _is_candidate(el) -> bool:
+    tag = el.tag
+    if tag == "li" or tag == "tr":
+        return True
+    if tag == "div":
+        classes = (el.get("class") or "").split()
+        return "card" in classes or "item" in classes
+    return False
+
+def _strings(el, out: List[str]):
+    # BeautifulSoup get_text와 같은 규칙: 주석/script/style 내용 제외, tail은 포함
+    if el.text:
+        out.append(el.text)
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT:
+            _strings(child, out)
+        if child.tail:
+            out.append(child.tail)
+
+def _text(el, sep: str) -> str:
+    parts: List[str] = []
+    _strings(el, parts)
+    return sep.join(p for p in (s.strip() for s in parts) if p)
+
+def _extract(el) -> Optional[Dict]:
+    text = _text(el, " ")
+    if not text:
+        return None
+
+    name_el = date_el = time_el = price_el = link_el = None
+    for d in el.iterdescendants():
+        if not isinstance(d.tag, str):
+            continue
+        cls = d.get("class")
+        if cls:
+            classes = cls.split()
+            if name_el is None and not NAME_CLASSES.isdisjoint(classes):
+                name_el = d
+            if date_el is None and not DATE_CLASSES.isdisjoint(classes):
+                date_el = d
+            if time_el is None and not TIME_CLASSES.isdisjoint(classes):
+                time_el = d
+            if price_el is None and not PRICE_CLASSES.isdisjoint(classes):
+                price_el = d
+        if link_el is None and d.tag == "a" and d.get("href") is not None:
+            link_el = d
+
+    return _make_row(
+        text,
+        _text(name_el, "") if name_el is not None else None,
+        _text(date_el, "") if date_el is not None else None,
+        _text(time_el, "") if time_el is not None else None,
+        _text(price_el, " ") if price_el is not None else None,
+        link_el.get("href") if link_el is not None else None,
+    )
+
+def parse_page_lxml(html: str) -> List[Dict]:
+    """
+    - 후보(li, tr, div.card, div.item)를 문서 역순으로 처리해 안쪽 노드부터 행을 뽑음
+    - 하위 후보가 이미 행을 만든 바깥 컨테이너는 건너뜀 → 중첩 컨테이너 중복 행 제거
+    """
+    if not html or not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+    candidates = [el for el in root.iter() if isinstance(el.tag, str) and _is_candidate(el)]
+
+    covered = set()  # 행을 만든 노드의 조상들
+    rows: List[Dict] = []
+    for el in reversed(candidates):
+        if el in covered:
+            continue
+        row = _extract(el)
+        if row is None:
+            continue
+        rows.append(row)
+        p = el.getparent()
+        while p is not None and p not in covered:
+            covered.add(p)
+            p = p.getparent()
+    rows.reverse()
+    return rows
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BeautifulSoup 경로 (lxml이 없을 때) — parse_page_lxml과 같은 규칙으로 중첩 컨테이너를 건너뜀
+def parse_page_bs4(html: str) -> List[Dict]:
+    from bs4 import BeautifulSoup
+
+    if not html or not html.strip():
+        return []
+    rows: List[Dict] = []
+    soup = BeautifulSoup(html, "html.parser")
+    covered = set()  # 행을 만든 노드의 조상들 (id)
+    for c in reversed(soup.select("li, div.card, div.item, tr")):
+        if id(c) in covered:
+            continue
+        text = c.get_text(" ", strip=True)
+        if not text:
+            continue
+
+        name_el = c.select_one(".golf-name, .tit, .name, .club, .clubNm")
+        date_el = c.select_one(".date, .day, .bk-date")
+        time_el = c.select_one(".time, .bk-time")
+        price_el = c.select_one(".price, .bk-price, .won, .fee")
+        link_el = c.select_one("a[href]")
+
+        row = _make_row(
+            text,
+            name_el.get_text(strip=True) if name_el else None,
+            date_el.get_text(strip=True) if date_el else None,
+            time_el.get_text(strip=True) if time_el else None,
+            price_el.get_text(" ", strip=True) if price_el else None,
+            link_el.get("href") if link_el else None,
+        )
+        if row is None:
+            continue
+        rows.append(row)
+        for p in c.parents:
+            if id(p) in covered:
+                break
+            covered.add(id(p))
+    rows.reverse()
+    return rows
+
+parse_page = parse_page_lxml if lxml_html is not None else parse_page_bs4
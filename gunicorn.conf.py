@@ -0,0 +1,32 @@
+import os, subprocess, sys
+
+# ─────────────────────────────────────────────────────────────────────────────
+# gunicorn 멀티 워커 설정 (render.yaml: gunicorn -c gunicorn.conf.py app:app)
+# - 크롤링은 마스터가 띄운 refresher 프로세스 1개만 수행 → 공유 세그먼트(shared_cache.py)에 게시
+# - 워커는 세그먼트를 읽기 전용 mmap으로 조회만 함 (워커 수만큼 크롤링/메모리가 늘지 않음)
+os.environ.setdefault("SERVE_MODE", "worker")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 16))  # /stream(SSE) 연결 하나가 스레드 하나를 점유
+# → 워커당 SSE 구독은 threads × STREAM_THREAD_SHARE(기본 1/4)까지만 받고 나머지는 503 (teetime_delta.py)
+timeout = 120  # 스트림 응답(/get_ttime_grouped/stream) 여유
+preload_app = False  # 워커마다 app을 따로 import (refresher 역할이 워커에 섞이지 않도록)
+
+_refresher = None
+
+def when_ready(server):
+    global _refresher
+    env = dict(os.environ, SERVE_MODE="refresher")
+    here = os.path.dirname(os.path.abspath(__file__))
+    _refresher = subprocess.Popen([sys.executable, os.path.join(here, "app.py")], env=env, cwd=here)
+    server.log.info("refresher started (pid %s)", _refresher.pid)
+
+def on_exit(server):
+    if _refresher and _refresher.poll() is None:
+        _refresher.terminate()
+        try:
+            _refresher.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _refresher.kill()
@@ -0,0 +1,173 @@
+import bisect, threading, time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 경량 메트릭 (Prometheus 텍스트 포맷, 외부 의존성 없음)
+# 기록은 dict 조회 + 짧은 락 한 번 → 크롤링/조회 경로 부담 무시 가능
+PREFIX = "nawabari_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200)
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _label_str(self, key: Tuple, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labels, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = list(self._values.items())
+        for key, v in sorted(values, key=lambda kv: tuple(map(str, kv[0]))):
+            lines.extend(self._render_one(key, v))
+        return lines
+
+    def _render_one(self, key: Tuple, v) -> List[str]:
+        return [f"{self.name}{self._label_str(key)} {_fmt(v)}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    """
+    - 라벨 조합별 [버킷별 개수..., 합계, 건수]를 누적
+    - 버킷은 상한(le) 기준, 마지막에 +Inf 자동 추가
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        ix = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[ix] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def _render_one(self, key: Tuple, state) -> List[str]:
+        lines = []
+        acc = 0
+        for le, n in zip(self.buckets + (float("inf"),), state):
+            acc += n
+            le_label = 'le="%s"' % _fmt(le)
+            lines.append(f"{self.name}_bucket{self._label_str(key, le_label)} {acc}")
+        lines.append(f"{self.name}_sum{self._label_str(key)} {state[-2]:.6f}")
+        lines.append(f"{self.name}_count{self._label_str(key)} {state[-1]}")
+        return lines
+
+class _Timer:
+    __slots__ = ("hist", "labels", "start")
+
+    def __init__(self, hist: Histogram, labels: Tuple):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(*self.labels, value=time.perf_counter() - self.start)
+        return False
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 레지스트리: /metrics 렌더링 + 수집 직전 콜백(캐시 나이처럼 조회 시점에 계산하는 값)
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def on_collect(self, fn: Callable[[], None]):
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                pass
+        lines = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+def counter(name, help, labels=()):
+    return REGISTRY.register(Counter(name, help, labels))
+
+def gauge(name, help, labels=()):
+    return REGISTRY.register(Gauge(name, help, labels))
+
+def histogram(name, help, labels=(), buckets=LATENCY_BUCKETS):
+    return REGISTRY.register(Histogram(name, help, labels, buckets))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 공용 메트릭 정의
+CRAWL_REQUEST_SECONDS = histogram(
+    "crawl_request_seconds", "Upstream request latency (teescan: per club, golfpang: per sector page)",
+    ("source", "target"))
+CRAWL_ERRORS = counter("crawl_errors_total", "Failed upstream requests by kind (timeout/http/error)", ("source", "kind"))
+HTTP_RETRIES = counter("http_retries_total", "Retries performed by crawler requests (throttle/5xx/timeout and connection)", ("host", "reason"))
+CRAWL_ITEMS = counter("crawl_items_total", "Tee-time items collected", ("source",))
+REFRESH_ITEMS = gauge("refresh_items", "Items published by the last refresh", ("source",))
+REFRESH_SECONDS = histogram("refresh_duration_seconds", "Full refresh duration", (), DURATION_BUCKETS)
+REFRESH_LAST_SUCCESS = gauge("refresh_last_completed_timestamp_seconds", "Unix time the last refresh finished")
+CACHE_AGE_SECONDS = gauge("cache_age_seconds", "Seconds since the cached snapshot of a date was built", ("date",))
+CACHE_ROWS = gauge("cache_rows", "Rows held in the cached snapshot of a date", ("date",))
+QUERY_SECONDS = histogram("query_seconds", "Tee-time query latency", ("endpoint",))
+RATE_LIMIT_RPS = gauge("rate_limit_rps", "Current adaptive request rate per upstream", ("source",))
+RATE_THROTTLES = counter("rate_throttles_total", "Upstream throttle signals (429/5xx/timeout)", ("source", "reason"))
+UPSTREAM_CONTENT = counter("upstream_content_total", "Upstream responses by content result (not_modified/unchanged/changed)",
+                           ("source", "result"))
+STREAM_SUBSCRIBERS = gauge("stream_subscribers", "Open /stream (SSE) subscriptions in this process")
+STREAM_DELTAS = counter("stream_delta_entries_total", "Cell changes pushed to /stream subscriber groups", ("kind",))
+HISTORY_RECORDS = counter("history_records_total", "Price history records appended (changed slots only)")
@@ -0,0 +1,332 @@
+import bisect, heapq, json, mmap, os, statistics, struct, threading, time
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from applog import get_logger
+from metrics import HISTORY_RECORDS
+from snapshot_store import DATA_DIR
+from teetime_table import INVALID_HOUR, TeeTimeTable
+
+log = get_logger("price_history")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 가격 이력 (append-only 바이너리 로그)
+# 레코드 14바이트, 빅엔디언 (club u16, 날짜 u16, hour u8, source u8, 수집시각 u32, 가격 u32)
+#   → 바이트 순서 = (구장, 날짜, 시간대, 소스, 시각) 정렬 순서라서 정렬된 세그먼트는 바이트 접두어로 이분 탐색
+# <dir>/meta.json         {"gen", "segment", "tail"} — 압축(compact)마다 세대가 바뀜
+# <dir>/history.<gen>.seg 정렬된 레코드 (읽기 전용 mmap)
+# <dir>/tail.<gen>.log    마지막 압축 이후 추가된 레코드 (추가 순서 = 시각 순서)
+# <dir>/clubs.json        club id → 구장명
+# 가격 0 = 그 칸이 사라짐 (매진/마감), 통계에서는 제외
+HISTORY_DIR = Path(os.environ.get("HISTORY_DIR", str(DATA_DIR / "history")))
+HISTORY_COMPACT_RECORDS = int(os.environ.get("HISTORY_COMPACT_RECORDS", 500000))  # tail이 이만큼 쌓이면 압축
+HISTORY_RETAIN_DAYS = int(os.environ.get("HISTORY_RETAIN_DAYS", 400))             # 압축 시 이보다 지난 날짜 삭제
+
+RECORD = struct.Struct(">HHBBII")
+SOURCES = ("teescan", "golfpang")
+_EPOCH = date(2020, 1, 1).toordinal()
+
+def _day(date_str: str) -> int:
+    return datetime.strptime(date_str, "%Y-%m-%d").date().toordinal() - _EPOCH
+
+def _date_str(day: int) -> str:
+    return date.fromordinal(day + _EPOCH).strftime("%Y-%m-%d")
+
+class _Records:
+    """정렬된 세그먼트 mmap을 bisect가 쓸 수 있는 시퀀스로 (i번째 레코드의 앞 n바이트)"""
+
+    def __init__(self, buf, prefix_len: int):
+        self.buf = buf
+        self.n = len(buf) // RECORD.size
+        self.prefix_len = prefix_len
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        off = i * RECORD.size
+        return self.buf[off:off + self.prefix_len]
+
+class PriceHistory:
+    """
+    - writable=True인 프로세스 1개(single/refresher)만 record/compact, 나머지(gunicorn 워커)는 읽기만
+    - record(date_str, table): (구장, 시간대, 소스) 칸별 최저가를 직전 기록과 비교해 바뀐 칸만 추가
+    - query(...): 세그먼트는 (구장, 날짜) 범위를 이분 탐색으로 찾아 그 구간만 언팩, tail은 (구장, 날짜) 색인
+    - 읽는 쪽은 조회 때마다 meta.json mtime / tail 크기만 확인해 새 레코드만 이어 읽음
+    """
+
+    def __init__(self, root: Path = HISTORY_DIR, writable: bool = False,
+                 compact_records: int = HISTORY_COMPACT_RECORDS):
+        self.root = Path(root)
+        self.writable = writable
+        self.compact_records = compact_records
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        self._seg = None             # mmap (정렬된 레코드)
+        self._tail = bytearray()     # 아직 압축되지 않은 레코드 원본
+        self._tail_index: Dict[Tuple[int, int], array] = {}  # (club, day) → tail 레코드 번호
+        self._tail_file = None       # writable: 추가용 파일 핸들
+        self._clubs: List[str] = []
+        self._club_ids: Dict[str, int] = {}
+        self._last: Dict[int, Dict[Tuple[int, int, int], int]] = {}  # writable: day → {(club, hour, source): 가격}
+        if writable:
+            self.root.mkdir(parents=True, exist_ok=True)
+        self._reload()
+
+    # ── 파일 ──
+    def _meta(self) -> Dict:
+        try:
+            return json.loads((self.root / "meta.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {"gen": 0, "segment": None, "tail": "tail.0.log"}
+
+    def _write_json(self, name: str, data):
+        path = self.root / name
+        tmp = path.with_name(f".{name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _reload(self):
+        meta = self._meta()
+        self.meta = meta
+        try:
+            self._meta_mtime = (self.root / "meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            self._meta_mtime = None
+        self._seg = None
+        if meta["segment"]:
+            with open(self.root / meta["segment"], "rb") as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._seg = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._tail = bytearray()
+        self._tail_index = {}
+        self._load_clubs()
+        if self.writable:
+            if self._tail_file:
+                self._tail_file.close()
+            self._tail_file = open(self.root / meta["tail"], "ab")
+            self._last = {}
+        self._read_tail()
+
+    def _load_clubs(self):
+        try:
+            self._clubs = json.loads((self.root / "clubs.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self._clubs = []
+        self._club_ids = {name: i for i, name in enumerate(self._clubs)}
+
+    def _read_tail(self):
+        # 마지막으로 읽은 위치 이후에 추가된 레코드만 읽어 색인에 반영 (다른 프로세스가 쓴 것 포함)
+        try:
+            with open(self.root / self.meta["tail"], "rb") as f:
+                f.seek(len(self._tail))
+                data = f.read()
+        except FileNotFoundError:
+            return
+        data = data[:len(data) - len(data) % RECORD.size]  # 쓰는 중인 마지막 레코드는 다음에
+        if data:
+            self._index_tail(data)
+
+    def _index_tail(self, data: bytes):
+        start = len(self._tail) // RECORD.size
+        self._tail += data
+        for i, (club, day, *_rest) in enumerate(RECORD.iter_unpack(data), start):
+            self._tail_index.setdefault((club, day), array("I")).append(i)
+
+    def _refresh(self):
+        if self.writable:
+            return  # 쓰는 프로세스는 메모리 상태가 항상 최신
+        try:
+            mtime = (self.root / "meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._meta_mtime:
+            self._reload()
+        else:
+            self._read_tail()
+
+    # ── 조회 공통 ──
+    def _segment_range(self, club: int, day_from: int, day_to: int) -> Iterator[Tuple]:
+        if self._seg is None:
+            return iter(())
+        recs = _Records(self._seg, 4)
+        lo = bisect.bisect_left(recs, struct.pack(">HH", club, day_from))
+        hi = bisect.bisect_right(recs, struct.pack(">HH", club, day_to))
+        return RECORD.iter_unpack(self._seg[lo * RECORD.size:hi * RECORD.size])
+
+    def _tail_range(self, club: int, day_from: int, day_to: int) -> Iterator[Tuple]:
+        tail, size = self._tail, RECORD.size
+        for day in range(day_from, day_to + 1):
+            for i in self._tail_index.get((club, day), ()):
+                yield RECORD.unpack_from(tail, i * size)
+
+    def _records(self, club: int, day_from: int, day_to: int) -> Iterator[Tuple]:
+        yield from self._segment_range(club, day_from, day_to)
+        yield from self._tail_range(club, day_from, day_to)
+
+    # ── 기록 ──
+    def _club_ids_for(self, names) -> Dict[str, int]:
+        # 새 구장명은 id를 붙여 clubs.json에 먼저 기록 (레코드보다 먼저 → 읽는 쪽이 모르는 id를 보지 않음)
+        new = [n for n in names if n not in self._club_ids]
+        for name in new:
+            self._club_ids[name] = len(self._clubs)
+            self._clubs.append(name)
+        if new:
+            self._write_json("clubs.json", self._clubs)
+        return self._club_ids
+
+    def _last_prices(self, day: int) -> Dict[Tuple[int, int, int], int]:
+        # 날짜별 (구장, 시간대, 소스) 마지막 기록 가격 — 처음 필요할 때 세그먼트/tail에서 구성
+        last = self._last.get(day)
+        if last is None:
+            last = {}
+            for cid in range(len(self._clubs)):
+                for club, _, hour, source, _, price in self._records(cid, day, day):
+                    last[(club, hour, source)] = price  # 칸 안에서는 시각 순이므로 마지막 값이 최신
+            self._last[day] = last
+        return last
+
+    def record(self, date_str: str, table: TeeTimeTable, ts: float = None,
+               source: Optional[str] = None, clubs: Optional[Set[str]] = None) -> int:
+        """
+        - 바뀐 칸만 추가하고 추가한 레코드 수 반환
+        - 사라진 칸(가격 0)은 이번에 실제로 다시 수집한 source(+ clubs가 주어지면 그 구장들) 몫만 기록
+          (source가 None이면 무엇을 수집했는지 모르므로 사라진 칸을 기록하지 않음 — 디스크 스냅샷 적재 등)
+        """
+        if not self.writable:
+            raise RuntimeError("price history opened read-only")
+        ts = int(ts or time.time())
+        day = _day(date_str)
+        s = table.strings
+        current: Dict[Tuple[str, int, int], int] = {}
+        for g, hn, src, price in zip(table.golf, table.hour_num, table.source, table.price):
+            if hn == INVALID_HOUR or hn < 0 or s[src] not in SOURCES:
+                continue
+            key = (s[g], hn, SOURCES.index(s[src]))
+            if key not in current or price < current[key]:
+                current[key] = price
+        with self._lock:
+            last = self._last_prices(day)
+            ids = self._club_ids_for({name for name, _, _ in current})
+            out = bytearray()
+            seen = set()
+            for (name, hour, src), price in current.items():
+                k = (ids[name], hour, src)
+                seen.add(k)
+                price = min(max(int(price), 1), 0xFFFFFFFF)
+                if last.get(k) != price:
+                    last[k] = price
+                    out += RECORD.pack(k[0], day, hour, src, ts, price)
+            src_ix = SOURCES.index(source) if source in SOURCES else None
+            club_ix = {ids[n] for n in clubs if n in ids} if clubs is not None else None
+            for k, price in list(last.items()):
+                if src_ix is None or k[2] != src_ix or (club_ix is not None and k[0] not in club_ix):
+                    continue
+                if k not in seen and price:
+                    last[k] = 0
+                    out += RECORD.pack(k[0], day, k[1], k[2], ts, 0)
+            if out:
+                self._tail_file.write(out)
+                self._tail_file.flush()
+                self._index_tail(bytes(out))
+                HISTORY_RECORDS.inc(amount=len(out) // RECORD.size)
+            # 지난 날짜의 마지막 가격 캐시는 버림
+            today = _day(datetime.now().strftime("%Y-%m-%d"))
+            for old in [d for d in self._last if d < today]:
+                del self._last[old]
+            if len(self._tail) // RECORD.size >= self.compact_records:
+                self.compact()
+        return len(out) // RECORD.size
+
+    def compact(self, retain_days: int = HISTORY_RETAIN_DAYS):
+        """
+        - 세그먼트(정렬됨) + tail(정렬 후) 병합 → 새 세대 세그먼트, 빈 tail로 교체
+        - 보관 기간이 지난 날짜와 완전히 같은 레코드(중단 후 재시도로 생긴 중복)는 버림
+        - 이미 옛 세그먼트를 mmap한 읽기 프로세스는 meta.json이 바뀐 것을 보고 다시 엶
+        """
+        with self._lock:
+            started = time.perf_counter()
+            gen = self.meta["gen"] + 1
+            cutoff = _day((datetime.now() - timedelta(days=retain_days)).strftime("%Y-%m-%d"))
+            tail = sorted(self._tail[i:i + RECORD.size] for i in range(0, len(self._tail), RECORD.size))
+            seg = self._seg
+            seg_iter = (seg[i:i + RECORD.size] for i in range(0, len(seg), RECORD.size)) if seg is not None else ()
+            name = f"history.{gen}.seg"
+            kept, prev = 0, None
+            with open(self.root / name, "wb") as f:
+                for rec in heapq.merge(seg_iter, tail):
+                    if rec == prev or struct.unpack_from(">H", rec, 2)[0] < cutoff:
+                        continue
+                    f.write(rec)
+                    prev = rec
+                    kept += 1
+                f.flush()
+                os.fsync(f.fileno())
+            old = self.meta
+            (self.root / f"tail.{gen}.log").touch()
+            self._write_json("meta.json", {"gen": gen, "segment": name, "tail": f"tail.{gen}.log"})
+            for stale in (old["segment"], old["tail"]):
+                if stale:
+                    (self.root / stale).unlink(missing_ok=True)
+            last = self._last
+            self._reload()
+            self._last = last  # 내용은 그대로이므로 마지막 가격 캐시 유지
+        log.info("🗜️ 가격 이력 압축", gen=gen, records=kept, seconds=round(time.perf_counter() - started, 2))
+
+    # ── 조회 ──
+    def query(self, club: str, hour: int, date_str: str = None, days: int = 90,
+              source: Optional[str] = None, series_limit: int = 200) -> Optional[Dict]:
+        """
+        - date_str가 있으면 그 날짜의 해당 칸 가격 변화, 없으면 최근 days일(플레이 날짜) 동안 같은 시간대 전체
+        - 반환: 관측 수, 최저/중앙/최고, 현재(date_str일 때 마지막 가격), 추세(원/일, 최소제곱 기울기), 최근 series
+        """
+        with self._lock:
+            self._refresh()
+            cid = self._club_ids.get(club)
+            if cid is None:
+                self._load_clubs()
+                cid = self._club_ids.get(club)
+            if cid is None:
+                return None
+            if date_str:
+                day_from = day_to = _day(date_str)
+            else:
+                today = _day(datetime.now().strftime("%Y-%m-%d"))
+                day_from, day_to = max(0, today - days), today + 366
+            src = SOURCES.index(source) if source else None
+            # 같은 시각 레코드는 기록 순서를 유지해야 하므로 시각만으로 안정 정렬
+            points = sorted(((ts, price, day, s) for _, day, h, s, ts, price in self._records(cid, day_from, day_to)
+                             if h == hour and (src is None or s == src)), key=lambda p: p[0])
+
+        prices = [p for _, p, _, _ in points if p]
+        out = {"club": club, "hour": hour, "date": date_str, "source": source, "points": len(prices)}
+        if not prices:
+            return out
+        out.update(min=min(prices), median=statistics.median(prices), max=max(prices))
+        if date_str:
+            latest = {s: p for _, p, _, s in points}  # 소스별 마지막 가격, 0이면 그 소스에 현재 칸 없음
+            out["current"] = min((p for p in latest.values() if p), default=None)
+        live = [(ts, p) for ts, p, _, _ in points if p]
+        if len(live) >= 2 and live[-1][0] > live[0][0]:
+            n = len(live)
+            mx = sum(ts for ts, _ in live) / n
+            my = sum(p for _, p in live) / n
+            var = sum((ts - mx) ** 2 for ts, _ in live)
+            slope = sum((ts - mx) * (p - my) for ts, p in live) / var if var else 0.0
+            out["trend_per_day"] = round(slope * 86400)
+        else:
+            out["trend_per_day"] = 0
+        out["series"] = [[ts, p, _date_str(d), SOURCES[s]] for ts, p, d, s in points[-series_limit:]]
+        return out
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "gen": self.meta["gen"],
+                "segment_records": len(self._seg) // RECORD.size if self._seg is not None else 0,
+                "tail_records": len(self._tail) // RECORD.size,
+                "clubs": len(self._clubs),
+            }
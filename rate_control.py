@@ -0,0 +1,127 @@
+import os, threading, time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from applog import get_logger
+from metrics import RATE_LIMIT_RPS, RATE_THROTTLES
+
+log = get_logger("rate_control")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 업스트림별 적응형 요청 속도 제어 (토큰 버킷 + AIMD)
+THROTTLE_STATUSES = frozenset((429, 500, 502, 503, 504))
+RATE_STEP = float(os.environ.get("RATE_STEP", 1.0))          # 정상 응답이 이어질 때 초당 증가폭(rps)
+RATE_DECREASE = float(os.environ.get("RATE_DECREASE", 0.7))  # 제한 신호 시 곱할 비율
+RATE_TRIP_AFTER = int(os.environ.get("RATE_TRIP_AFTER", 5))  # 최저 속도에서 연속 제한 → 회로 차단
+RATE_MAX_WAIT = float(os.environ.get("RATE_MAX_WAIT", 60))   # 이보다 긴 Retry-After → 회로 차단
+RATE_MAX_HOLD = float(os.environ.get("RATE_MAX_HOLD", 1800))  # 회로 차단 최대 시간(초)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After: 초 단위 숫자 또는 HTTP 날짜
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RateController:
+    """
+    - 토큰 버킷(rate 토큰/초, burst개)으로 요청 시작 간격을 제한 — 스레드 간 공유
+    - 정상 응답마다 rate를 조금씩 올려 max_rps까지 (초당 약 +step)
+    - 429/5xx/타임아웃이면 rate를 decrease배로 줄임 (min_rps 이하로는 안 내려감, 1초에 한 번만)
+    - Retry-After가 오면 그 시각까지(최대 max_wait초) 모든 요청을 멈춤
+    - min_rps에서도 연속 trip_after회 막히거나 Retry-After가 max_wait를 넘으면
+      연결된 회로 차단기(breaker)를 열어 이번 라운드 호출을 끊음
+    """
+
+    def __init__(self, name: str, max_rps: float, min_rps: float, start_rps: Optional[float] = None,
+                 burst: float = 1.0, step: float = RATE_STEP, decrease: float = RATE_DECREASE,
+                 trip_after: int = RATE_TRIP_AFTER, max_wait: float = RATE_MAX_WAIT):
+        self.name = name
+        self.max_rps = max_rps
+        self.min_rps = min(min_rps, max_rps) if max_rps > 0 else min_rps
+        self.rate = min(max_rps, start_rps or max_rps) if max_rps > 0 else 0.0
+        self.burst = max(1.0, burst)
+        self.step = step
+        self.decrease = decrease
+        self.trip_after = trip_after
+        self.max_wait = max_wait
+        self.breaker = None  # hold(seconds)를 가진 회로 차단기 (crawl_orchestrator가 연결)
+
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_cut = 0.0
+        self._strikes = 0  # min_rps에서 연속으로 막힌 횟수
+        self._lock = threading.Lock()
+        RATE_LIMIT_RPS.set(name, value=self.rate)
+
+    # ── 요청 전 ──
+    def acquire(self):
+        # 토큰을 예약하고(음수 허용) 필요한 만큼만 락 밖에서 대기
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+
+    # ── 응답 후 ──
+    def on_response(self, status: int, retry_after: Optional[str] = None):
+        if status in THROTTLE_STATUSES:
+            self._throttled(str(status), parse_retry_after(retry_after))
+        else:
+            self._healthy()
+
+    def on_timeout(self):
+        self._throttled("timeout", None)
+
+    def _healthy(self):
+        with self._lock:
+            self._strikes = 0
+            if 0 < self.rate < self.max_rps:
+                self.rate = min(self.max_rps, self.rate + self.step / self.rate)
+                rate = self.rate
+            else:
+                return
+        RATE_LIMIT_RPS.set(self.name, value=round(rate, 3))
+
+    def _throttled(self, reason: str, retry_after: Optional[float]):
+        RATE_THROTTLES.inc(self.name, reason)
+        hold = None
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + min(retry_after, self.max_wait))
+            if self.rate > 0 and now - self._last_cut >= 1.0:
+                self._last_cut = now
+                self.rate = max(self.min_rps, self.rate * self.decrease)
+            if self.rate <= self.min_rps or self.rate == 0:
+                self._strikes += 1
+            rate = self.rate
+            if (retry_after and retry_after > self.max_wait) or self._strikes >= self.trip_after:
+                hold = min(max(retry_after or 0.0, self.max_wait), RATE_MAX_HOLD)
+                self._strikes = 0
+        RATE_LIMIT_RPS.set(self.name, value=round(rate, 3))
+        if hold is not None and self.breaker is not None:
+            log.warning("🧯 업스트림 제한 지속 → 회로 차단", source=self.name, reason=reason, hold_sec=round(hold))
+            self.breaker.hold(hold)
+
+    def state(self) -> Dict:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "max_rps": self.max_rps,
+                "min_rps": self.min_rps,
+                "blocked_sec": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+                "strikes": self._strikes,
+            }
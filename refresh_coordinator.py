@@ -0,0 +1,91 @@
+import itertools, os, threading, time
+from typing import Callable, Dict, Optional
+
+from applog import get_logger
+
+log = get_logger("refresh_coordinator")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 갱신 요청 단일화 (single-flight)
+REFRESH_MIN_INTERVAL = float(os.environ.get("REFRESH_MIN_INTERVAL", 300))  # 직전 갱신 완료 후 최소 간격(초)
+
+class RefreshJob:
+    def __init__(self, job_id: int, force: bool):
+        self.id = job_id
+        self.force = force
+        self.state = "running"  # running / done / failed
+        self.started_at = time.time()
+        self.finished_at = None
+        self.dates_done = set()
+        self.items = 0
+        self.error = None
+
+    def on_progress(self, date_str: str, n_items: int):
+        self.dates_done.add(date_str)
+        self.items += n_items
+
+    def to_dict(self) -> Dict:
+        end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "state": self.state,
+            "force": self.force,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": round(end - self.started_at, 3),
+            "dates_done": len(self.dates_done),
+            "items": self.items,
+            "error": self.error,
+        }
+
+class RefreshCoordinator:
+    """
+    - 동시에 들어온 갱신 요청은 진행 중인 작업 하나로 합침 (attached)
+    - 직전 작업 종료 후 min_interval 이내의 요청은 새 작업을 만들지 않음 (throttled)
+    - refresh_fn(force=..., progress=...)는 백그라운드 스레드에서 한 번에 하나만 실행
+    """
+
+    def __init__(self, refresh_fn: Callable, min_interval: float = REFRESH_MIN_INTERVAL):
+        self.refresh_fn = refresh_fn
+        self.min_interval = min_interval
+        self.current: Optional[RefreshJob] = None
+        self.last: Optional[RefreshJob] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def request(self, force: bool = False):
+        # 반환: ("started" | "attached" | "throttled", job)
+        with self._lock:
+            if self.current:
+                return "attached", self.current
+            if (not force and self.last and self.last.finished_at
+                    and time.time() - self.last.finished_at < self.min_interval):
+                return "throttled", self.last
+            job = RefreshJob(next(self._ids), force)
+            self.current = job
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return "started", job
+
+    def _run(self, job: RefreshJob):
+        try:
+            self.refresh_fn(force=job.force, progress=job.on_progress)
+            job.state = "done"
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+            log.error("❌ 캐시 갱신 작업 실패", exc_info=True, job=job.id, error=e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self.current = None
+                self.last = job
+
+    def status(self) -> Dict:
+        with self._lock:
+            current, last = self.current, self.last
+        return {
+            "running": current is not None,
+            "current": current.to_dict() if current else None,
+            "last": last.to_dict() if last else None,
+            "min_interval": self.min_interval,
+        }
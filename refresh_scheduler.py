@@ -0,0 +1,111 @@
+import hashlib, json, os, threading, time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 재수집 정책 (환경변수로 튜닝)
+# REFRESH_POLICY: "최대 D+n:주기(초)" 목록 — 가까운 날짜일수록 자주 재수집
+DEFAULT_POLICY = "1:600,6:3600,99:10800"
+REFRESH_BACKOFF_BASE = float(os.environ.get("REFRESH_BACKOFF_BASE", 2))  # 변화 없을 때 주기 배수
+REFRESH_BACKOFF_MAX = float(os.environ.get("REFRESH_BACKOFF_MAX", 8))    # 배수 상한
+
+ALL = "*"  # 날짜/구장 구분이 없는 작업 단위 (예: Golfpang 전체 순회)
+
+def parse_policy(spec: str) -> List[Tuple[int, float]]:
+    tiers = []
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        max_offset, interval = part.split(":")
+        tiers.append((int(max_offset), float(interval)))
+    return sorted(tiers)
+
+class RefreshPolicy:
+    def __init__(self, spec: str = None, backoff_base: float = REFRESH_BACKOFF_BASE,
+                 backoff_max: float = REFRESH_BACKOFF_MAX):
+        self.tiers = parse_policy(spec or os.environ.get("REFRESH_POLICY", DEFAULT_POLICY))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def interval_for(self, day_offset: int) -> float:
+        for max_offset, interval in self.tiers:
+            if day_offset <= max_offset:
+                return interval
+        return self.tiers[-1][1]
+
+    def min_interval(self) -> float:
+        return min(interval for _, interval in self.tiers)
+
+    def backoff(self, unchanged: int) -> float:
+        return min(self.backoff_base ** unchanged, self.backoff_max)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# (source, club, date) 단위 신선도 추적
+def items_digest(items: List[Dict]) -> str:
+    rows = sorted((it.get("golf"), it.get("hour_num"), it.get("price"), it.get("url")) for it in items)
+    return hashlib.blake2b(json.dumps(rows, ensure_ascii=False).encode("utf-8"), digest_size=8).hexdigest()
+
+class RefreshScheduler:
+    """
+    - (source, club, date)별 마지막 수집 시각, 결과 digest, 연속 무변화 횟수 기록
+    - 날짜가 가까울수록 짧은 주기, 결과가 그대로면 주기를 backoff 배수만큼 늘림
+    - 실패한 작업은 기록하지 않으므로 다음 라운드에 다시 대상이 됨
+    """
+
+    def __init__(self, policy: RefreshPolicy = None):
+        self.policy = policy or RefreshPolicy()
+        self.state: Dict[Tuple[str, str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _day_offset(date_str: str) -> int:
+        if date_str == ALL:
+            return 0
+        d = datetime.strptime(date_str, "%Y-%m-%d").date()
+        return max(0, (d - datetime.now().date()).days)
+
+    def is_due(self, source: str, club: str, date_str: str, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        with self._lock:
+            st = self.state.get((source, club, date_str))
+        if not st:
+            return True
+        wait = self.policy.interval_for(self._day_offset(date_str)) * self.policy.backoff(st["unchanged"])
+        return now - st["fetched_at"] >= wait
+
+    def record(self, source: str, club: str, date_str: str, items: List[Dict], now: float = None) -> bool:
+        # 반환값: 이전 수집 대비 내용이 바뀌었는지
+        now = time.time() if now is None else now
+        digest = items_digest(items)
+        key = (source, club, date_str)
+        with self._lock:
+            prev = self.state.get(key)
+            changed = not prev or prev["digest"] != digest
+            self.state[key] = {
+                "fetched_at": now,
+                "digest": digest,
+                "unchanged": 0 if changed else prev["unchanged"] + 1,
+            }
+        return changed
+
+    def forget(self, source: str = None):
+        # 강제 전체 재수집용
+        with self._lock:
+            if source is None:
+                self.state.clear()
+            else:
+                for key in [k for k in self.state if k[0] == source]:
+                    del self.state[key]
+
+    def prune(self, keep_dates: List[str]):
+        # 지난 날짜 기록 정리
+        keep = set(keep_dates) | {ALL}
+        with self._lock:
+            for key in [k for k in self.state if k[2] not in keep]:
+                del self.state[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = len(self.state)
+            unchanged = sum(1 for st in self.state.values() if st["unchanged"])
+        return {"tracked": total, "unchanged": unchanged}
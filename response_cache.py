@@ -0,0 +1,46 @@
+import hashlib, os, threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 직렬화된 응답 LRU 캐시 (/get_ttime_grouped)
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+
+def make_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+class ResponseCache:
+    """
+    - key → (body, etag) 를 최대 maxsize개까지 보관, 넘치면 가장 오래 안 쓴 항목 제거
+    - key에 캐시 세대(generation)를 포함시키면 갱신 시 자연스럽게 무효화됨
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> Tuple[bytes, str]:
+        entry = (body, make_etag(body))
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
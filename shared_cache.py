@@ -0,0 +1,140 @@
+import json, mmap, os, struct, tempfile, threading, time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from teetime_table import TeeTimeTable
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 멀티 워커(gunicorn)용 공유 스냅샷 세그먼트
+# <dir>/generation        u64 세대 번호 (mmap, 워커는 요청마다 8바이트만 읽음)
+# <dir>/manifest.json     {date: 세그먼트 파일명} — 세대가 바뀌었을 때만 읽음
+# <dir>/<date>.<gen>.seg  TeeTimeTable.to_bytes() — 워커가 읽기 전용 mmap (복사 없음)
+# <dir>/refresh.request   워커 → 갱신 담당 프로세스 요청함 ({"force": bool})
+# <dir>/refresh.status    갱신 담당 프로세스의 RefreshCoordinator.status()
+_DEFAULT_DIR = "/dev/shm/nawabari" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "nawabari-shm")
+SHARED_CACHE_DIR = Path(os.environ.get("SHARED_CACHE_DIR", _DEFAULT_DIR))
+_GEN = struct.Struct("<Q")
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class _Base:
+    def __init__(self, root: Path = SHARED_CACHE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # 교체(os.replace)하면 먼저 mmap한 프로세스가 옛 inode를 보게 되므로 제자리 생성만 함
+        fd = os.open(self.root / "generation", os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size < _GEN.size:
+            os.ftruncate(fd, _GEN.size)
+        self._gen_fd = fd
+        self._gen = mmap.mmap(fd, _GEN.size)
+
+    def generation(self) -> int:
+        return _GEN.unpack_from(self._gen, 0)[0]
+
+    def _manifest(self) -> Dict[str, str]:
+        try:
+            return json.loads((self.root / "manifest.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def refresh_status(self) -> Optional[Dict]:
+        try:
+            return json.loads((self.root / "refresh.status").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+class SharedSnapshotWriter(_Base):
+    """
+    - 갱신 담당 프로세스 1개만 사용: 날짜별 세그먼트를 새 파일로 쓰고 manifest 교체 → 세대 증가
+    - 이전 세그먼트 파일은 바로 삭제 (이미 mmap한 워커는 inode가 살아 있어 계속 읽을 수 있음)
+    """
+
+    def __init__(self, root: Path = SHARED_CACHE_DIR):
+        super().__init__(root)
+        self._lock = threading.Lock()
+        self._files: Dict[str, str] = self._manifest()
+
+    def publish(self, date_str: str, table: TeeTimeTable):
+        data = table.to_bytes()
+        with self._lock:
+            gen = self.generation() + 1
+            name = f"{date_str}.{gen}.seg"
+            _write_atomic(self.root / name, data)
+            old = self._files.get(date_str)
+            self._files[date_str] = name
+            self._commit(gen)
+        if old:
+            (self.root / old).unlink(missing_ok=True)
+
+    def drop(self, date_str: str):
+        with self._lock:
+            old = self._files.pop(date_str, None)
+            if old is None:
+                return
+            self._commit(self.generation() + 1)
+        (self.root / old).unlink(missing_ok=True)
+
+    def _commit(self, gen: int):
+        _write_atomic(self.root / "manifest.json", json.dumps(self._files).encode())
+        _GEN.pack_into(self._gen, 0, gen)  # manifest 교체 후에 세대를 올려야 워커가 반쪽 상태를 보지 않음
+
+    def write_status(self, status: Dict):
+        _write_atomic(self.root / "refresh.status", json.dumps(status, ensure_ascii=False).encode())
+
+    def take_request(self) -> Optional[Dict]:
+        # 워커가 남긴 갱신 요청을 꺼냄 (없으면 None)
+        path = self.root / "refresh.request"
+        try:
+            taken = path.with_name(f".refresh.request.{os.getpid()}")
+            os.replace(path, taken)
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(taken.read_text(encoding="utf-8") or "{}")
+        except ValueError:
+            return {}
+        finally:
+            taken.unlink(missing_ok=True)
+
+class SharedSnapshotReader(_Base):
+    """
+    - gunicorn 워커에서 사용: sync()가 세대 번호를 비교해 바뀐 날짜 세그먼트만 다시 mmap
+    - on_publish(date_str, table) / on_drop(date_str)로 워커 로컬 인덱스(TeeTimeIndex)에 반영
+    - 세대가 그대로면 8바이트 읽기 한 번으로 끝남
+    """
+
+    def __init__(self, root: Path = SHARED_CACHE_DIR):
+        super().__init__(root)
+        self._lock = threading.Lock()
+        self._seen_gen = -1
+        self._files: Dict[str, str] = {}
+
+    def sync(self, on_publish: Callable[[str, TeeTimeTable], None], on_drop: Callable[[str], None]) -> bool:
+        gen = self.generation()
+        if gen == self._seen_gen:
+            return False
+        with self._lock:
+            if gen == self._seen_gen:
+                return False
+            manifest = self._manifest()
+            for date_str, name in manifest.items():
+                if self._files.get(date_str) == name:
+                    continue
+                try:
+                    with open(self.root / name, "rb") as f:
+                        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except FileNotFoundError:
+                    return False  # 그 사이 더 새 세그먼트로 교체됨 → 다음 요청에서 다시 시도
+                on_publish(date_str, TeeTimeTable.from_buffer(buf))
+                self._files[date_str] = name
+            for date_str in set(self._files) - set(manifest):
+                on_drop(date_str)
+                del self._files[date_str]
+            self._seen_gen = gen
+        return True
+
+    def request_refresh(self, force: bool = False):
+        _write_atomic(self.root / "refresh.request", json.dumps({"force": force, "at": time.time()}).encode())
@@ -0,0 +1,93 @@
+import json, os, re, threading, time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from applog import get_logger
+
+log = get_logger("snapshot_store")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 날짜별 스냅샷 파일 (data/<date>.json) — 크롤러/웹 프로세스 공용
+DATA_DIR = Path(os.environ.get("DATA_DIR", "data"))
+SNAPSHOT_POLL_SEC = float(os.environ.get("SNAPSHOT_POLL_SEC", 5))
+_DATE_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.json$")
+
+class SnapshotStore:
+    """
+    - write: 임시 파일에 compact JSON으로 쓴 뒤 os.replace → 읽는 쪽은 항상 완성된 파일만 봄
+    - watch: 파일 mtime을 주기적으로 비교해 바뀐 날짜만 on_change(date_str, items) 호출
+    - 자기 프로세스가 쓴 파일은 mtime을 기억해 다시 읽지 않음
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._seen: Dict[str, int] = {}  # date_str → 마지막으로 반영한 mtime_ns
+        self._lock = threading.Lock()
+
+    def path(self, date_str: str) -> Path:
+        return self.data_dir / f"{date_str}.json"
+
+    def dates(self) -> List[str]:
+        return sorted(m.group(1) for m in (_DATE_FILE.match(p.name) for p in self.data_dir.iterdir()) if m)
+
+    def read(self, date_str: str) -> Optional[List[Dict]]:
+        try:
+            return json.loads(self.path(date_str).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def write(self, date_str: str, items: List[Dict]):
+        path = self.path(date_str)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(items, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self._seen[date_str] = path.stat().st_mtime_ns
+
+    def prune(self, keep_from: str):
+        # keep_from(YYYY-MM-DD)보다 이전 날짜 파일 삭제
+        for date_str in self.dates():
+            if date_str < keep_from:
+                self.path(date_str).unlink(missing_ok=True)
+                with self._lock:
+                    self._seen.pop(date_str, None)
+
+    def load_changed(self, on_change: Callable[[str, List[Dict]], None], keep_from: str = None) -> int:
+        # 마지막 확인 이후 바뀐 날짜만 읽어 on_change 호출, 반영한 날짜 수 반환
+        changed = 0
+        for date_str in self.dates():
+            if keep_from and date_str < keep_from:
+                continue
+            try:
+                mtime = self.path(date_str).stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                if self._seen.get(date_str) == mtime:
+                    continue
+            try:
+                items = self.read(date_str)
+            except Exception as e:
+                log.warning("⚠️ 스냅샷 읽기 실패", date=date_str, error=e)
+                continue
+            with self._lock:
+                self._seen[date_str] = mtime
+            if items is not None:
+                on_change(date_str, items)
+                changed += 1
+        return changed
+
+    def watch(self, on_change: Callable[[str, List[Dict]], None], interval: float = SNAPSHOT_POLL_SEC):
+        def _loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    today = datetime.now().strftime("%Y-%m-%d")
+                    n = self.load_changed(on_change, keep_from=today)
+                    if n:
+                        log.info("🔄 스냅샷 변경 반영", days=n)
+                except Exception as e:
+                    log.warning("⚠️ 스냅샷 감시 오류", error=e)
+        threading.Thread(target=_loop, daemon=True, name="snapshot-watch").start()
@@ -11,6 +11,12 @@ let currentRegion = "경기";
 let golfclubData = [];
 let golfclubMeta = [];
 let currentFavorites = {}; // region별 선택 상태 유지
+let lastTeeTime = { body: null, etag: null, data: null }; // 같은 조건 재조회 시 ETag로 304 재사용
+let teeView = new Map(); // 날짜(YYYY-MM-DD) → { md, hours: Map(시간대 → Map(구장 → [가격, source, url])) }
+let currentQuery = null; // 마지막 조회 조건 (/stream reset·재연결 시 같은 조건으로 재조회)
+let deltaSource = null; // /stream EventSource — 현재 조회 조건의 변경분만 푸시받음
+let pendingDeltas = null; // 조회 응답 도착 전에 받은 변경분 (응답 반영 후 순서대로 적용)
+let droppedCells = new Set(); // 방금 가격이 내려간 칸 "날짜|시간대|구장" (다음 렌더링에서 강조)
 
 window.onload = () => {
   const tomorrow = new Date();
@@ -26,129 +32,225 @@ window.onload = () => {
       golfclubMeta = d;
       loadAllGolfclubs();
     });
-
-  // ✅ 1시간마다 자동으로 /admin/refresh 호출
-  triggerAutoRefresh(); // 최초 1회
-  setInterval(triggerAutoRefresh, 60 * 60 * 1000); // 매 1시간마다
+  // 주기 갱신은 서버가 수행하고, 바뀐 가격은 조회 후 /stream으로 푸시받음
 };
 
-function triggerAutoRefresh() {
-  fetch("/admin/refresh", { method: "POST" })
-    .then(() => console.log("🔁 /admin/refresh 자동 호출 완료"))
-    .catch(err => console.error("❌ 자동 갱신 실패:", err));
-}
-
-function getTimeNumber(hourStr) {
-  const match = hourStr.match(/(\d{1,2})시대/);
-  return match ? parseInt(match[1], 10) : 0;
-}
-
-function getSortedKeys(grouped) {
-  return Object.keys(grouped).sort((a, b) => {
-    const [dateA, hourA] = a.split(" ");
-    const [dateB, hourB] = b.split(" ");
-    const fullDateA = new Date(`2025-${dateA.replace("/", "-")}`);
-    const fullDateB = new Date(`2025-${dateB.replace("/", "-")}`);
-    if (fullDateA.getTime() !== fullDateB.getTime()) {
-      return fullDateA - fullDateB;
-    }
-    return getTimeNumber(hourA) - getTimeNumber(hourB);
-  });
-}
-
 function formatToManWon(price) {
   return `${(price / 10000).toFixed(1)}`;
 }
 
-function getPriceFilterRange() {
-  const checked = Array.from(priceCheckboxes).filter(cb => cb.checked).map(cb => cb.value);
-  return function (price) {
-    if (checked.includes("10") && price <= 100000) return true;
-    if (checked.includes("15") && price <= 150000) return true;
-    if (checked.includes("over") && price > 150000) return true;
-    return checked.length === 0;
-  };
+function getPriceBands() {
+  // 서버가 가격대 코드("10", "15", "over")로 직접 필터링
+  return Array.from(priceCheckboxes).filter(cb => cb.checked).map(cb => cb.value);
 }
 
 async function getGroupedTeeTime() {
-  const start_date = startDateInput.value;
-  const end_date = endDateInput.value;
   const checkedHours = Array.from(hourCheckboxes).filter(cb => cb.checked).map(cb => parseInt(cb.value));
-  const favoriteClubs = getFavoriteClubs();
-  const priceFilter = getPriceFilterRange();
+  const priceBands = getPriceBands();
+  await runTeeTimeQuery({
+    start_date: startDateInput.value,
+    end_date: endDateInput.value,
+    hour_range: checkedHours.length ? checkedHours : null,
+    favorite_clubs: getFavoriteClubs(),
+    price_bands: priceBands.length ? priceBands : null
+  });
+}
 
-  console.log("📤 티타임 요청 시작", { start_date, end_date, checkedHours, favoriteClubs });
-  resultBody.innerHTML = `<tr><td colspan="100%">⏳ 조회 중...</td></tr>`;
+async function runTeeTimeQuery(query, quiet = false) {
+  // quiet: /stream 재연결·reset 때 화면을 비우지 않고 결과가 다 오면 한 번에 교체
+  const { start_date, end_date } = query;
+  console.log("📤 티타임 요청 시작", query);
+  if (!quiet) resultBody.innerHTML = `<tr><td colspan="100%">⏳ 조회 중...</td></tr>`;
+
+  currentQuery = query;
+  subscribeDeltas(query); // 조회 전에 구독해야 조회 중 바뀐 가격도 놓치지 않음
+  const view = new Map();
+  if (!quiet) teeView = view;
 
   try {
-    const response = await fetch("/get_ttime_grouped", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ start_date, end_date, hour_range: checkedHours.length ? checkedHours : null, favorite_clubs: favoriteClubs })
-    });
+    const body = JSON.stringify({ ...query, mode: "pivot" });
 
-    const data = (await response.json()).filter(item => priceFilter(item.price));
-    console.log("✅ 티타임 응답 도착", data);
-    renderTeeTimeTable(data);
+    // 여러 날짜 조회는 날짜별 NDJSON 스트림(피벗)으로 받아 도착하는 대로 렌더링
+    if (start_date !== end_date) {
+      await streamTeeTime(body, ({ date, pivot }) => {
+        view.set(date, pivotToDay(date, pivot));
+        if (!quiet) renderTeeTimeTable();
+      });
+      console.log("✅ 티타임 스트림 완료", view.size);
+    } else {
+      const headers = { "Content-Type": "application/json" };
+      if (lastTeeTime.body === body && lastTeeTime.etag) headers["If-None-Match"] = lastTeeTime.etag;
+      const response = await fetch("/get_ttime_grouped", { method: "POST", headers, body });
+
+      let pivot;
+      if (response.status === 304) {
+        pivot = lastTeeTime.data;
+      } else {
+        pivot = await response.json();
+        lastTeeTime = { body, etag: response.headers.get("ETag"), data: pivot };
+      }
+      console.log("✅ 티타임 응답 도착", pivot.rows.length);
+      view.set(start_date, pivotToDay(start_date, pivot));
+    }
+    teeView = view;
+    flushPendingDeltas();
+    renderTeeTimeTable();
   } catch (err) {
     console.error("❌ 요청 실패 또는 서버 오류:", err);
+    closeDeltas();
     resultBody.innerHTML = `<tr><td colspan="100%">요청 실패 또는 서버 오류</td></tr>`;
   }
 }
 
-function renderTeeTimeTable(data) {
-  const grouped = {};
-  const golfNames = new Set();
+async function streamTeeTime(body, onLine) {
+  const response = await fetch("/get_ttime_grouped/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body
+  });
+  if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let nl;
+    while ((nl = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, nl);
+      buffer = buffer.slice(nl + 1);
+      if (line.trim()) onLine(JSON.parse(line));
+    }
+  }
+  if (buffer.trim()) onLine(JSON.parse(buffer));
+}
 
-  for (const item of data) {
-    const key = `${item.date} ${item.hour}`;
-    if (!grouped[key]) grouped[key] = {};
-    if (!grouped[key][item.golf] || grouped[key][item.golf].source === "golfpang") {
-      grouped[key][item.golf] = item;
+function subscribeDeltas({ start_date, end_date, hour_range, favorite_clubs, price_bands }) {
+  closeDeltas();
+  const params = new URLSearchParams({ start_date, end_date });
+  if (hour_range) params.set("hour_range", hour_range.join(","));
+  if (price_bands) params.set("price_bands", price_bands.join(","));
+  // 선호 구장은 /get_all_golfclubs 순번으로 보내 URL 길이를 줄임 (목록에 없으면 이름 그대로)
+  const ids = [];
+  for (const name of favorite_clubs) {
+    const i = golfclubData.findIndex(c => c.name === name);
+    if (i >= 0) ids.push(i);
+    else params.append("favorite_clubs", name);
+  }
+  if (ids.length) params.set("club_ids", ids.join(","));
+
+  const source = new EventSource(`/stream?${params}`);
+  let opened = false;
+  pendingDeltas = [];
+  source.addEventListener("ready", () => {
+    // 재연결(서버 최대 유지시간, 네트워크 끊김)이면 그 사이 변경분을 놓쳤을 수 있으므로 조용히 재조회
+    if (opened) runTeeTimeQuery(currentQuery, true);
+    opened = true;
+  });
+  source.addEventListener("delta", e => {
+    const delta = JSON.parse(e.data);
+    if (pendingDeltas) {
+      pendingDeltas.push(delta);
+      return;
     }
-    golfNames.add(item.golf);
+    applyDelta(delta);
+    renderTeeTimeTable();
+  });
+  source.addEventListener("reset", () => runTeeTimeQuery(currentQuery, true));
+  deltaSource = source;
+}
+
+function closeDeltas() {
+  if (deltaSource) deltaSource.close();
+  deltaSource = null;
+  pendingDeltas = null;
+}
+
+function flushPendingDeltas() {
+  const deltas = pendingDeltas || [];
+  pendingDeltas = null;
+  deltas.forEach(applyDelta);
+}
+
+function pivotToDay(date, pivot) {
+  // 서버 피벗 응답(한 날짜 또는 여러 날짜 중 하나) → 칸 상태. 칸 선택(teescan 우선, 최저가)은 서버에서 이미 처리됨
+  const hours = new Map();
+  for (const [, hour, , cells] of pivot.rows) {
+    const row = new Map();
+    for (const [col, price, src, url] of cells) row.set(pivot.clubs[col], [price, pivot.sources[src], pivot.urls[url]]);
+    hours.set(hour, row);
+  }
+  return { md: date.slice(5).replace("-", "/"), hours };
+}
+
+function applyDelta({ date, md, added, repriced, removed }) {
+  // 변경분은 칸 단위로 덮어쓰기/삭제만 하므로 같은 변경을 두 번 적용해도 결과가 같음
+  if (!teeView.has(date)) teeView.set(date, { md, hours: new Map() });
+  const day = teeView.get(date);
+  const rowOf = hour => {
+    if (!day.hours.has(hour)) day.hours.set(hour, new Map());
+    return day.hours.get(hour);
+  };
+  for (const [hour, golf, price, source, url] of added) rowOf(hour).set(golf, [price, source, url]);
+  for (const [hour, golf, price, source, url, was] of repriced) {
+    rowOf(hour).set(golf, [price, source, url]);
+    if (price < was) droppedCells.add(`${date}|${hour}|${golf}`);
+  }
+  for (const [hour, golf] of removed) {
+    const row = day.hours.get(hour);
+    if (!row) continue;
+    row.delete(golf);
+    if (!row.size) day.hours.delete(hour);
   }
+  console.log(`📡 ${date} 변경 반영 (추가 ${added.length}, 가격변동 ${repriced.length}, 삭제 ${removed.length})`);
+}
 
+function renderTeeTimeTable() {
+  const golfNames = new Set();
+  teeView.forEach(({ hours }) => hours.forEach(row => row.forEach((_, name) => golfNames.add(name))));
   const sortedGolfNames = Array.from(golfNames).sort();
-  const sortedKeys = getSortedKeys(grouped);
 
   const thead = document.querySelector("thead tr");
   thead.innerHTML = `<th>날짜/시간대</th>` + sortedGolfNames.map(name => `<th title="${name}">${name}</th>`).join("");
   resultBody.innerHTML = "";
 
-  let lastDate = null;
-  for (const key of sortedKeys) {
-    const [date] = key.split(" ");
-    const priceMap = grouped[key];
-    if (!Object.keys(priceMap).length) continue;
-
-    const tr = document.createElement("tr");
-    if (date !== lastDate) {
-      tr.classList.add("new-date");
-      lastDate = date;
-    }
-    const tdLabel = document.createElement("td");
-    tdLabel.textContent = key;
-    tr.appendChild(tdLabel);
-
-    let minPrice = Infinity;
-    Object.values(priceMap).forEach(p => { if (p.price < minPrice) minPrice = p.price });
-
-    sortedGolfNames.forEach(name => {
-      const td = document.createElement("td");
-      const item = priceMap[name];
-      if (item) {
-        if (item.price === minPrice) td.classList.add("highlight");
-        const iconColor = item.source === "teescan" ? "red" : "blue";
-        const icon = `<span style="display:inline-block;width:14px;height:14px;border-radius:50%;background:${iconColor};color:white;font-size:10px;line-height:14px;text-align:center;margin-right:3px;font-weight:bold;">${item.source === "teescan" ? "T" : "G"}</span>`;
-        td.innerHTML = `<div class="price-cell" data-url="${item.url}" style="cursor:pointer;">${icon}${formatToManWon(item.price)}</div>`;
-      } else {
-        td.textContent = "-";
+  for (const date of Array.from(teeView.keys()).sort()) {
+    const { md, hours } = teeView.get(date);
+    let firstRow = true;
+    for (const hour of Array.from(hours.keys()).sort()) {
+      const row = hours.get(hour);
+      const minPrice = Math.min(...Array.from(row.values(), cell => cell[0]));
+      const tr = document.createElement("tr");
+      if (firstRow) {
+        tr.classList.add("new-date");
+        firstRow = false;
       }
-      tr.appendChild(td);
-    });
-    resultBody.appendChild(tr);
+      const tdLabel = document.createElement("td");
+      tdLabel.textContent = `${md} ${hour}`;
+      tr.appendChild(tdLabel);
+
+      for (const name of sortedGolfNames) {
+        const td = document.createElement("td");
+        const cell = row.get(name);
+        if (!cell) {
+          td.textContent = "-";
+          tr.appendChild(td);
+          continue;
+        }
+        const [price, source, url] = cell;
+        if (price === minPrice) td.classList.add("highlight");
+        if (droppedCells.has(`${date}|${hour}|${name}`)) td.classList.add("price-drop");
+        const iconColor = source === "teescan" ? "red" : "blue";
+        const icon = `<span style="display:inline-block;width:14px;height:14px;border-radius:50%;background:${iconColor};color:white;font-size:10px;line-height:14px;text-align:center;margin-right:3px;font-weight:bold;">${source === "teescan" ? "T" : "G"}</span>`;
+        td.innerHTML = `<div class="price-cell" data-url="${url}" style="cursor:pointer;">${icon}${formatToManWon(price)}</div>`;
+        tr.appendChild(td);
+      }
+      resultBody.appendChild(tr);
+    }
   }
+  droppedCells.clear(); // 강조는 한 번만 (CSS 애니메이션)
 }
 
 function getRegionByAddress(addr) {
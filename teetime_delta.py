@@ -0,0 +1,195 @@
+import json, os, queue, threading, time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from applog import get_logger
+from club_registry import club_id_set, resolve_club
+from metrics import STREAM_DELTAS, STREAM_SUBSCRIBERS
+from teetime_index import DaySnapshot
+from teetime_pivot import day_cells
+from teetime_table import PriceBand
+
+log = get_logger("teetime_delta")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 캐시 변경분(델타) SSE 푸시: 날짜별 칸 단위 diff를 구독 조건별로 묶어서 평가
+STREAM_BATCH_SEC = float(os.environ.get("STREAM_BATCH_SEC", 1.0))     # 같은 날짜 변경을 모아 보내는 간격
+STREAM_PING_SEC = float(os.environ.get("STREAM_PING_SEC", 15))        # 연결 유지용 주석 라인 간격
+STREAM_MAX_AGE = float(os.environ.get("STREAM_MAX_AGE", 900))         # 연결 최대 유지(초) → 브라우저가 자동 재연결
+STREAM_MAX_SUBSCRIBERS = int(os.environ.get("STREAM_MAX_SUBSCRIBERS", 100))  # 프로세스당 동시 구독 수
+STREAM_THREAD_SHARE = float(os.environ.get("STREAM_THREAD_SHARE", 0.25))     # gthread 워커에서 SSE가 쓸 수 있는 스레드 비율
+STREAM_QUEUE_MAX = int(os.environ.get("STREAM_QUEUE_MAX", 64))        # 구독자별 미전송 메시지 한도 (넘으면 reset)
+
+def thread_capped_subscribers(threads: int) -> int:
+    # gthread 워커는 SSE 연결 하나가 스레드 하나를 최대 STREAM_MAX_AGE초 점유
+    # → 구독 수를 스레드의 일부로 제한해 일반 요청(/get_ttime_grouped, /healthz 등) 몫을 남김 (초과분은 503)
+    return max(1, min(STREAM_MAX_SUBSCRIBERS, int(threads * STREAM_THREAD_SHARE)))
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+class DeltaQuery:
+    """구독 조건: 날짜 목록 + 시간대/선호 구장(대표 구장 id)/가격대 (조회 API와 같은 의미)"""
+
+    __slots__ = ("dates", "hours", "clubs", "price_bands")
+
+    def __init__(self, dates: Iterable[str], hours: Optional[Iterable[int]] = None,
+                 clubs: Optional[Iterable[str]] = None, price_bands: Optional[Sequence[PriceBand]] = None):
+        self.dates: FrozenSet[str] = frozenset(dates)
+        self.hours: Optional[FrozenSet[int]] = frozenset(hours) if hours else None
+        self.clubs: Optional[FrozenSet[int]] = club_id_set(clubs)
+        self.price_bands: Optional[Tuple[PriceBand, ...]] = tuple(sorted(set(price_bands), key=str)) if price_bands else None
+
+class Subscription:
+    def __init__(self, query: DeltaQuery):
+        self.query = query
+        self.queue: "queue.Queue[str]" = queue.Queue(maxsize=STREAM_QUEUE_MAX)
+        self.lagged = False  # 큐가 넘쳐 메시지를 버린 경우 → 클라이언트에 전체 재조회 요청
+
+    def put(self, msg: str):
+        try:
+            self.queue.put_nowait(msg)
+        except queue.Full:
+            self.lagged = True
+
+    def messages(self, ping_sec: float = STREAM_PING_SEC, max_age: float = STREAM_MAX_AGE):
+        # SSE 텍스트 조각을 순서대로 생성 (max_age가 지나면 종료 → EventSource가 재연결)
+        deadline = time.monotonic() + max_age
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            if self.lagged:
+                yield sse("reset", {"reason": "lagged"})
+                return
+            try:
+                yield self.queue.get(timeout=min(ping_sec, left))
+            except queue.Empty:
+                yield ": ping\n\n"
+
+def diff_cells(old: Dict[tuple, tuple], new: Dict[tuple, tuple]):
+    # day_cells 결과 두 개 → (added, removed, repriced), 각 항목은 (key, 이전 칸, 새 칸)
+    added = [(k, None, c) for k, c in new.items() if k not in old]
+    removed = [(k, c, None) for k, c in old.items() if k not in new]
+    repriced = [(k, old[k], c) for k, c in new.items() if k in old and old[k][1:] != c[1:]]
+    return added, removed, repriced
+
+class DeltaHub:
+    """
+    - TeeTimeIndex.on_change로 받은 (날짜, 이전, 새 스냅샷)을 날짜별로 합쳐 두었다가
+      batch_sec마다 디스패처 스레드가 한 번에 처리 (갱신 중 소스별 연속 발행을 1건으로)
+    - 날짜마다 구독자를 가격대 조합 → (시간대, 구장) 조합 순으로 묶어
+      칸 diff는 가격대 조합당 1번, 필터는 조합당 1번만 계산하고 같은 조합 구독자에게 같은 메시지를 넣음
+    - 메시지(event: delta): {"date", "md", "added": [[시간대, 구장, 가격, source, url]],
+      "repriced": [[시간대, 구장, 가격, source, url, 이전 가격]], "removed": [[시간대, 구장, 이전 가격]]}
+    - poll: 디스패처가 매 주기 호출할 함수 (worker 모드에서 공유 세그먼트 동기화용)
+    """
+
+    def __init__(self, batch_sec: float = STREAM_BATCH_SEC, max_subscribers: int = STREAM_MAX_SUBSCRIBERS,
+                 poll: Optional[Callable[[], object]] = None):
+        self.batch_sec = batch_sec
+        self.max_subscribers = max_subscribers
+        self.poll = poll
+        self._subs: List[Subscription] = []
+        self._pending: Dict[str, list] = {}  # date → [가장 오래된 이전 스냅샷, 최신 스냅샷]
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # ── 발행 쪽 (TeeTimeIndex.on_change) ──
+    def notify(self, date_str: str, old: Optional[DaySnapshot], new: Optional[DaySnapshot]):
+        with self._lock:
+            if not self._subs:
+                return
+            slot = self._pending.get(date_str)
+            if slot is None:
+                self._pending[date_str] = [old, new]
+            else:
+                slot[1] = new
+
+    # ── 구독 쪽 (/stream) ──
+    def subscribe(self, query: DeltaQuery) -> Optional[Subscription]:
+        with self._lock:
+            if len(self._subs) >= self.max_subscribers:
+                return None
+            sub = Subscription(query)
+            self._subs = self._subs + [sub]
+            n = len(self._subs)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="delta-hub", daemon=True)
+                self._thread.start()
+        STREAM_SUBSCRIBERS.set(value=n)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subs = [s for s in self._subs if s is not sub]
+            n = len(self._subs)
+            if not n:
+                self._pending.clear()
+        STREAM_SUBSCRIBERS.set(value=n)
+
+    def _run(self):
+        while True:
+            time.sleep(self.batch_sec)
+            try:
+                if self.poll is not None:
+                    self.poll()
+                self.dispatch()
+            except Exception as e:
+                log.error("❌ 델타 전송 실패", exc_info=True, error=e)
+
+    def dispatch(self) -> int:
+        # 쌓인 변경을 구독자 큐에 넣고 넣은 메시지 수를 반환
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            subs = self._subs
+        sent = 0
+        for date_str in sorted(pending):
+            old, new = pending[date_str]
+            targets = [s for s in subs if date_str in s.query.dates]
+            if targets and old is not new:
+                sent += self._dispatch_date(date_str, old, new, targets)
+        return sent
+
+    def _dispatch_date(self, date_str: str, old: Optional[DaySnapshot], new: Optional[DaySnapshot],
+                       targets: List[Subscription]) -> int:
+        by_bands: Dict[Optional[tuple], List[Subscription]] = {}
+        for s in targets:
+            by_bands.setdefault(s.query.price_bands, []).append(s)
+        md = (new or old).md
+        sent = 0
+        for bands, group in by_bands.items():
+            changes = diff_cells(day_cells(old, price_bands=bands) if old else {},
+                                 day_cells(new, price_bands=bands) if new else {})
+            by_filter: Dict[tuple, List[Subscription]] = {}
+            for s in group:
+                by_filter.setdefault((s.query.hours, s.query.clubs), []).append(s)
+            for (hours, clubs), subs in by_filter.items():
+                payload = self._payload(date_str, md, changes, hours, clubs)
+                if payload is None:
+                    continue
+                msg = sse("delta", payload)
+                for s in subs:
+                    s.put(msg)
+                sent += len(subs)
+        return sent
+
+    @staticmethod
+    def _payload(date_str: str, md: str, changes, hours, clubs) -> Optional[Dict]:
+        def _keep(entries):
+            return sorted((e for e in entries
+                           if (hours is None or e[0][0] in hours) and (clubs is None or resolve_club(e[0][2]) in clubs)),
+                          key=lambda e: e[0])
+
+        added, removed, repriced = (_keep(x) for x in changes)
+        if not (added or removed or repriced):
+            return None
+        for kind, entries in (("added", added), ("removed", removed), ("repriced", repriced)):
+            if entries:
+                STREAM_DELTAS.inc(kind, amount=len(entries))
+        return {
+            "date": date_str,
+            "md": md,
+            "added": [[hour, golf, c[1], c[2], c[3]] for (_, hour, golf), _, c in added],
+            "repriced": [[hour, golf, c[1], c[2], c[3], o[1]] for (_, hour, golf), o, c in repriced],
+            "removed": [[hour, golf, o[1]] for (_, hour, golf), o, _ in removed],
+        }
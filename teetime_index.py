@@ -0,0 +1,142 @@
+import time
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from club_registry import UNKNOWN_CLUB, club_id_set, resolve_club
+from teetime_table import INVALID_HOUR, PriceBand, TeeTimeTable
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 날짜별 불변 스냅샷 + 인덱스 (읽기 경로는 락 없이 참조만 가져감)
+class DaySnapshot:
+    """
+    - 한 날짜의 TeeTimeTable에서 (golf, hour)별 최저가 행 번호를 미리 계산
+    - best: 최저가 행 번호 (키 최초 등장 순서), by_club / by_hour: best 내 위치 인덱스
+    - 구장 키는 대표 구장 id (club_registry) — 표기가 달라도 같은 구장이면 한 칸으로 합쳐짐
+      (모르는 구장은 ~풀 인덱스, 음수라 대표 id와 겹치지 않음)
+    - club_of: 이 테이블의 golf 풀 인덱스 → 구장 키
+    - 응답 dict는 조회된 행만 그때그때 만듦 (date는 MM/DD로 미리 변환)
+    - 생성 후 변경하지 않음 → 여러 요청 스레드가 동시에 읽어도 안전
+    - created: 생성 시각(epoch 초, 캐시 나이 메트릭용)
+    """
+
+    __slots__ = ("date", "md", "size", "table", "club_of", "best", "by_club", "by_hour", "created")
+
+    def __init__(self, date_str: str, data: Union[TeeTimeTable, List[Dict]]):
+        table = data if isinstance(data, TeeTimeTable) else TeeTimeTable(date_str, data)
+        self.date = date_str
+        self.md = datetime.strptime(date_str, "%Y-%m-%d").strftime("%m/%d")
+        self.size = len(table)
+        self.table = table
+        self.created = time.time()
+
+        club_of: Dict[int, int] = {}
+        for g in set(table.golf):
+            cid = resolve_club(table.strings[g])
+            club_of[g] = cid if cid != UNKNOWN_CLUB else ~g
+        self.club_of = club_of
+
+        best: Dict[tuple, int] = {}
+        price = table.price
+        for i, (g, h, hn) in enumerate(zip(table.golf, table.hour, table.hour_num)):
+            if hn == INVALID_HOUR:
+                continue
+            k = (club_of[g], h)
+            j = best.get(k)
+            if j is None or price[i] < price[j]:
+                best[k] = i
+        self.best = array("I", best.values())
+
+        by_club: Dict[int, List[int]] = {}
+        by_hour: Dict[int, List[int]] = {}
+        for p, i in enumerate(self.best):
+            by_club.setdefault(club_of[table.golf[i]], []).append(p)
+            by_hour.setdefault(table.hour_num[i], []).append(p)
+        self.by_club = {c: array("I", ix) for c, ix in by_club.items()}
+        self.by_hour = {h: array("I", ix) for h, ix in by_hour.items()}
+
+    def _row(self, i: int) -> Dict:
+        t = self.table
+        s = t.strings
+        return dict(
+            golf=s[t.golf[i]],
+            date=self.md,
+            hour=s[t.hour[i]],
+            price=t.price[i],
+            source=s[t.source[i]],
+            url=s[t.url[i]],
+        )
+
+    def golf_ids(self, club_ids: Iterable[int]) -> set:
+        # 대표 구장 id 집합 → 이 테이블의 golf 풀 인덱스 집합 (TeeTimeTable.select의 club_ids용)
+        club_ids = set(club_ids)
+        return {g for g, c in self.club_of.items() if c in club_ids}
+
+    def select(self, hours: Optional[set] = None, clubs: Optional[Iterable[str]] = None,
+               price_bands: Optional[Sequence[PriceBand]] = None) -> List[int]:
+        # 조건에 맞는 최저가 행 번호 (키 최초 등장 순서), clubs는 구장명 목록 (표기 무관)
+        best = self.best
+        if clubs:
+            by_club = self.by_club
+            rows = [best[p] for p in sorted(p for c in club_id_set(clubs) for p in by_club.get(c, ()))]
+            if hours:
+                rows = self.table.select(rows, hours=hours)
+        elif hours:
+            rows = [best[p] for p in sorted(p for h in hours for p in self.by_hour.get(h, ()))]
+        else:
+            rows = self.best
+        if price_bands:
+            rows = self.table.select(rows, price_bands=price_bands)
+        return rows
+
+    def query(self, hours: Optional[set] = None, clubs: Optional[Iterable[str]] = None,
+              price_bands: Optional[Sequence[PriceBand]] = None, by_hour: bool = False) -> List[Dict]:
+        rows = self.select(hours, clubs, price_bands)
+        if by_hour:
+            # 시간대 → 구장명 순 정렬 (스트리밍 응답용)
+            t = self.table
+            rows = sorted(rows, key=lambda i: (t.hour_num[i], t.strings[t.golf[i]]))
+        return [self._row(i) for i in rows]
+
+class TeeTimeIndex:
+    """
+    - 날짜 → DaySnapshot 매핑을 copy-on-write로 유지
+    - publish는 새 dict를 만들어 참조만 교체(원자적), 읽기는 락을 잡지 않음
+    - generation은 publish/drop마다 1씩 증가 (응답 캐시 무효화용)
+    - on_change(fn)로 등록한 콜백은 교체 직후 fn(date_str, 이전 스냅샷, 새 스냅샷)으로 호출
+      (drop이면 새 스냅샷은 None, 발행자 스레드에서 바로 호출되므로 가볍게 유지할 것)
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, DaySnapshot] = {}
+        self.generation = 0
+        self._listeners: List[Callable] = []
+
+    def on_change(self, fn: Callable[[str, Optional[DaySnapshot], Optional[DaySnapshot]], None]):
+        self._listeners.append(fn)
+
+    def publish(self, date_str: str, data: Union[TeeTimeTable, List[Dict]]) -> DaySnapshot:
+        snap = DaySnapshot(date_str, data)
+        snapshots = dict(self._snapshots)
+        old = snapshots.get(date_str)
+        snapshots[date_str] = snap
+        self._snapshots = snapshots
+        self.generation += 1
+        for fn in self._listeners:
+            fn(date_str, old, snap)
+        return snap
+
+    def drop(self, date_str: str):
+        snapshots = dict(self._snapshots)
+        old = snapshots.pop(date_str, None)
+        self._snapshots = snapshots
+        self.generation += 1
+        if old is not None:
+            for fn in self._listeners:
+                fn(date_str, old, None)
+
+    def get(self, date_str: str) -> Optional[DaySnapshot]:
+        return self._snapshots.get(date_str)
+
+    def dates(self) -> List[str]:
+        return sorted(self._snapshots)
@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from club_registry import club_id_set
+from teetime_index import DaySnapshot
+from teetime_table import INVALID_HOUR, PriceBand
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 날짜×시간대×구장 피벗 응답 (script.js renderTeeTimeTable이 하던 재그룹핑을 서버에서)
+# 가격대 체크박스 값 → (lo, hi]  (script.js getPriceFilterRange와 같은 의미)
+PRICE_BAND_CODES: Dict[str, PriceBand] = {
+    "10": (None, 100000),
+    "15": (None, 150000),
+    "over": (150000, None),
+}
+PREFERRED_SOURCE = "teescan"  # 같은 칸에 두 소스가 있으면 teescan 우선
+
+def parse_price_bands(value) -> Optional[List[PriceBand]]:
+    # ["10", "over"] 처럼 체크박스 코드 또는 [[lo, hi], ...] 모두 허용
+    if not value:
+        return None
+    bands = []
+    for v in value:
+        if isinstance(v, (list, tuple)):
+            lo, hi = v
+            bands.append((None if lo is None else int(lo), None if hi is None else int(hi)))
+        elif str(v) in PRICE_BAND_CODES:
+            bands.append(PRICE_BAND_CODES[str(v)])
+        else:
+            raise ValueError(f"unknown price band: {v}")
+    return bands
+
+def day_cells(snap: DaySnapshot, hours: Optional[set] = None, club_ids: Optional[set] = None,
+              price_bands: Optional[Sequence[PriceBand]] = None) -> Dict[Tuple[int, str, str], tuple]:
+    # 한 날짜의 (hour_num, 시간대, 구장) 칸 → (source 우선순위, 가격, source, url)
+    # 필터 적용 후 칸마다 1건: teescan 우선, 같은 소스끼리는 최저가 (피벗 / 델타 스트림 공용)
+    t = snap.table
+    s = t.strings
+    cells: Dict[Tuple[int, str, str], tuple] = {}
+    for i in t.select(range(len(t)), hours, club_ids, price_bands):
+        hn = t.hour_num[i]
+        if hn == INVALID_HOUR:
+            continue
+        source = s[t.source[i]]
+        cand = (source != PREFERRED_SOURCE, t.price[i], source, s[t.url[i]])
+        key = (hn, s[t.hour[i]], s[t.golf[i]])
+        cur = cells.get(key)
+        if cur is None or cand[:2] < cur[:2]:
+            cells[key] = cand
+    return cells
+
+def build_pivot(snapshots: Iterable[Tuple[str, DaySnapshot]], hours: Optional[set] = None,
+                clubs: Optional[Iterable[str]] = None,
+                price_bands: Optional[Sequence[PriceBand]] = None) -> Dict:
+    """
+    - 가격대/시간대/선호 구장 필터를 먼저 적용한 뒤 (날짜, 시간대, 구장) 칸마다 1건 선택
+      (teescan 우선, 같은 소스끼리는 최저가)
+    - 응답: clubs(열 순서), sources, urls(인턴 목록),
+            rows = [[MM/DD, 시간대, 행 최저가, [[열, 가격, source 번호, url 번호], ...]], ...]
+    - rows는 날짜 → 시간대 순으로 정렬되어 있어 클라이언트는 그대로 그리기만 하면 됨
+    """
+    favorite_ids = club_id_set(clubs)
+    cells: Dict[tuple, Dict[str, tuple]] = {}
+    for date_str, snap in snapshots:
+        club_ids = snap.golf_ids(favorite_ids) if favorite_ids is not None else None
+        for (hn, hour, golf), cand in day_cells(snap, hours, club_ids, price_bands).items():
+            cells.setdefault((date_str, hn, hour, snap.md), {})[golf] = cand
+
+    club_names = sorted({g for slot in cells.values() for g in slot})
+    col = {g: i for i, g in enumerate(club_names)}
+    sources: Dict[str, int] = {}
+    urls: Dict[str, int] = {}
+    rows = []
+    for (date_str, hn, hour, md), slot in sorted(cells.items(), key=lambda kv: kv[0][:3]):
+        row_cells = []
+        for golf in sorted(slot, key=col.get):
+            _, price, source, url = slot[golf]
+            row_cells.append([
+                col[golf],
+                price,
+                sources.setdefault(source, len(sources)),
+                urls.setdefault(url, len(urls)),
+            ])
+        rows.append([md, hour, min(c[1] for c in row_cells), row_cells])
+
+    return {
+        "clubs": club_names,
+        "sources": list(sources),
+        "urls": list(urls),
+        "rows": rows,
+    }
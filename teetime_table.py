@@ -0,0 +1,140 @@
+import json, struct, sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 날짜별 컬럼형 티타임 테이블
+# - 행마다 dict(8키) 대신 컬럼별 array + 날짜 단위 문자열 풀(인턴) 사용
+# - 문자열 컬럼은 풀 인덱스(H/I), hour_num은 b, price는 q
+STR_COLUMNS = ("golf", "hour", "source", "url", "benefit")
+INVALID_HOUR = -128  # hour_num 파싱 불가 행 (조회 대상에서 제외)
+
+SEGMENT_MAGIC = b"TTT1"  # to_bytes 포맷: magic + u32 헤더 길이 + JSON 헤더 + 8바이트 정렬 컬럼들
+
+PriceBand = Tuple[Optional[int], Optional[int]]  # (lo, hi) → lo < price <= hi, None은 무한
+
+def _hour_num(value) -> int:
+    try:
+        h = int(value)
+    except Exception:
+        return INVALID_HOUR
+    return h if -127 <= h <= 127 else INVALID_HOUR
+
+def in_price_bands(price: int, bands: Sequence[PriceBand]) -> bool:
+    for lo, hi in bands:
+        if (lo is None or price > lo) and (hi is None or price <= hi):
+            return True
+    return False
+
+class TeeTimeTable:
+    """
+    - 한 날짜의 원본 아이템 리스트를 컬럼형으로 압축 보관 (생성 후 불변)
+    - to_items()로 기존 아이템 형태(dict 리스트)를 그대로 복원
+    - to_bytes()/from_buffer()로 공유 메모리 세그먼트에 쓰고 복사 없이 다시 읽음
+      (from_buffer 테이블의 컬럼은 array 대신 같은 타입코드의 memoryview)
+    """
+
+    __slots__ = ("date", "strings") + STR_COLUMNS + ("hour_num", "price")
+
+    def __init__(self, date_str: str, items: Iterable[Dict]):
+        pool: Dict[str, int] = {}
+        cols: Dict[str, List[int]] = {c: [] for c in STR_COLUMNS}
+        hour_num: List[int] = []
+        price: List[int] = []
+        for it in items:
+            for c in STR_COLUMNS:
+                s = it.get(c) or ""
+                ix = pool.get(s)
+                if ix is None:
+                    ix = pool[s] = len(pool)
+                cols[c].append(ix)
+            hour_num.append(_hour_num(it.get("hour_num")))
+            price.append(int(it["price"]))
+
+        code = "H" if len(pool) <= 0xFFFF else "I"
+        self.date = date_str
+        self.strings = tuple(sys.intern(s) for s in pool)
+        for c in STR_COLUMNS:
+            setattr(self, c, array(code, cols[c]))
+        self.hour_num = array("b", hour_num)
+        self.price = array("q", price)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def to_bytes(self) -> bytes:
+        names = STR_COLUMNS + ("hour_num", "price")
+        cols = []
+        offset = 0
+        for name in names:
+            col = getattr(self, name)
+            cols.append([name, col.typecode if isinstance(col, array) else col.format, offset, len(col)])
+            offset += -(-col.itemsize * len(col) // 8) * 8
+        header = json.dumps({"date": self.date, "strings": list(self.strings), "columns": cols},
+                            ensure_ascii=False).encode()
+        head = SEGMENT_MAGIC + struct.pack("<I", len(header)) + header
+        head += b"\0" * (-len(head) % 8)
+        out = bytearray(head)
+        for name in names:
+            data = bytes(getattr(self, name))
+            out += data + b"\0" * (-len(data) % 8)
+        return bytes(out)
+
+    @classmethod
+    def from_buffer(cls, buf) -> "TeeTimeTable":
+        # buf(mmap 등)를 그대로 참조 — 컬럼 데이터 복사 없음, 문자열 풀만 디코딩
+        mv = memoryview(buf)
+        if bytes(mv[:4]) != SEGMENT_MAGIC:
+            raise ValueError("not a tee-time segment")
+        (hlen,) = struct.unpack_from("<I", mv, 4)
+        header = json.loads(bytes(mv[8:8 + hlen]))
+        base = 8 + hlen + (-(8 + hlen) % 8)
+
+        t = cls.__new__(cls)
+        t.date = header["date"]
+        t.strings = tuple(sys.intern(x) for x in header["strings"])
+        for name, code, offset, count in header["columns"]:
+            size = struct.calcsize(code)
+            setattr(t, name, mv[base + offset: base + offset + size * count].cast(code))
+        return t
+
+    def nbytes(self) -> int:
+        cols = [getattr(self, c) for c in STR_COLUMNS] + [self.hour_num, self.price]
+        return sum(col.itemsize * len(col) for col in cols)
+
+    def to_items(self) -> List[Dict]:
+        s = self.strings
+        return [
+            {
+                "golf": s[g],
+                "date": self.date,
+                "hour": s[h],
+                "hour_num": hn if hn != INVALID_HOUR else None,
+                "price": p,
+                "benefit": s[b],
+                "url": s[u],
+                "source": s[src],
+            }
+            for g, h, hn, p, b, u, src in zip(
+                self.golf, self.hour, self.hour_num, self.price, self.benefit, self.url, self.source
+            )
+        ]
+
+    def string_ids(self, values: Iterable[str]) -> set:
+        # 문자열 → 이 테이블의 풀 인덱스 (없는 값은 무시)
+        lookup = {s: i for i, s in enumerate(self.strings)}
+        return {lookup[v] for v in values if v in lookup}
+
+    def select(self, rows: Sequence[int], hours: Optional[set] = None, club_ids: Optional[set] = None,
+               price_bands: Optional[Sequence[PriceBand]] = None) -> List[int]:
+        # rows(행 번호) 중 시간대/구장/가격대 조건을 모두 만족하는 행만 반환
+        if club_ids is not None:
+            golf = self.golf
+            rows = [i for i in rows if golf[i] in club_ids]
+        if hours:
+            hour_num = self.hour_num
+            rows = [i for i in rows if hour_num[i] in hours]
+        if price_bands:
+            price = self.price
+            rows = [i for i in rows if in_price_bands(price[i], price_bands)]
+        return list(rows)
@@ -0,0 +1,9 @@
+import os, sys, tempfile
+
+# 루트의 평면 모듈(app.py, crawl_orchestrator.py …)을 그대로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app import 시 만들어지는 스냅샷/가격 이력 디렉터리를 저장소 밖 임시 디렉터리로
+_tmp = tempfile.mkdtemp(prefix="nawabari-tests-")
+os.environ.setdefault("DATA_DIR", _tmp)
+os.environ.setdefault("SHARED_CACHE_DIR", os.path.join(_tmp, "shm"))
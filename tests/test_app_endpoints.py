@@ -0,0 +1,29 @@
+import pytest
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app
+    from price_history import PriceHistory
+
+    monkeypatch.setattr(app, "HISTORY", PriceHistory(tmp_path / "history", writable=True))
+    return app.app.test_client()
+
+def test_bad_price_band_is_400_on_post(client):
+    body = {"start_date": "2026-10-20", "end_date": "2026-10-20", "price_bands": ["cheap"]}
+    for path in ("/get_ttime_grouped", "/get_ttime_grouped/stream"):
+        resp = client.post(path, json=body)
+        assert resp.status_code == 400, path
+        assert "unknown price band" in resp.get_json()["error"]
+
+def test_history_accepts_suffixed_club_name(client):
+    import app
+    from teetime_table import TeeTimeTable
+
+    table = TeeTimeTable("2026-10-20", [dict(golf="세현", hour="07시대", hour_num=7, price=120000,
+                                              source="teescan", url="", benefit="")])
+    app.HISTORY.record("2026-10-20", table, ts=1)
+    for club in ("세현", "세현CC", "세현 컨트리클럽"):
+        resp = client.get("/history", query_string={"club": club, "hour": 7, "date": "2026-10-20"})
+        assert resp.status_code == 200, club
+        assert resp.get_json()["current"] == 120000
+    assert client.get("/history", query_string={"club": "없는구장", "hour": 7}).status_code == 404
@@ -0,0 +1,38 @@
+import io, json, logging, queue
+from logging.handlers import QueueListener
+
+from applog import _JsonFormatter, _QueueHandler, _TextFormatter
+
+def _through_queue(formatter, emit):
+    out = io.StringIO()
+    sink = logging.StreamHandler(out)
+    sink.setFormatter(formatter)
+    q = queue.SimpleQueue()
+    logger = logging.getLogger("nawabari-test-applog")
+    logger.propagate = False
+    handler = _QueueHandler(q)
+    logger.addHandler(handler)
+    listener = QueueListener(q, sink)
+    listener.start()
+    try:
+        emit(logger)
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+    return out.getvalue()
+
+def _fail(logger):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("❌ 실패 %s", "x", exc_info=True, extra={"fields": {"date": "2026-10-20"}})
+
+def test_json_keeps_exception_through_queue():
+    doc = json.loads(_through_queue(_JsonFormatter(), _fail))
+    assert doc["msg"] == "❌ 실패 x"
+    assert doc["date"] == "2026-10-20"
+    assert "Traceback" in doc["exc"] and "ValueError: boom" in doc["exc"]
+
+def test_text_keeps_exception_through_queue():
+    text = _through_queue(_TextFormatter(), _fail)
+    assert "❌ 실패 x" in text and "ValueError: boom" in text
@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+
+from crawl_orchestrator import CircuitBreaker
+
+def test_hold_survives_later_success():
+    cb = CircuitBreaker("t", thresh=3, cool_min=5)
+    cb.hold(600)
+    cb.on_success()
+    assert not cb.allowed()
+    assert cb.seconds_left() > 590
+
+def test_success_resets_fails_and_clears_expired_hold():
+    cb = CircuitBreaker("t", thresh=3, cool_min=5)
+    cb.on_failure(); cb.on_failure()
+    cb.open_until = datetime.now() - timedelta(seconds=1)
+    cb.on_success()
+    assert cb.fails == 0
+    assert cb.open_until is None
+    assert cb.allowed()
@@ -0,0 +1,19 @@
+from club_registry import UNKNOWN_CLUB, canonical_name, canonicalize_items, club_id_set, resolve_club
+from golfpang_parser import parse_page
+
+def test_suffixed_names_resolve_to_canonical_club():
+    assert canonical_name("세현CC") == canonical_name("세현 컨트리클럽") == "세현"
+    assert resolve_club("없는구장CC") == UNKNOWN_CLUB
+    assert club_id_set(["세현CC", "세현", "없는구장"]) == frozenset({resolve_club("세현")})
+
+def test_renamed_golfpang_club_resolves_by_code():
+    # 이름만으로는 모르는 표기여도 링크의 Golfpang 코드(Golpang_code=74)로 대표 구장을 찾음
+    html = ('<ul><li class="item"><span class="clubNm">윈체스트 리조트 골프앤CC</span>'
+            '<span class="date">2026-10-20</span><span class="time">07:10</span>'
+            '<span class="price">90,000원</span><a href="/web/round/booking_view.do?club_code=74&id=1">예약</a></li></ul>')
+    rows = parse_page(html)
+    assert resolve_club(rows[0]["golf"]) == UNKNOWN_CLUB
+    assert rows[0]["club_code"] == "74"
+    (row,) = canonicalize_items(rows)
+    assert row["golf"] == "윈체스트"
+    assert "club_code" not in row
@@ -0,0 +1,33 @@
+import crawl_orchestrator as co
+import crawl_queue as cq
+import crawler_utils as cu
+
+def _round(tmp_path, monkeypatch, fetch, sectors):
+    monkeypatch.setattr(cu, "crawl_golfpang_multi", fetch)
+    monkeypatch.setattr(cu, "_teescan_clubs", lambda: [])
+    monkeypatch.setitem(co.BREAKERS, "golfpang", co.CircuitBreaker("golfpang", thresh=100, cool_min=5))
+    queue = cq.CrawlQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2)
+    published = []
+    worker = cq.ShardWorker(queue, lambda *a: published.append(a))
+    worker.run(lambda: ["2026-10-20"], interval=0, once=True, sectors=sectors)
+    return queue, published
+
+def test_failed_sector_lease_is_retried_and_not_published(tmp_path, monkeypatch):
+    def fail(date_strs, favorite, sectors):
+        raise cu.SectorFetchError(sectors, {d: [] for d in date_strs})
+
+    queue, published = _round(tmp_path, monkeypatch, fail, [5])
+    assert published == []
+    assert queue.status()["units"] == {cq.FAILED: 1}
+    (attempts,) = queue._conn.execute("SELECT attempts FROM units").fetchone()
+    assert attempts == 2
+
+def test_partial_sector_failure_replaces_only_fetched_clubs(tmp_path, monkeypatch):
+    def fetch(date_strs, favorite, sectors):
+        if sectors == [4]:
+            raise cu.SectorFetchError(sectors, {})
+        return {d: [{"golf": "세현", "date": d}] for d in date_strs}
+
+    queue, published = _round(tmp_path, monkeypatch, fetch, [5, 4])
+    assert [(p[0], p[1], p[3]) for p in published] == [("2026-10-20", "golfpang", {"세현"})]
+    assert queue._conn.execute("SELECT COUNT(*) FROM freshness").fetchone()[0] == 0
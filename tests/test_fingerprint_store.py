@@ -0,0 +1,21 @@
+from fingerprint_store import CHANGED, UNCHANGED, FingerprintStore
+
+class _Resp:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+def test_caller_mutation_does_not_touch_stored_items():
+    store = FingerprintStore()
+    key = ("golfpang", 5, 1)
+    items, result = store.resolve(key, _Resp(b"page"), lambda r: [{"golf": "세현CC", "price": 1}])
+    assert result == CHANGED
+    items[0]["golf"] = "세현"
+
+    again, result = store.resolve(key, _Resp(b"page"), lambda r: [])
+    assert result == UNCHANGED
+    assert again == [{"golf": "세현CC", "price": 1}]
+    again[0]["price"] = 2
+    assert store.resolve(key, _Resp(b"page"), lambda r: [])[0][0]["price"] == 1
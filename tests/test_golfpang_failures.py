@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import crawl_orchestrator as co
+import crawler_utils as cu
+from bench.fixtures import synthesize
+from bench.server import GOLFPANG_PATH, StandInServer
+
+@pytest.fixture
+def breaker(monkeypatch):
+    b = co.CircuitBreaker("golfpang", thresh=5, cool_min=5)
+    monkeypatch.setitem(co.BREAKERS, "golfpang", b)
+    return b
+
+def _run(date_strs, sectors):
+    published = []
+    asyncio.run(co._run_golfpang(date_strs, [], sectors, lambda *a: published.append(a), None))
+    return published
+
+def test_sector_http_errors_raise(monkeypatch):
+    fs = synthesize(span_days=2, pages=1)
+    server = StandInServer(fs, latency_ms=0, jitter_ms=0, error_rate=1.0).start()
+    try:
+        monkeypatch.setattr(cu, "LIST_URL", server.url + GOLFPANG_PATH)
+        monkeypatch.setattr(cu, "GPANG_RETRIES", 0)
+        with pytest.raises(cu.SectorFetchError) as e:
+            cu.crawl_golfpang_multi([fs.base_date], [], [5])
+        assert e.value.sectors == [5]
+    finally:
+        server.stop()
+
+def test_all_sectors_failed_keeps_cache_and_counts_failure(monkeypatch, breaker):
+    def fail(date_strs, favorite, sectors):
+        raise cu.SectorFetchError(sectors, {d: [] for d in date_strs})
+
+    monkeypatch.setattr(cu, "crawl_golfpang_multi", fail)
+    assert _run(["2026-10-20"], [5, 4]) == []
+    assert breaker.fails == 2
+
+def test_partial_sector_failure_replaces_only_fetched_clubs(monkeypatch, breaker):
+    def fetch(date_strs, favorite, sectors):
+        if sectors == [4]:
+            raise cu.SectorFetchError(sectors, {})
+        return {d: [{"golf": "세현", "date": d}] for d in date_strs}
+
+    monkeypatch.setattr(cu, "crawl_golfpang_multi", fetch)
+    published = _run(["2026-10-20"], [5, 4])
+    assert [(p[0], p[1], p[3]) for p in published] == [("2026-10-20", "golfpang", {"세현"})]
+
+def test_partial_sector_failure_leaves_golfpang_due(monkeypatch, breaker):
+    from refresh_scheduler import ALL, RefreshScheduler
+
+    def fetch(date_strs, favorite, sectors):
+        if sectors == [4]:
+            raise cu.SectorFetchError(sectors, {})
+        return {d: [] for d in date_strs}
+
+    monkeypatch.setattr(cu, "crawl_golfpang_multi", fetch)
+    scheduler = RefreshScheduler()
+    asyncio.run(co._run_golfpang(["2026-10-20"], [], [5, 4], lambda *a: None, scheduler))
+    assert scheduler.is_due("golfpang", ALL, ALL)
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from bench.fixtures import synthesize
+from golfpang_parser import parse_page_bs4, parse_page_lxml
+
+pytest.importorskip("lxml")
+pytest.importorskip("bs4")
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "golfpang").glob("*.html"))
+
+def _brief(rows):
+    return [(r["golf"], r["date"], r["hour"], r["price"]) for r in rows]
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.name)
+def test_parsers_agree_on_fixture_pages(path):
+    html = path.read_text(encoding="utf-8")
+    assert parse_page_lxml(html) == parse_page_bs4(html)
+
+def test_parsers_agree_on_synthetic_pages():
+    for html in synthesize(seed=11).golfpang.values():
+        assert parse_page_lxml(html) == parse_page_bs4(html)
+
+def test_nested_containers_emit_one_row_each():
+    html = (Path(__file__).parent / "fixtures" / "golfpang" / "nested_cards.html").read_text(encoding="utf-8")
+    assert _brief(parse_page_bs4(html)) == [
+        ("윈체스트CC", "2026-10-22", "11시대", 110000),
+        ("블루헤런GC", "2026-10-22", "14시대", 240000),
+        ("남서울CC", "2026-10-23", "07시대", 185000),
+        ("남서울CC", "2026-10-23", "08시대", 189000),
+        ("세현CC", "2026-10-24", "12시대", 99000),
+    ]
+
+def test_fallback_price_ignores_date_year():
+    html = (Path(__file__).parent / "fixtures" / "golfpang" / "table_rows.html").read_text(encoding="utf-8")
+    assert [r["price"] for r in parse_page_lxml(html)] == [135000, 145000, 120000]
+    list_items = (Path(__file__).parent / "fixtures" / "golfpang" / "list_items.html").read_text(encoding="utf-8")
+    assert "가격미정CC" not in {r["golf"] for r in parse_page_lxml(list_items)}
@@ -0,0 +1,23 @@
+import crawler_utils as cu
+from metrics import HTTP_RETRIES
+from rate_control import RateController
+
+class _Resp:
+    def __init__(self, status):
+        self.status_code = status
+        self.headers = {"Retry-After": "0"} if status == 429 else {}
+
+class _Session:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def get(self, url, **kwargs):
+        return _Resp(self.statuses.pop(0))
+
+def test_429_then_200_counts_one_retry(monkeypatch):
+    monkeypatch.setitem(cu.RATES, "teescan", RateController("teescan", 1000, 100, 1000))
+    key = ("upstream.test", "429")
+    before = HTTP_RETRIES._values.get(key, 0)
+    r = cu._get(_Session([429, 200]), "teescan", "https://upstream.test/api", retries=2)
+    assert r.status_code == 200
+    assert HTTP_RETRIES._values.get(key, 0) == before + 1
@@ -0,0 +1,23 @@
+from teetime_table import TeeTimeTable
+from price_history import PriceHistory
+
+DATE = "2026-10-20"
+
+def _table(*rows):
+    return TeeTimeTable(DATE, [dict(golf=g, hour="07시대", hour_num=7, price=p, source=src, url="", benefit="")
+                               for g, p, src in rows])
+
+def _current(h, club, source):
+    return h.query(club, 7, DATE, source=source)["current"]
+
+def test_missing_cells_zeroed_only_for_refreshed_source_and_clubs(tmp_path):
+    h = PriceHistory(tmp_path, writable=True)
+    h.record(DATE, _table(("A", 100000, "teescan"), ("B", 90000, "golfpang")), ts=1)
+
+    assert h.record(DATE, _table(), ts=2) == 0  # 무엇을 수집했는지 모름 → 사라진 칸 기록 안 함
+    assert h.record(DATE, _table(), ts=3, source="teescan", clubs={"C"}) == 0
+    assert _current(h, "A", "teescan") == 100000
+
+    assert h.record(DATE, _table(("B", 90000, "golfpang")), ts=4, source="teescan", clubs={"A"}) == 1
+    assert _current(h, "A", "teescan") is None
+    assert _current(h, "B", "golfpang") == 90000
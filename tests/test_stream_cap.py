@@ -0,0 +1,16 @@
+import teetime_delta
+from teetime_delta import DeltaHub, DeltaQuery, thread_capped_subscribers
+
+def test_cap_leaves_threads_for_normal_requests():
+    assert thread_capped_subscribers(16) == 4
+    assert thread_capped_subscribers(2) == 1
+
+def test_cap_never_exceeds_configured_max(monkeypatch):
+    monkeypatch.setattr(teetime_delta, "STREAM_MAX_SUBSCRIBERS", 3)
+    assert thread_capped_subscribers(64) == 3
+
+def test_hub_rejects_beyond_cap():
+    hub = DeltaHub(max_subscribers=thread_capped_subscribers(16))
+    subs = [hub.subscribe(DeltaQuery(["2026-10-20"])) for _ in range(5)]
+    assert sum(s is not None for s in subs) == 4
+    assert subs[-1] is None
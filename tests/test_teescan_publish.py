@@ -0,0 +1,48 @@
+import asyncio
+
+import crawl_orchestrator as co
+import crawler_utils as cu
+
+def test_failed_clubs_are_not_in_replace_set(monkeypatch):
+    clubs = [{"name": "A", "seq": "1"}, {"name": "B", "seq": "2"}]
+
+    def fetch(session, club, date_str, strict):
+        if club["name"] == "B":
+            raise RuntimeError("upstream down")
+        return [{"golf": club["name"], "date": date_str}]
+
+    monkeypatch.setattr(cu, "_teescan_clubs", lambda: clubs)
+    monkeypatch.setattr(cu, "_fetch_teescan", fetch)
+    monkeypatch.setitem(co.BREAKERS, "teescan", co.CircuitBreaker("teescan", thresh=20, cool_min=5))
+    published = []
+    asyncio.run(co._run_teescan(["2026-10-20"], [], lambda *a: published.append(a), None))
+    assert [(p[1], [it["golf"] for it in p[2]], p[3]) for p in published] == [("teescan", ["A"], {"A"})]
+
+def _scheduled_run(monkeypatch, fetch, publish, timeout=600):
+    from refresh_scheduler import RefreshScheduler
+
+    monkeypatch.setattr(cu, "_teescan_clubs", lambda: [{"name": "A", "seq": "1"}])
+    monkeypatch.setattr(cu, "_fetch_teescan", fetch)
+    monkeypatch.setattr(co, "TEESCAN_TOTAL_TIMEOUT", timeout)
+    monkeypatch.setitem(co.BREAKERS, "teescan", co.CircuitBreaker("teescan", thresh=20, cool_min=5))
+    scheduler = RefreshScheduler()
+    asyncio.run(co._run_teescan(["2026-10-20", "2026-10-21"], [], publish, scheduler))
+    return scheduler
+
+def test_timed_out_date_stays_due(monkeypatch):
+    import time
+
+    def fetch(session, club, date_str, strict):
+        if date_str == "2026-10-21":
+            time.sleep(0.5)  # 전체 타임아웃 안에 끝나지 않는 날짜
+        return [{"golf": club["name"], "date": date_str}]
+
+    scheduler = _scheduled_run(monkeypatch, fetch, lambda *a: None, timeout=0.2)
+    assert not scheduler.is_due("teescan", "A", "2026-10-20")
+    assert scheduler.is_due("teescan", "A", "2026-10-21")
+
+def test_dropped_publish_stays_due(monkeypatch):
+    scheduler = _scheduled_run(monkeypatch, lambda s, club, d, strict: [{"golf": "A", "date": d}],
+                               lambda date_str, *a: False if date_str == "2026-10-21" else None)
+    assert not scheduler.is_due("teescan", "A", "2026-10-20")
+    assert scheduler.is_due("teescan", "A", "2026-10-21")
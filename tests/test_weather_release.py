@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import weather
+
+
+def test_fetch_uses_current_release(monkeypatch):
+    # 02시 이전(발표 지연 포함)에는 전날 23시 발표본으로 조회해야 함
+    class _Now(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 5, 2, 1, 0)
+
+    calls = []
+
+    def fake_forecast(nx, ny, base_date, base_time, label=""):
+        calls.append((base_date, base_time))
+        return {"20260502": {"0600": {"TMP": "12"}}, "20260503": {"0600": {"TMP": "14"}}}
+
+    monkeypatch.setattr(weather, "datetime", _Now)
+    monkeypatch.setattr(weather, "get_forecast", fake_forecast)
+
+    club = {"name": "t", "grid": (60, 127)}
+    assert weather.fetch_club_weather(club, "2026-05-03") == {"0600": {"TMP": "14"}}
+    weather.fetch_weather("t", 37.5, 127.0)
+    assert calls == [weather.current_release(_Now.now())] * 2
+    assert calls[0] == ("20260501", "2300")
@@ -1,21 +1,93 @@
 import requests
 from datetime import datetime, timedelta
+from concurrent.futures import Future
 import json
+import math
 import os
+import re
+import threading
+
+from applog import get_logger
+
+log = get_logger("weather")
 
 SERVICE_KEY = os.getenv("0pufYd46gOsX61f/gjCIhoD1jrtJcgclBVmFnsryJ5AxXV9g1+Td+26feW3O46x9tl0iIY7DJS12GFuHlraF4w==")  # 기상청 API 인증키 (환경변수에서 읽기)
 VILAGE_FCST_URL = "https://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getVilageFcst"
+BASE_HOURS = [2, 5, 8, 11, 14, 17, 20, 23]  # 단기예보 발표 시각
+COALESCE_TIMEOUT = 10  # 같은 격자를 먼저 요청한 쪽의 응답을 기다리는 최대 시간(초)
+RELEASE_DELAY = timedelta(minutes=int(os.environ.get("KMA_RELEASE_DELAY_MIN", 10)))  # 발표 후 API 반영까지 여유
+
+# (nx, ny, base_date, base_time) → (만료 시각, {fcstDate: 시간대별 dict})
+# 반환되는 dict는 여러 호출자가 공유하므로 수정하지 말 것
+FORECAST_CACHE = {}
+_INFLIGHT = {}
+_FORECAST_LOCK = threading.Lock()
 
 def fetch_weather(golf_name, lat, lng, base_date=None):
     # 좌표 변환 (위경도 → 격자)
     nx, ny = convert_grid(lat, lng)
-    
-    # 날짜 및 시간 설정
+    return _pick(get_forecast(nx, ny, *current_release(datetime.now()), label=golf_name), base_date)
+
+def fetch_club_weather(club, base_date=None):
+    # club_registry의 구장 dict (격자 좌표 grid가 미리 계산되어 있음)
+    nx, ny = club["grid"]
+    return _pick(get_forecast(nx, ny, *current_release(datetime.now()), label=club["name"]), base_date)
+
+def get_daily_forecast(grid, date_str, now=None):
+    # 최신 발표본 기준 특정 날짜(YYYY-MM-DD)의 시간대별 dict (예보 범위 밖이면 빈 dict)
+    base_date, base_time = current_release(now or datetime.now())
+    return get_forecast(grid[0], grid[1], base_date, base_time).get(date_str.replace("-", ""), {})
+
+def _pick(by_date, base_date):
+    # base_date(YYYY-MM-DD)는 발표 시각이 아니라 조회할 예보 날짜 — 없으면 전체를 평탄화
+    if base_date is None:
+        return _flatten(by_date)
+    return by_date.get(base_date.replace("-", ""), {})
+
+def _flatten(by_date):
+    # 날짜 구분 없는 기존 반환 형태 (같은 시각은 뒤 날짜가 덮어씀)
+    result = {}
+    for fcst_date in sorted(by_date):
+        result.update(by_date[fcst_date])
+    return result
+
+def get_forecast(nx, ny, base_date, base_time, label=""):
+    """
+    - 격자/발표시각 단위로 캐시, 다음 발표 시각이 되면 만료
+    - 같은 키를 동시에 요청하면 업스트림 호출은 한 번만 하고 나머지는 그 결과를 기다림
+    """
+    key = (nx, ny, base_date, base_time)
     now = datetime.now()
-    base_dt = now if base_date is None else datetime.strptime(base_date, "%Y-%m-%d")
-    base_date = base_dt.strftime("%Y%m%d")
-    base_time = get_base_time(now)
-
+    with _FORECAST_LOCK:
+        entry = FORECAST_CACHE.get(key)
+        if entry and now < entry[0]:
+            return entry[1]
+        fut = _INFLIGHT.get(key)
+        owner = fut is None
+        if owner:
+            fut = _INFLIGHT[key] = Future()
+
+    if not owner:
+        try:
+            return fut.result(timeout=COALESCE_TIMEOUT)
+        except Exception:
+            return {}
+
+    result = {}
+    try:
+        result = _request_forecast(nx, ny, base_date, base_time, label)
+        if result:
+            with _FORECAST_LOCK:
+                FORECAST_CACHE[key] = (next_release(now), result)
+                for k in [k for k, (exp, _) in FORECAST_CACHE.items() if exp <= now]:
+                    del FORECAST_CACHE[k]
+    finally:
+        fut.set_result(result)
+        with _FORECAST_LOCK:
+            _INFLIGHT.pop(key, None)
+    return result
+
+def _request_forecast(nx, ny, base_date, base_time, label=""):
     params = {
         "serviceKey": SERVICE_KEY,
         "pageNo": "1",
@@ -32,19 +104,19 @@ def fetch_weather(golf_name, lat, lng, base_date=None):
         r.raise_for_status()
         items = r.json()["response"]["body"]["items"]["item"]
 
-        # 시간별 예보 정리
+        # 날짜/시간별 예보 정리
         forecast = {}
         for it in items:
-            fcst_time = it["fcstTime"]
+            key = (it.get("fcstDate", ""), it["fcstTime"])
             category = it["category"]
             value = it["fcstValue"]
-            if fcst_time not in forecast:
-                forecast[fcst_time] = {}
-            forecast[fcst_time][category] = value
+            if key not in forecast:
+                forecast[key] = {}
+            forecast[key][category] = value
 
         # 시간별 날씨 요약: 강수형태(PTY), 기온(TMP), 강수량(PCP or POP)
         result = {}
-        for time_str, values in forecast.items():
+        for (fcst_date, time_str), values in forecast.items():
             hour = int(time_str[:2])
             desc = "맑음"
             if values.get("PTY") in {"1", "4"}: desc = "비"
@@ -52,64 +124,71 @@ def fetch_weather(golf_name, lat, lng, base_date=None):
             elif values.get("SKY") == "4": desc = "흐림"
             elif values.get("SKY") == "3": desc = "구름"
 
-            result[hour] = {
+            result.setdefault(fcst_date, {})[hour] = {
                 "desc": desc,
                 "temp": float(values.get("TMP", 0)),
-                "rain": float(values.get("PCP", "0").replace("강수없음", "0").replace("mm", "").replace("-", "0"))
+                "rain": _parse_rain(values.get("PCP", "0")),
             }
 
-        return result  # 시간대별 dict 반환
+        return result  # {fcstDate: 시간대별 dict} 반환
 
     except Exception as e:
-        print(f"❌ {golf_name} 날씨 수집 실패:", e)
+        log.warning("❌ 날씨 수집 실패", target=label or (nx, ny), error=e)
         return {}
 
+# 격자 변환 상수 (기상청 Lambert 정각원추도법 기준) — 모듈 로딩 시 1회 계산
+_GRID_RE = 6371.00877 / 5.0   # 지구 반경 / 격자 간격(5km)
+_DEGRAD = math.pi / 180.0
+_SLAT1 = 30.0 * _DEGRAD
+_SLAT2 = 60.0 * _DEGRAD
+_OLON = 126.0 * _DEGRAD
+_OLAT = 38.0 * _DEGRAD
+_XO, _YO = 43, 136
+
+_SN = math.log(math.cos(_SLAT1) / math.cos(_SLAT2)) / math.log(
+    math.tan(math.pi * 0.25 + _SLAT2 * 0.5) / math.tan(math.pi * 0.25 + _SLAT1 * 0.5)
+)
+_SF = math.pow(math.tan(math.pi * 0.25 + _SLAT1 * 0.5), _SN) * math.cos(_SLAT1) / _SN
+_RO = _GRID_RE * _SF / math.pow(math.tan(math.pi * 0.25 + _OLAT * 0.5), _SN)
+
+def _parse_rain(pcp):
+    # "강수없음", "1mm 미만", "1.0mm", "30.0~50.0mm", "50.0mm 이상" 등 → 숫자(mm)
+    pcp = str(pcp)
+    if "없음" in pcp or "미만" in pcp:
+        return 0.0
+    m = re.search(r"\d+(?:\.\d+)?", pcp)
+    return float(m.group(0)) if m else 0.0
+
 def convert_grid(lat, lon):
     # 격자 변환 알고리즘 (기상청 기준)
-    import math
-    RE = 6371.00877  # 지구 반경
-    GRID = 5.0       # 격자 간격
-    SLAT1 = 30.0
-    SLAT2 = 60.0
-    OLON = 126.0
-    OLAT = 38.0
-    XO = 43
-    YO = 136
-
-    DEGRAD = math.pi / 180.0
-    re = RE / GRID
-    slat1 = SLAT1 * DEGRAD
-    slat2 = SLAT2 * DEGRAD
-    olon = OLON * DEGRAD
-    olat = OLAT * DEGRAD
-
-    sn = math.tan(math.pi * 0.25 + slat2 * 0.5) / math.tan(math.pi * 0.25 + slat1 * 0.5)
-    sn = math.log(math.cos(slat1) / math.cos(slat2)) / math.log(sn)
-    sf = math.tan(math.pi * 0.25 + slat1 * 0.5)
-    sf = math.pow(sf, sn) * math.cos(slat1) / sn
-    ro = math.tan(math.pi * 0.25 + olat * 0.5)
-    ro = re * sf / math.pow(ro, sn)
-
-    ra = math.tan(math.pi * 0.25 + lat * DEGRAD * 0.5)
-    ra = re * sf / math.pow(ra, sn)
-    theta = lon * DEGRAD - olon
+    ra = math.tan(math.pi * 0.25 + lat * _DEGRAD * 0.5)
+    ra = _GRID_RE * _SF / math.pow(ra, _SN)
+    theta = lon * _DEGRAD - _OLON
     if theta > math.pi: theta -= 2.0 * math.pi
     if theta < -math.pi: theta += 2.0 * math.pi
-    theta *= sn
+    theta *= _SN
 
-    x = int(ra * math.sin(theta) + XO + 0.5)
-    y = int(ro - ra * math.cos(theta) + YO + 0.5)
+    x = int(ra * math.sin(theta) + _XO + 0.5)
+    y = int(_RO - ra * math.cos(theta) + _YO + 0.5)
     return x, y
 
-def get_base_time(now):
-    # 가장 최근 발표 시간 기준
-    hour = now.hour
-    base_times = [2, 5, 8, 11, 14, 17, 20, 23]
-    for bt in reversed(base_times):
-        if hour >= bt:
-            return f"{bt:02d}00"
-    return "2300"
+def current_release(now):
+    # API에 반영된 가장 최근 발표본 (base_date, base_time) — 02시 이전이면 전날 23시
+    t = now - RELEASE_DELAY
+    for bt in reversed(BASE_HOURS):
+        if t.hour >= bt:
+            return t.strftime("%Y%m%d"), f"{bt:02d}00"
+    return (t - timedelta(days=1)).strftime("%Y%m%d"), f"{BASE_HOURS[-1]:02d}00"
+
+def next_release(now):
+    # 다음 발표본이 API에 반영되는 시각 (캐시 만료 기준)
+    t = now - RELEASE_DELAY
+    for bt in BASE_HOURS:
+        if t.hour < bt:
+            return t.replace(hour=bt, minute=0, second=0, microsecond=0) + RELEASE_DELAY
+    tomorrow = t + timedelta(days=1)
+    return tomorrow.replace(hour=BASE_HOURS[0], minute=0, second=0, microsecond=0) + RELEASE_DELAY
 
 if __name__ == "__main__":
-    from golf_clubs import get_club_latlng  # 예시: golf_clubs.json 에서 불러온다고 가정
-    print(fetch_weather("세현", 37.199742, 127.340926))
+    from club_registry import BY_NAME
+    print(fetch_club_weather(BY_NAME["세현"]))
@@ -0,0 +1,47 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+from club_registry import BY_NAME
+from golfpang_parser import parse_hour_num
+from weather import current_release, get_daily_forecast
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 티타임 결과 행에 날씨(desc/temp/rain) 일괄 부착
+WEATHER_WORKERS = int(os.environ.get("WEATHER_WORKERS", 8))  # 서로 다른 격자 동시 조회 수
+
+def weather_version(now=None) -> str:
+    # 응답 캐시 키용: 발표본이 바뀌면 값이 바뀜
+    return "".join(current_release(now or datetime.now()))
+
+def _grid_of(golf: str):
+    club = BY_NAME.get(golf)
+    return club["grid"] if club else None
+
+def enrich_rows(rows: List[Dict], date_str: str) -> List[Dict]:
+    """
+    - 한 날짜의 결과 행을 (구장 격자)별로 묶어 격자당 예보를 한 번만 가져옴
+    - 각 행에 weather(desc)/temp/rain을 붙임 (예보 범위 밖/구장 미상은 None)
+    - rows는 조회 시 새로 만든 dict여야 함 (제자리 수정)
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(_grid_of(row["golf"]), []).append(row)
+
+    now = datetime.now()
+    grids = [g for g in groups if g]
+    if len(grids) > 1:
+        with ThreadPoolExecutor(max_workers=max(1, min(WEATHER_WORKERS, len(grids)))) as ex:
+            hourly_by_grid = dict(zip(grids, ex.map(lambda g: get_daily_forecast(g, date_str, now), grids)))
+    else:
+        hourly_by_grid = {g: get_daily_forecast(g, date_str, now) for g in grids}
+
+    for grid, group in groups.items():
+        hourly = hourly_by_grid.get(grid) or {}
+        for row in group:
+            w = hourly.get(parse_hour_num(row["hour"]))
+            row["weather"] = w["desc"] if w else None
+            row["temp"] = w["temp"] if w else None
+            row["rain"] = w["rain"] if w else None
+    return rows